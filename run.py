@@ -1,5 +1,8 @@
 import argparse
+import hashlib
+import json
 import os
+import time
 from os.path import join
 import tarfile
 import zipfile
@@ -15,12 +18,32 @@
 
 from src.utility.ConfigParser import ConfigParser
 
+# Durations of the startup phases of the launcher, printed before blender is started
+startup_timings = []
+phase_start = time.time()
+
+
+def finish_startup_phase(name):
+    """ Records the duration of the current startup phase and starts the next one. """
+    global phase_start
+    startup_timings.append((name, time.time() - phase_start))
+    phase_start = time.time()
+
+
+def print_startup_timings():
+    print("Launcher startup took {:.2f}s ({})".format(sum(duration for _, duration in startup_timings),
+                                                      ", ".join("{}: {:.2f}s".format(name, duration) for name, duration in startup_timings)))
+
 parser = argparse.ArgumentParser(add_help=False)
 parser.add_argument('config', default=None, nargs='?', help='The path to the configuration file which describes what the pipeline should do.')
 parser.add_argument('args', metavar='arguments', nargs='*', help='Additional arguments which are used to replace placeholders inside the configuration. <args:i> is hereby replaced by the i-th argument.')
 parser.add_argument('--reinstall-packages', dest='reinstall_packages', action='store_true', help='If given, all python packages configured inside the configuration file will be reinstalled.')
+parser.add_argument('--skip-env-check', dest='skip_env_check', action='store_true', help='If given, the check and installation of the python packages configured inside the configuration file is skipped completely. Use this, if the environment is known to be set up, e.g. on offline cluster nodes.')
 parser.add_argument('--reinstall-blender', dest='reinstall_blender', action='store_true', help='If given, the blender installation is deleted and reinstalled. Is ignored, if a "custom_blender_path" is configured in the configuration file.')
 parser.add_argument('--batch_process',help='Renders a batch of house-cam combinations, by reading a file containing the combinations on each line, where each line is the standard placeholder arguments for rendering a single scene separated by spaces. The value of this option is the path to the index file, no need to add placeholder arguments.')
+parser.add_argument('--batch_workers', type=int, default=None, help='If given together with --batch_process, the given number of blender processes is started. Each of them pulls the lines of the index file from a local queue, so blender is only started once per worker.')
+parser.add_argument('--batch_retries', type=int, default=1, help='Only used with --batch_workers: How often a line of the index file is retried, if its pipeline run fails.')
+parser.add_argument('--batch_ledger', default=None, help='Only used with --batch_workers: Path to the ledger file, in which all finished lines are recorded. Lines already marked as done are skipped, when the batch is restarted. Default: <index_file>.ledger')
 parser.add_argument('-h', '--help', dest='help', action='store_true', help='Show this help message and exit.')
 args = parser.parse_args()
 
@@ -31,6 +54,7 @@
 config_parser = ConfigParser()
 config = config_parser.parse(args.config, args.args, args.help, skip_arg_placeholders=(args.batch_process != None)) # Don't parse placeholder args in batch mode.
 setup_config = config["setup"]
+finish_startup_phase("parsing config")
 
 # If blender should be downloaded automatically
 if "custom_blender_path" not in setup_config:
@@ -151,6 +175,7 @@ def __call__(self, block_num, block_size, total_size):
         raise Exception("Could not determine major blender version")
 
 print("Using blender in " + blender_path)
+finish_startup_phase("blender setup")
 
 
 general_required_packages = ["pyyaml==5.1.2", "Sphinx==1.6.5"]
@@ -160,7 +185,7 @@ def __call__(self, block_num, block_size, total_size):
     required_packages += setup_config["pip"]
 
 # Install required packages
-if len(required_packages) > 0:
+if len(required_packages) > 0 and not args.skip_env_check:
     # Install pip
     if platform == "linux" or platform == "linux2":
         python_bin_folder = os.path.join(blender_path, major_version, "python", "bin")
@@ -180,6 +205,20 @@ def __call__(self, block_num, block_size, total_size):
         pre_python_package_path = os.path.join(blender_path, major_version, "python", "lib", "site-packages")
     else:
         raise Exception("This system is not supported yet: {}".format(platform))
+
+    # The stamp file marks that all required packages were successfully installed into this blender installation,
+    # if it matches, all pip calls are skipped
+    env_stamp_path = os.path.join(packages_path, ".env_stamp")
+    env_hash = hashlib.sha256(json.dumps({"packages": sorted(required_packages), "blender_path": os.path.abspath(blender_path),
+                                          "python_bin": os.path.abspath(python_bin)}, sort_keys=True).encode("utf-8")).hexdigest()
+    env_stamp_valid = False
+    if os.path.exists(env_stamp_path) and not args.reinstall_packages:
+        with open(env_stamp_path, "r") as f:
+            env_stamp_valid = f.read().strip() == env_hash
+
+if len(required_packages) > 0 and not args.skip_env_check and env_stamp_valid:
+    print("The python environment matches the stamp file, skipping the package check.")
+elif len(required_packages) > 0 and not args.skip_env_check:
     subprocess.Popen([python_bin, "-m", "ensurepip"], env=dict(os.environ, PYTHONPATH="")).wait()
     # Make sure pip is up-to-date
     subprocess.Popen([python_bin, "-m", "pip", "install", "--upgrade", "pip"], env=dict(os.environ, PYTHONPATH="")).wait()
@@ -187,7 +226,7 @@ def __call__(self, block_num, block_size, total_size):
     # Make sure to not install into the default site-packages path, as this would overwrite already pre-installed packages
     if not os.path.exists(packages_path):
         os.mkdir(packages_path)
-        
+
     used_env = dict(os.environ, PYTHONPATH=packages_path + ":" + pre_python_package_path)
     # Collect already installed packages by calling pip list (outputs: <package name>==<version>)
     installed_packages = subprocess.check_output([python_bin, "-m", "pip", "list", "--format=freeze",
@@ -201,6 +240,7 @@ def __call__(self, block_num, block_size, total_size):
     installed_packages_versions = [ele[:-1] if ele.endswith("'") else ele for ele in installed_packages_versions]
 
     # Install all packages
+    all_packages_installed = True
     for package in required_packages:
         # Extract name and target version
         if "==" in package:
@@ -225,8 +265,15 @@ def __call__(self, block_num, block_size, total_size):
 
         # Only install if its not already installed (pip would check this itself, but at first downloads the requested package which of course always takes a while)
         if not already_installed or args.reinstall_packages:
-            subprocess.Popen([python_bin, "-m", "pip", "install", package, "--target", packages_path,
-                              "--upgrade"], env=dict(os.environ, PYTHONPATH=packages_path)).wait()
+            if subprocess.Popen([python_bin, "-m", "pip", "install", package, "--target", packages_path,
+                                 "--upgrade"], env=dict(os.environ, PYTHONPATH=packages_path)).wait() != 0:
+                all_packages_installed = False
+
+    # Only write the stamp if everything was installed, so a failed installation is retried in the next run
+    if all_packages_installed:
+        with open(env_stamp_path, "w") as f:
+            f.write(env_hash)
+finish_startup_phase("environment check")
 
 # Run script
 if platform == "linux" or platform == "linux2":
@@ -240,6 +287,50 @@ def __call__(self, block_num, block_size, total_size):
 
 repo_root_directory = os.path.dirname(os.path.realpath(__file__))
 path_src_run = os.path.join(repo_root_directory, "src/run.py")
+print_startup_timings()
+
+if args.batch_process and args.batch_workers is not None:
+    from src.utility.BatchQueue import BatchQueueServer
+
+    # The index file is resolved relative to the repo root, the same way it is done inside blender
+    batch_index_file = os.path.expanduser(args.batch_process)
+    if not os.path.isabs(batch_index_file):
+        batch_index_file = os.path.join(repo_root_directory, batch_index_file)
+    ledger_path = args.batch_ledger if args.batch_ledger is not None else batch_index_file + ".ledger"
+
+    server = BatchQueueServer(batch_index_file, ledger_path, args.batch_retries)
+    address = server.start()
+    worker_env = dict(os.environ, PYTHONPATH="", BLENDER_PROC_BATCH_AUTHKEY=server.authkey.hex())
+
+    def start_worker(worker_id):
+        return subprocess.Popen([blender_run_path, "--background", "--python-exit-code", "2", "--python", path_src_run, "--", args.config,
+                                 "--batch-process", args.batch_process, "--batch-queue", "{}:{}".format(*address), "--batch-worker-id", str(worker_id)],
+                                env=worker_env, cwd=repo_root_directory)
+
+    workers = [start_worker(worker_id) for worker_id in range(args.batch_workers)]
+    # Avoid restarting crashing workers forever, e.g. if blender itself can not be started
+    restarts_left = len(workers) * (args.batch_retries + 1)
+    try:
+        while any(worker.poll() is None for worker in workers):
+            time.sleep(1)
+            for worker_id, worker in enumerate(workers):
+                # Restart workers which died while there is still work left
+                if worker.poll() is not None and worker.returncode != 0 and server.has_open_jobs() and restarts_left > 0:
+                    print("Worker {} exited with code {}, restarting it.".format(worker_id, worker.returncode))
+                    restarts_left -= 1
+                    workers[worker_id] = start_worker(worker_id)
+    except KeyboardInterrupt:
+        for worker in workers:
+            try:
+                worker.terminate()
+            except OSError:
+                pass
+        for worker in workers:
+            worker.wait()
+    server.stop()
+
+    print("Batch finished: {} lines succeeded, {} lines failed.".format(len(server.succeeded), len(server.failed)))
+    exit(0 if len(server.failed) == 0 and not server.has_open_jobs() else 1)
 
 if not args.batch_process:
     p = subprocess.Popen([blender_run_path, "--background", "--python-exit-code", "2", "--python", path_src_run, "--", args.config] + args.args,
@@ -255,5 +346,6 @@ def __call__(self, block_num, block_size, total_size):
     except OSError:
         pass
     p.wait()
+print("Blender process took {:.2f}s".format(time.time() - phase_start))
 
 exit(p.returncode)
@@ -0,0 +1,53 @@
+# Micro benchmarks of the get_* methods of src.utility.Config.
+#
+# As the config imports mathutils, this script has to be run with the python of blender:
+#   blender --background --python scripts/benchmark_config.py -- [--number 100000]
+#
+# For every lookup the time of a repeated lookup on the same config (cached) is compared with the time of a lookup on
+# a newly created config (uncached, as it was done for every lookup before the lookup cache existed).
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import src.utility.Utility
+from src.main.GlobalStorage import GlobalStorage
+from src.utility.Config import Config
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+parser = argparse.ArgumentParser("Micro benchmarks of the config lookups")
+parser.add_argument('--number', type=int, default=100000, help='How often each lookup is repeated.')
+args = parser.parse_args(argv)
+
+data = {
+    "max_iterations": 1000,
+    "name": "Suzanne",
+    "location": [1.0, 2.0, 3.0],
+    "matrix": [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]],
+    "render": {"samples": {"max": 256}},
+    "pos_sampler": {
+        "provider": "sampler.Uniform3d",
+        "min": [-1, -1, -1],
+        "max": [1, 1, 1]
+    }
+}
+GlobalStorage.init_global(Config({"output_dir": "/tmp/output"}))
+
+lookups = [
+    ("get_int, flat", lambda config: config.get_int("max_iterations")),
+    ("get_int, nested", lambda config: config.get_int("render/samples/max")),
+    ("get_int, missing with fallback", lambda config: config.get_int("min_distance", 5)),
+    ("get_string, from global config", lambda config: config.get_string("output_dir")),
+    ("get_vector3d, static", lambda config: config.get_vector3d("location")),
+    ("get_matrix_4x4, static", lambda config: config.get_matrix_4x4("matrix")),
+    ("get_vector3d, provider", lambda config: config.get_vector3d("pos_sampler"))
+]
+
+print("{:<35} {:>14} {:>14}".format("lookup", "cached [us]", "uncached [us]"))
+cached_config = Config(data)
+for label, lookup in lookups:
+    cached = timeit.timeit(lambda: lookup(cached_config), number=args.number) / args.number
+    # The provider is created at the first lookup and stored in the data, so it is reused by the new configs
+    uncached = timeit.timeit(lambda: lookup(Config(data)), number=args.number) / args.number
+    print("{:<35} {:>14.3f} {:>14.3f}".format(label, cached * 1e6, uncached * 1e6))
@@ -0,0 +1,60 @@
+# Compares the import operators of blender with the numpy based MeshImporter on .obj and .ply files.
+#
+# As the importer uses bpy, this script has to be run with the python of blender:
+#   blender --background --python scripts/benchmark_mesh_import.py -- <file.obj|file.ply> [...] [--repetitions 3]
+#
+# For every file and backend the best import time is printed, together with the number of created objects,
+# vertices, faces and materials and the bounding box of all vertices in world coordinates, so differences in the
+# result of both backends are visible.
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.utility.SceneReset import SceneReset
+from src.utility.Utility import Utility
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+parser = argparse.ArgumentParser("Compares the import operators with the numpy based importer")
+parser.add_argument('files', nargs='+', help='The .obj or .ply files to import.')
+parser.add_argument('--repetitions', type=int, default=3, help='How often each file is imported per backend.')
+args = parser.parse_args(argv)
+
+
+def summarize(objects):
+    """ Returns the statistics of the given imported objects. """
+    num_vertices = sum(len(obj.data.vertices) for obj in objects)
+    num_faces = sum(len(obj.data.polygons) for obj in objects)
+    materials = set(material.name for obj in objects for material in obj.data.materials if material is not None)
+    corners = []
+    for obj in objects:
+        if len(obj.data.vertices) > 0:
+            coords = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+            obj.data.vertices.foreach_get("co", coords)
+            matrix = np.array(obj.matrix_world)
+            corners.append(coords.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3])
+    if corners:
+        corners = np.concatenate(corners)
+        bounding_box = "[{}] - [{}]".format(", ".join("{:.3f}".format(v) for v in corners.min(axis=0)),
+                                            ", ".join("{:.3f}".format(v) for v in corners.max(axis=0)))
+    else:
+        bounding_box = "-"
+    return len(objects), num_vertices, num_faces, len(materials), bounding_box
+
+
+print("{:<30} {:<9} {:>10} {:>8} {:>10} {:>10} {:>6}  {}".format("file", "backend", "time [s]", "objects",
+                                                                 "vertices", "faces", "mats", "bounding box"))
+for file_path in args.files:
+    file_path = os.path.abspath(file_path)
+    for backend in ["operator", "numpy"]:
+        durations = []
+        for _ in range(args.repetitions):
+            SceneReset.reset()
+            start = time.perf_counter()
+            objects = Utility.import_objects(file_path, backend=backend)
+            durations.append(time.perf_counter() - start)
+        print("{:<30} {:<9} {:>10.3f} {:>8} {:>10} {:>10} {:>6}  {}".format(os.path.basename(file_path)[-30:], backend,
+                                                                           min(durations), *summarize(objects)))
@@ -0,0 +1,95 @@
+# Compares the vectorized NoiseRemoval with the previous per pixel implementation.
+#
+# As the postprocessing modules import bpy, this script has to be run with the python of blender:
+#   blender --background --python scripts/benchmark_noise_removal.py -- [segmap.npy ...] [--resolution 1024 1024]
+#
+# If no .npy files are given, a synthetic segmap with blocky labels and randomly scattered noise is used.
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.postprocessing.NoiseRemoval import NoiseRemoval
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+parser = argparse.ArgumentParser("Benchmark of the NoiseRemoval postprocessing module")
+parser.add_argument('segmap_paths', nargs='*', help='Paths to .npy files containing raw segmaps, as they are given to the NoiseRemoval module.')
+parser.add_argument('--resolution', nargs=2, type=int, default=[512, 512], help='Height and width of the synthetic segmap.')
+parser.add_argument('--noise_ratio', type=float, default=0.01, help='Fraction of noisy pixels in the synthetic segmap.')
+parser.add_argument('--repetitions', type=int, default=3, help='How often each implementation is run, the best run is reported.')
+args = parser.parse_args(argv)
+
+
+def legacy_remove_noise(image, noise_indices):
+    """ The previous implementation, which processes one noisy value after the other. """
+    for index in noise_indices:
+        neighbors = []
+        for p in range(max(0, index[0] - 1), min(image.shape[0], index[0] + 2)):
+            for q in range(max(0, index[1] - 1), min(image.shape[1], index[1] + 2)):
+                if not (p == index[0] and q == index[1]):
+                    neighbors.append([p, q])
+        curr_val = image[index[0]][index[1]][0]
+        neighbor_vals = np.unique(np.array([image[p][q] for p, q in neighbors]))
+
+        min_diff = 10000000000
+        min_idx = 0
+        for idx, n in enumerate(neighbor_vals):
+            if n - curr_val <= min_diff:
+                min_diff = n - curr_val
+                min_idx = idx
+
+        new_val = neighbor_vals[min_idx]
+        image[index[0]][index[1]] = np.array([new_val] * image.shape[2])
+    return image
+
+
+def legacy_run(module, image):
+    """ The previous NoiseRemoval.run(), using the same histogram as the vectorized version. """
+    image = ((image * 37) / (65536)).astype(np.int32)
+    if len(image.shape) == 2:
+        image = image[:, :, np.newaxis]
+    b, counts = np.unique(image.flatten(), return_counts=True)
+    noise_vals = b[counts <= 100]
+    return legacy_remove_noise(image, np.argwhere(module._isin(image, noise_vals)))
+
+
+def synthetic_segmap(height, width, noise_ratio):
+    """ Creates a segmap with blocks of ten labels, scaled to 16 bit like the raw segmaps, plus stray noise values. """
+    random_state = np.random.RandomState(0)
+    labels = random_state.randint(0, 10, (height // 8 + 1, width // 8 + 1))
+    labels = np.kron(labels, np.ones((8, 8), dtype=labels.dtype))[:height, :width]
+    segmap = labels.astype(np.float32) * 65536 / 37 + 100
+    noise_mask = random_state.rand(height, width) < noise_ratio
+    segmap[noise_mask] = random_state.randint(10, 30000, np.sum(noise_mask)) * 65536 / 37 + 100
+    return np.repeat(segmap[:, :, np.newaxis], 3, axis=2)
+
+
+def measure(function, image):
+    """ Runs the given function on a copy of the image and returns the result and the best duration. """
+    best_duration = None
+    for _ in range(args.repetitions):
+        start = time.time()
+        result = function(image.copy())
+        duration = time.time() - start
+        best_duration = duration if best_duration is None else min(best_duration, duration)
+    return result, best_duration
+
+
+module = NoiseRemoval.__new__(NoiseRemoval)
+if args.segmap_paths:
+    segmaps = [(path, np.load(path)) for path in args.segmap_paths]
+else:
+    segmaps = [("synthetic {}x{}".format(*args.resolution), synthetic_segmap(args.resolution[0], args.resolution[1], args.noise_ratio))]
+
+for label, segmap in segmaps:
+    vectorized, vectorized_duration = measure(lambda image: module.run(image, "segmap", "1.0.0")[0], segmap)
+    legacy, legacy_duration = measure(lambda image: legacy_run(module, image), segmap)
+    differing_pixels = np.sum(np.any(vectorized != legacy, axis=2))
+    print("{}: legacy {:.3f}s, vectorized {:.3f}s, speedup {:.1f}x, {} of {} pixels differ".format(
+        label, legacy_duration, vectorized_duration, legacy_duration / max(vectorized_duration, 1e-9),
+        differing_pixels, vectorized.shape[0] * vectorized.shape[1]))
+    # The legacy implementation updates the image while iterating, so adjacent noisy pixels can see already
+    # replaced neighbors. The vectorized version always uses the original neighbors, which causes the differences.
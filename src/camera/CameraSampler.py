@@ -114,6 +114,9 @@ class CameraSampler(CameraInterface):
     def __init__(self, config):
         CameraInterface.__init__(self, config)
         self.bvh_tree = None
+        # The ray grid in camera space, it only has to be recomputed if the view frame changes
+        self._ray_grid_key = None
+        self._ray_grid_directions = None
 
         self.rotations = []
         self.translations = []
@@ -161,6 +164,7 @@ def _sample_cam_poses(self, config):
         self._above_objects = config.get_list("check_if_pose_above_object_list", [])
 
         if self.proximity_checks:
+            self._validate_proximity_checks()
             # needs to build an bvh tree
             self._init_bvh_tree()
 
@@ -298,34 +302,11 @@ def _init_bvh_tree(self):
 
         self._is_bvh_tree_inited = True
 
-    def _perform_obstacle_in_view_check(self, cam, cam2world_matrix):
-        """ Check if there is an obstacle in front of the camera which is less than the configured
-            "min_dist_to_obstacle" away from it.
+    def _validate_proximity_checks(self):
+        """ Validates the configured proximity checks and determines the ray range distance.
 
-        :param cam: The camera whose view frame is used (only FOV is relevant, pose of cam is ignored).
-        :param cam2world_matrix: Transformation matrix that transforms from the camera space to the world space.
-        :return: True, if there are no obstacles too close to the cam.
+        This is done once per cam pose config and not for every sampled pose.
         """
-        if not self.proximity_checks:  # if no checks are in the settings all positions are accepted
-            return True
-        if not self._is_bvh_tree_inited:
-            raise Exception("The bvh tree should be inited before this function is called!")
-
-        # Get position of the corners of the near plane
-        frame = cam.view_frame(scene=bpy.context.scene)
-        # Bring to world space
-        frame = [cam2world_matrix @ v for v in frame]
-
-        # Compute vectors along both sides of the plane
-        vec_x = frame[1] - frame[0]
-        vec_y = frame[3] - frame[0]
-
-        sum = 0.0
-        sum_sq = 0.0
-
-        range_distance = sys.float_info.max
-
-        # Input validation
         for operator in self.proximity_checks:
             if (operator == "min" or operator == "max") and not isinstance(self.proximity_checks[operator], numbers.Number):
                 raise Exception("Threshold must be a number in perform_obstacle_in_view_check")
@@ -337,65 +318,100 @@ def _perform_obstacle_in_view_check(self, cam, cam2world_matrix):
                         or not isinstance(self.proximity_checks[operator]["max"], numbers.Number):
                     raise Exception("Threshold must be a number in perform_obstacle_in_view_check")
 
+        self._proximity_range_distance = None
+        # when no background is on, it can not be combined with a reduced range distance
+        if not self.proximity_checks.get("no_background", False):
+            # If there are no average or variance operators, we can decrease the ray range distance for efficiency
+            if "avg" not in self.proximity_checks and "var" not in self.proximity_checks:
+                if "max" in self.proximity_checks:
+                    # Cap distance values at a value slightly higher than the max threshold
+                    self._proximity_range_distance = self.proximity_checks["max"] + 1.0
+                elif "min" in self.proximity_checks:
+                    self._proximity_range_distance = self.proximity_checks["min"]
+        if self._proximity_range_distance is None:
+            # the default distance of BVHTree.ray_cast, which does not accept None
+            self._proximity_range_distance = sys.float_info.max
+
+    def _get_ray_directions(self, cam, cam2world_matrix):
+        """ Returns the directions of a grid of rays going from the camera through its near plane.
+
+        The normalized grid is computed in camera space and is only rebuilt if the view frame of the camera (its
+        intrinsics) changes. For each pose it is brought to world space with one matrix multiplication.
 
-        # If there are no average or variance operators, we can decrease the ray range distance for efficiency
-        if "avg" not in self.proximity_checks and "var" not in self.proximity_checks:
-            if "max" in self.proximity_checks:
-                # Cap distance values at a value slightly higher than the max threshold
-                range_distance = self.proximity_checks["max"] + 1.0
-            else:
-                range_distance = self.proximity_checks["min"]
+        :param cam: The camera whose view frame is used (only FOV is relevant, pose of cam is ignored).
+        :param cam2world_matrix: Transformation matrix that transforms from the camera space to the world space.
+        :return: A list of sqrt_number_of_rays**2 ray directions in world space.
+        """
+        # Get position of the corners of the near plane
+        frame = cam.view_frame(scene=bpy.context.scene)
+        frame_key = tuple(tuple(corner) for corner in frame) + (self.sqrt_number_of_rays,)
+        if frame_key != self._ray_grid_key:
+            corners = np.array([list(corner) for corner in frame])
+            # Go in discrete grid-like steps over plane
+            steps = np.linspace(0.0, 1.0, self.sqrt_number_of_rays)
+            x_steps, y_steps = np.meshgrid(steps, steps, indexing="ij")
+            points = corners[0] + x_steps.reshape(-1, 1) * (corners[1] - corners[0]) \
+                     + y_steps.reshape(-1, 1) * (corners[3] - corners[0])
+            self._ray_grid_directions = points / np.linalg.norm(points, axis=1, keepdims=True)
+            self._ray_grid_key = frame_key
+
+        # Bring to world space, the translation does not influence the directions
+        rotation = np.array(cam2world_matrix.to_3x3())
+        return (self._ray_grid_directions @ rotation.T).tolist()
 
-        no_range_distance = False
-        if "no_background" in self.proximity_checks and self.proximity_checks["no_background"]:
-            # when no background is on, it can not be combined with a reduced range distance
-            no_range_distance = True
+    def _perform_obstacle_in_view_check(self, cam, cam2world_matrix):
+        """ Check if there is an obstacle in front of the camera which is less than the configured
+            "min_dist_to_obstacle" away from it.
 
-        # Go in discrete grid-like steps over plane
+        :param cam: The camera whose view frame is used (only FOV is relevant, pose of cam is ignored).
+        :param cam2world_matrix: Transformation matrix that transforms from the camera space to the world space.
+        :return: True, if there are no obstacles too close to the cam.
+        """
+        if not self.proximity_checks:  # if no checks are in the settings all positions are accepted
+            return True
+        if not self._is_bvh_tree_inited:
+            raise Exception("The bvh tree should be inited before this function is called!")
+
+        min_threshold = self.proximity_checks.get("min")
+        max_threshold = self.proximity_checks.get("max")
+        no_background = self.proximity_checks.get("no_background", False)
+        collect_distances = "avg" in self.proximity_checks or "var" in self.proximity_checks
+        range_distance = self._proximity_range_distance
+        ray_cast = self.bvh_tree.ray_cast
+
+        distances = []
         position = cam2world_matrix.to_translation()
-        for x in range(0, self.sqrt_number_of_rays):
-            for y in range(0, self.sqrt_number_of_rays):
-                # Compute current point on plane
-                end = frame[0] + vec_x * x / float(self.sqrt_number_of_rays - 1) \
-                      + vec_y * y / float(self.sqrt_number_of_rays - 1)
-                # Send ray from the camera position through the current point on the plane
-                if no_range_distance:
-                    _, _, _, dist = self.bvh_tree.ray_cast(position, end - position)
-                else:
-                    _, _, _, dist = self.bvh_tree.ray_cast(position, end - position, range_distance)
-
-                # Check if something was hit and how far it is away
-                if dist is not None:
-                    if "min" in self.proximity_checks and dist <= self.proximity_checks["min"]:
-                        return False
-                    if "max" in self.proximity_checks and dist >= self.proximity_checks["max"]:
-                        return False
-                    if "avg" in self.proximity_checks:
-                        sum += dist
-                    if "var" in self.proximity_checks:
-                        if not "avg" in self.proximity_checks:
-                            sum += dist
-                        sum_sq += dist * dist
-                elif "no_background" in self.proximity_checks and self.proximity_checks["no_background"]:
-                    return False
+        for direction in self._get_ray_directions(cam, cam2world_matrix):
+            # Send ray from the camera position through the current point on the plane
+            _, _, _, dist = ray_cast(position, direction, range_distance)
 
-        if "avg" in self.proximity_checks:
-            avg = sum / (self.sqrt_number_of_rays * self.sqrt_number_of_rays)
-            # Check that the average distance is not within the accepted interval
-            if avg >= self.proximity_checks["avg"]["max"] or avg <= self.proximity_checks["avg"]["min"]:
+            # Check if something was hit and how far it is away, stop as soon as one threshold fails
+            if dist is not None:
+                if min_threshold is not None and dist <= min_threshold:
+                    return False
+                if max_threshold is not None and dist >= max_threshold:
+                    return False
+                if collect_distances:
+                    distances.append(dist)
+            elif no_background:
                 return False
 
-        if "var" in self.proximity_checks:
-            if not "avg" in self.proximity_checks:
-                avg = sum / (self.sqrt_number_of_rays * self.sqrt_number_of_rays)
-            sq_avg = avg * avg
+        if collect_distances:
+            num_of_rays = self.sqrt_number_of_rays * self.sqrt_number_of_rays
+            distances = np.array(distances)
+            # Rays which did not hit anything count as zero distance
+            avg = np.sum(distances) / num_of_rays
 
-            avg_sq = sum_sq / (self.sqrt_number_of_rays * self.sqrt_number_of_rays)
+            # Check that the average distance is not within the accepted interval
+            if "avg" in self.proximity_checks:
+                if avg >= self.proximity_checks["avg"]["max"] or avg <= self.proximity_checks["avg"]["min"]:
+                    return False
 
-            var = avg_sq - sq_avg
-            # Check that the variance value of the distance is not within the accepted interval
-            if var >= self.proximity_checks["var"]["max"] or var <= self.proximity_checks["var"]["min"]:
-                return False
+            if "var" in self.proximity_checks:
+                var = np.sum(distances * distances) / num_of_rays - avg * avg
+                # Check that the variance value of the distance is not within the accepted interval
+                if var >= self.proximity_checks["var"]["max"] or var <= self.proximity_checks["var"]["min"]:
+                    return False
 
         return True
 
@@ -417,48 +433,37 @@ def _scene_coverage_score(self, cam, cam2world_matrix):
         score = 0.0
         objects_hit = defaultdict(int)
 
-        # Get position of the corners of the near plane
-        frame = cam.view_frame(scene=bpy.context.scene)
-        # Bring to world space
-        frame = [cam2world_matrix @ v for v in frame]
-
-        # Compute vectors along both sides of the plane
-        vec_x = frame[1] - frame[0]
-        vec_y = frame[3] - frame[0]
-
-        # Go in discrete grid-like steps over plane
+        scene_ray_cast = bpy.context.scene.ray_cast
+        view_layer = bpy.context.view_layer
         position = cam2world_matrix.to_translation()
-        for x in range(0, self.sqrt_number_of_rays):
-            for y in range(0, self.sqrt_number_of_rays):
-                # Compute current point on plane
-                end = frame[0] + vec_x * x / float(self.sqrt_number_of_rays - 1) + vec_y * y / float(self.sqrt_number_of_rays - 1)
-                # Send ray from the camera position through the current point on the plane
-                hit, _, _, _, hit_object, _ = bpy.context.scene.ray_cast(bpy.context.view_layer, position, end - position)
-
-                if hit:
-                    is_of_special_dataset = "is_suncg" in hit_object or "is_3d_front" in hit_object
-                    if is_of_special_dataset and "type" in hit_object and hit_object["type"] == "Object":
-                        # calculate the score based on the type of the object,
-                        # wall, floor and ceiling objects have 0 score
-                        if "coarse_grained_class" in hit_object:
-                            object_class = hit_object["coarse_grained_class"]
-                            objects_hit[object_class] += 1
-                            if object_class in self.special_objects:
-                                score += self.special_objects_weight
-                            else:
-                                score += 1
-                        else:
-                            score += 1
-                    elif "category_id" in hit_object:
-                        object_class = hit_object["category_id"]
+        for direction in self._get_ray_directions(cam, cam2world_matrix):
+            # Send ray from the camera position through the current point on the plane
+            hit, _, _, _, hit_object, _ = scene_ray_cast(view_layer, position, direction)
+
+            if hit:
+                is_of_special_dataset = "is_suncg" in hit_object or "is_3d_front" in hit_object
+                if is_of_special_dataset and "type" in hit_object and hit_object["type"] == "Object":
+                    # calculate the score based on the type of the object,
+                    # wall, floor and ceiling objects have 0 score
+                    if "coarse_grained_class" in hit_object:
+                        object_class = hit_object["coarse_grained_class"]
+                        objects_hit[object_class] += 1
                         if object_class in self.special_objects:
                             score += self.special_objects_weight
                         else:
                             score += 1
-                        objects_hit[object_class] += 1
                     else:
-                        objects_hit[hit_object] += 1
                         score += 1
+                elif "category_id" in hit_object:
+                    object_class = hit_object["category_id"]
+                    if object_class in self.special_objects:
+                        score += self.special_objects_weight
+                    else:
+                        score += 1
+                    objects_hit[object_class] += 1
+                else:
+                    objects_hit[hit_object] += 1
+                    score += 1
         # For a scene with three different objects, the starting variance is 1.0, increases/decreases by '1/3' for
         # each object more/less, excluding floor, ceiling and walls
         scene_variance = len(objects_hit) / 3.0
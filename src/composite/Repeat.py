@@ -0,0 +1,117 @@
+import bpy
+
+from src.main.GlobalStorage import GlobalStorage
+from src.main.Module import Module
+from src.main.Pipeline import Pipeline
+from src.utility.SceneReset import SceneReset
+from src.utility.Utility import Utility
+
+
+class Repeat(Module):
+    """ Runs a sequence of modules several times, while the scene loaded by the previous modules is kept.
+
+    Between two repetitions the scene is reset to the state before the first repetition:
+
+    - all datablocks created by the repetition, e.g. the lights of a LightSampler, are removed
+    - all keyframes which were inserted at or after the frame_end before the first repetition are removed
+    - the frame_end is reset, so every repetition starts with the same frame numbers
+    - the registered outputs and the values of the GlobalStorage are restored
+
+    All changes of already existing datablocks, e.g. sampled object poses or materials, are kept and should therefore
+    be overwritten by the next repetition. To not overwrite the files of the previous repetition, the writers should
+    use "append_to_existing_output".
+
+    The modules are measured and profiled like the modules of the pipeline ("performance_trace" and "profile"), but
+    they can not be marked as "checkpoint", as a checkpoint inside of a repetition could not be resumed.
+
+    Example 1: Render five variations of lights and camera poses of a loaded scene.
+
+        {
+          "module": "composite.Repeat",
+          "config": {
+            "repetitions": 5,
+            "modules": [
+              {
+                "module": "lighting.LightSampler",
+                "config": {...}
+              },
+              {
+                "module": "camera.CameraSampler",
+                "config": {...}
+              },
+              {
+                "module": "renderer.RgbRenderer",
+                "config": {...}
+              },
+              {
+                "module": "writer.Hdf5Writer",
+                "config": {
+                  "append_to_existing_output": True
+                }
+              }
+            ]
+          }
+        }
+
+    **Configuration**:
+
+    .. csv-table::
+       :header: "Parameter", "Description"
+
+       "repetitions", "How often the modules are run. Type: int. Default: 1."
+       "modules", "A list of module configs, in the same format as the modules list of the config file. Type: list."
+    """
+
+    def __init__(self, config):
+        Module.__init__(self, config)
+
+        self._repetitions = self.config.get_int("repetitions", 1)
+        self._modules = Utility.initialize_modules(self.config.get_list("modules"))
+        for module in self._modules:
+            # only the config of the module itself is checked, as the global config is not initialized yet
+            if module.config.has_param("checkpoint") and module.config.get_bool("checkpoint"):
+                raise Exception("The modules of composite.Repeat can not be used as checkpoint: "
+                                "{}".format(module.__class__.__name__))
+
+    def _remove_keyframes_from(self, first_frame):
+        """ Removes all keyframes at or after the given frame from all actions.
+
+        :param first_frame: The first frame whose keyframes are removed.
+        """
+        for action in bpy.data.actions:
+            for fcurve in list(action.fcurves):
+                keyframes = [keyframe for keyframe in fcurve.keyframe_points if keyframe.co[0] >= first_frame]
+                for keyframe in reversed(keyframes):
+                    fcurve.keyframe_points.remove(keyframe, fast=True)
+                if len(fcurve.keyframe_points) == 0:
+                    # An empty fcurve would still overwrite the value of its property
+                    action.fcurves.remove(fcurve)
+                else:
+                    fcurve.update()
+
+    def run(self):
+        frame_end = bpy.context.scene.frame_end
+        outputs = [dict(output) for output in bpy.context.scene["output"]] if "output" in bpy.context.scene else None
+        storage = GlobalStorage.get_storage_snapshot()
+        existing_datablocks = set(SceneReset.removable_datablocks())
+
+        for repetition in range(self._repetitions):
+            with Utility.BlockStopWatch("Running repetition {} of {}".format(repetition + 1, self._repetitions)):
+                for index, module in enumerate(self._modules):
+                    Pipeline.run_nested_module(module, "repetition_{:02d}_{:02d}_{}".format(
+                        repetition, index, module.__class__.__name__))
+
+            if repetition == self._repetitions - 1:
+                # The state of the last repetition is kept for the following modules
+                break
+
+            # Reset the scene for the next repetition
+            bpy.data.batch_remove([datablock for datablock in SceneReset.removable_datablocks()
+                                   if datablock not in existing_datablocks])
+            self._remove_keyframes_from(frame_end)
+            bpy.context.scene.frame_end = frame_end
+            if outputs is not None:
+                bpy.context.scene["output"] = outputs
+            elif "output" in bpy.context.scene:
+                del bpy.context.scene["output"]
+            GlobalStorage.restore_storage_snapshot(storage)
@@ -224,7 +224,7 @@ def run(self):
         # Generate .obj file represents the selected pose
         generated_obj = self._write_body_mesh_to_obj_file(body_repr, faces)
 
-        loaded_obj = Utility.import_objects(generated_obj)
+        loaded_obj = Utility.import_objects(generated_obj, backend=self._import_backend)
 
         self._correct_materials(loaded_obj)
 
@@ -9,6 +9,7 @@
 
 from src.camera.CameraInterface import CameraInterface
 from src.loader.LoaderInterface import LoaderInterface
+from src.utility.BlenderUtility import duplicate_objects
 from src.utility.Utility import Utility
 from src.utility.Config import Config
 
@@ -278,29 +279,13 @@ def _load_mesh(self, obj_id, model_p, scale=1):
         if cur_obj is None:
             if self._has_external_texture:
                 if os.path.exists(model_path):
-                    new_file_ply_content = ""
-                    with open(model_path, "r") as file:
-                        new_file_ply_content = file.read()
-                        texture_pos = new_file_ply_content.find("comment TextureFile ") + len("comment TextureFile ")
-                        texture_file_name = new_file_ply_content[texture_pos:
-                                                                 new_file_ply_content.find("\n", texture_pos)]
-                        texture_file_path = os.path.join(os.path.dirname(model_path), texture_file_name)
-                        new_file_ply_content = new_file_ply_content.replace("property float texture_u",
-                                                                            "property float s")
-                        new_file_ply_content = new_file_ply_content.replace("property float texture_v",
-                                                                            "property float t")
-                    model_name = os.path.basename(model_path)
-                    tmp_ply_file = os.path.join(Utility.get_temporary_directory(self.config), model_name)
-                    with open(tmp_ply_file, "w") as file:
-                        file.write(new_file_ply_content)
-                    bpy.ops.import_mesh.ply(filepath=tmp_ply_file)
-                    cur_obj = bpy.context.selected_objects[-1]
+                    texture_file_path = self._get_texture_file_path(model_path)
+                    cur_obj = self._import_with_cache(model_path, lambda: self._import_with_renamed_uvs(model_path))[0]
             else:
-                bpy.ops.import_mesh.ply(filepath=model_path)
-                cur_obj = bpy.context.selected_objects[-1]
+                cur_obj = self._import_with_cache(model_path, lambda: Utility.import_objects(
+                    model_path, backend=self._import_backend))[0]
         elif self.allow_duplication:
-            bpy.ops.object.duplicate({"object": cur_obj, "selected_objects": [cur_obj]})
-            cur_obj = bpy.context.selected_objects[-1]
+            cur_obj = duplicate_objects(cur_obj)[0]
 
         cur_obj.scale = Vector((scale, scale, scale))
         cur_obj['category_id'] = obj_id
@@ -315,6 +300,37 @@ def _load_mesh(self, obj_id, model_p, scale=1):
         cur_obj["bop_dataset_name"] = self.bop_dataset_name
         return cur_obj
 
+    def _get_texture_file_path(self, model_path):
+        """ Returns the path of the texture, which is referenced in the header of the given .ply file.
+
+        :param model_path: The path to the .ply file. Type: string.
+        :return: The path to the texture file or an empty string, if the file does not reference a texture.
+                 Type: string.
+        """
+        with open(model_path, "r") as file:
+            for line in file:
+                if line.startswith("comment TextureFile "):
+                    return os.path.join(os.path.dirname(model_path), line[len("comment TextureFile "):].strip())
+                elif line.startswith("end_header"):
+                    break
+        return ""
+
+    def _import_with_renamed_uvs(self, model_path):
+        """ Imports the given .ply file, after renaming its texture_u and texture_v properties to s and t, so that
+        they are imported as uv coordinates.
+
+        :param model_path: The path to the .ply file. Type: string.
+        :return: The list of imported objects. Type: list.
+        """
+        with open(model_path, "r") as file:
+            new_file_ply_content = file.read()
+        new_file_ply_content = new_file_ply_content.replace("property float texture_u", "property float s")
+        new_file_ply_content = new_file_ply_content.replace("property float texture_v", "property float t")
+        tmp_ply_file = os.path.join(Utility.get_temporary_directory(self.config), os.path.basename(model_path))
+        with open(tmp_ply_file, "w") as file:
+            file.write(new_file_ply_content)
+        return Utility.import_objects(tmp_ply_file, backend=self._import_backend)
+
     def _load_materials(self, cur_obj):
         """ Loads / defines materials, e.g. vertex colors.
         
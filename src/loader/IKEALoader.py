@@ -113,5 +113,6 @@ def run(self):
             selected_obj = random.choice(self._obj_dict.get(random_key))
 
         print("Selected object: ", os.path.basename(selected_obj))
-        loaded_obj = Utility.import_objects(selected_obj)
+        loaded_obj = self._import_with_cache(selected_obj,
+                                             lambda: Utility.import_objects(selected_obj, backend=self._import_backend))
         self._set_properties(loaded_obj)
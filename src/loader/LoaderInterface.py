@@ -1,6 +1,8 @@
 import bpy
 
 from src.main.Module import Module
+from src.utility.AssetCache import AssetCache
+from src.utility.Utility import Utility
 
 
 class LoaderInterface(Module):
@@ -12,9 +14,39 @@ class LoaderInterface(Module):
        "add_properties", "Custom properties to set for loaded objects. Use 'cp_' prefix for keys. Type: dict."
        "cf_set_shading", "Custom function to set the shading of the loaded objects."
                          "Type: str. Available: ["FLAT", "SMOOTH"]"
+       "import_backend", "How .obj and .ply files are imported. 'operator' uses the import operators of blender, "
+                         "'numpy' parses the files with numpy, which is much faster for large meshes, but only "
+                         "supports the common statements of these formats and no operator parameters. "
+                         "Type: string. Default: 'operator'. Available: ['operator', 'numpy']"
+       "asset_cache_dir", "If given, imported models are stored after their post-processing as .blend files in this "
+                          "directory, later imports of the same model append them from there. The directory can be "
+                          "shared by several processes. Only used by the ShapeNetLoader, Pix3DLoader, IKEALoader, "
+                          "Front3DLoader and BopLoader. Type: string. Default: ''."
+       "asset_cache_max_size", "The maximum size of the asset cache in GB, if it is exceeded the least recently used "
+                               "models are removed. Type: float. Default: 20.0."
     """
     def __init__(self, config):
         Module.__init__(self, config)
+        self._import_backend = self.config.get_string("import_backend", "operator")
+        asset_cache_dir = self.config.get_string("asset_cache_dir", "")
+        if asset_cache_dir:
+            self._asset_cache = AssetCache(Utility.resolve_path(asset_cache_dir),
+                                           self.config.get_float("asset_cache_max_size", 20.0))
+        else:
+            self._asset_cache = None
+
+    def _import_with_cache(self, filepath, import_function):
+        """ Imports the given model file via the asset cache, if it is enabled.
+
+        :param filepath: The path to the model file.
+        :param import_function: A function without parameters, which imports and post-processes the model file and
+                                returns the list of created objects.
+        :return: The list of loaded objects.
+        """
+        if self._asset_cache is None:
+            return import_function()
+        variant = "{}|{}".format(self.__class__.__name__, self._import_backend)
+        return self._asset_cache.load(filepath, import_function, variant)
 
     def _set_properties(self, objects: [bpy.types.Object]):
         """ Sets all custom properties of all given objects according to the configuration.
@@ -23,7 +23,7 @@ def run(self):
             raise Exception("Objectloader can not use path and paths in the same module!")
         if self.config.has_param('path'):
             file_path = Utility.resolve_path(self.config.get_string("path"))
-            loaded_objects = Utility.import_objects(filepath=file_path)
+            loaded_objects = Utility.import_objects(filepath=file_path, backend=self._import_backend)
         elif self.config.has_param('paths'):
             file_paths = self.config.get_list('paths')
             loaded_objects = []
@@ -31,7 +31,8 @@ def run(self):
             cache_objects = {}
             for file_path in file_paths:
                 resolved_file_path = Utility.resolve_path(file_path)
-                current_objects = Utility.import_objects(filepath=resolved_file_path, cached_objects=cache_objects)
+                current_objects = Utility.import_objects(filepath=resolved_file_path, cached_objects=cache_objects,
+                                                         backend=self._import_backend)
                 loaded_objects.extend(current_objects)
         else:
             raise Exception("Loader module needs either a path or paths config value")
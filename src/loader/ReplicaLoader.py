@@ -29,7 +29,7 @@ def __init__(self, config):
     def run(self):
         """ Just imports the configured .ply file straight into blender for the replica case. """
         file_path = os.path.join(self.config.get_string('data_path'), self.config.get_string('data_set_name'), 'mesh.ply')
-        loaded_objects = Utility.import_objects(file_path)
+        loaded_objects = Utility.import_objects(file_path, backend=self._import_backend)
 
         # Set the physics property of all imported objects
         self._set_properties(loaded_objects)
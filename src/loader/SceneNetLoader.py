@@ -59,7 +59,7 @@ def run(self):
         Run the module, loads all the objects and set the properties correctly (including the category_id)
         """
         # load the objects
-        loaded_objects = Utility.import_objects(filepath=self._file_path)
+        loaded_objects = Utility.import_objects(filepath=self._file_path, backend=self._import_backend)
         loaded_objects.sort(key=lambda ele: ele.name)
         # sample materials for each object
         self._random_sample_materials_for_each_obj(loaded_objects)
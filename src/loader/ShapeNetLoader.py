@@ -68,9 +68,12 @@ def run(self):
         Uses the loaded .obj files and picks one randomly and loads it
         """
         selected_obj = random.choice(self._files_with_fitting_synset)
-        loaded_obj = Utility.import_objects(selected_obj)
+        def import_and_correct_materials():
+            objects = Utility.import_objects(selected_obj, backend=self._import_backend)
+            self._correct_materials(objects)
+            return objects
 
-        self._correct_materials(loaded_obj)
+        loaded_obj = self._import_with_cache(selected_obj, import_and_correct_materials)
 
         self._set_properties(loaded_obj)
 
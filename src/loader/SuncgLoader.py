@@ -1,5 +1,3 @@
-import csv
-import json
 import math
 import os
 
@@ -9,6 +7,7 @@
 from src.loader.LoaderInterface import LoaderInterface
 from src.utility.Utility import Utility
 from src.utility.LabelIdMapping import LabelIdMapping
+from src.utility.LoaderPlan import SuncgLoaderPlan, CreateEmpty, ImportObject, CreateBox
 
 
 class SuncgLoader(LoaderInterface):
@@ -18,6 +17,9 @@ class SuncgLoader(LoaderInterface):
      - Orders them hierarchically (level -> room -> object)
      - Writes metadata into the custom properties of each object
 
+    All work which does not need blender is done by the SuncgLoaderPlan in a pool of threads, the loader only executes
+    the resulting operations.
+
     **Configuration**:
 
     .. csv-table::
@@ -26,13 +28,19 @@ class SuncgLoader(LoaderInterface):
         "path", "The path to the house.json file which should be loaded. Type: string."
         "suncg_path", "The path to the suncg root directory which should be used for loading objects, rooms, textures "
                       "etc. Type: string. Default: is extracted from the house.json path"
+        "link_duplicates", "If true, objects which are used several times share their mesh data, which saves memory. "
+                           "Changes to the mesh or its materials, e.g. by the SegMapRenderer, then affect all copies. "
+                           "Type: bool. Default: False"
+        "num_worker_threads", "The number of threads which parse the house.json and the category mapping, check the "
+                              "paths of all models and textures and compute the transformations, while the objects "
+                              "are already created in blender. Type: int. Default: 4."
     """
 
     def __init__(self, config):
         LoaderInterface.__init__(self, config)
         self.house_path = Utility.resolve_path(self.config.get_string("path"))
         suncg_folder_path = os.path.join(os.path.dirname(self.house_path), "../..")
-        self.suncg_dir = self.config.get_string("suncg_path", suncg_folder_path)
+        self.suncg_dir = Utility.resolve_path(self.config.get_string("suncg_path", suncg_folder_path))
         self._collection_of_loaded_objs = {}
         # there are only two types of materials, textures and diffuse
         self._collection_of_loaded_mats = {"texture": {}, "diffuse": {}}
@@ -40,74 +48,31 @@ def __init__(self, config):
             'nyu_idset.csv')))
 
     def run(self):
-        with open(Utility.resolve_path(self.house_path), "r") as f:
-            config = json.load(f)
-
-        self._read_model_category_mapping(os.path.join('resources','suncg','Better_labeling_for_NYU.csv'))
+        plan = SuncgLoaderPlan(self.house_path, self.suncg_dir,
+                               Utility.resolve_path(os.path.join('resources', 'suncg', 'Better_labeling_for_NYU.csv')),
+                               LabelIdMapping.label_id_map, self.config.get_int("num_worker_threads", 4))
 
-        house_id = config["id"]
+        # Use the void category as label for the world background
+        bpy.context.scene.world["category_id"] = LabelIdMapping.label_id_map["void"]
 
-        for level in config["levels"]:
-            # Build empty level object which acts as a parent for all rooms on the level
-            level_obj = bpy.data.objects.new("Level#" + level["id"], None)
-            level_obj["type"] = "Level"
-            if "bbox" in level:
-                level_obj["bbox"] = self._correct_bbox_frame(level["bbox"])
-            else:
-                print("Warning: The level with id " + level["id"] + " is missing the bounding box attribute in the given house.json file!")
-            bpy.context.scene.collection.objects.link(level_obj)
-
-            room_per_object = {}
-
-            for node in level["nodes"]:
-                # Skip invalid nodes (This is the same behavior as in the SUNCG Toolbox)
-                if "valid" in node and node["valid"] == 0:
-                    continue
-
-                # Metadata is directly stored in the objects custom data
-                metadata = {
-                    "type": node["type"],
-                    "is_suncg": True
-                }
-
-                if "modelId" in node:
-                    metadata["modelId"] = node["modelId"]
-
-                    if node["modelId"] in self.object_fine_grained_label_map:
-                        metadata["fine_grained_class"] = self.object_fine_grained_label_map[node["modelId"]]
-                        metadata["coarse_grained_class"] = self.object_coarse_grained_label_map[node["modelId"]]
-                        metadata["category_id"] = self._get_label_id(node["modelId"])
-
-                if "bbox" in node:
-                    metadata["bbox"] = self._correct_bbox_frame(node["bbox"])
-
-                if "transform" in node:
-                    transform = Matrix([node["transform"][i*4:(i+1)*4] for i in range(4)])
-                    # Transpose, as given transform matrix was col-wise, but blender expects row-wise
-                    transform.transpose()
-                else:
-                    transform = None
-
-                if "materials" in node:
-                    material_adjustments = node["materials"]
-                else:
-                    material_adjustments = []
-
-                # Lookup if the object belongs to a room
-                object_id = int(node["id"].split("_")[-1])
-                if object_id in room_per_object:
-                    parent = room_per_object[object_id]
-                else:
-                    parent = level_obj
-
-                if node["type"] == "Room":
-                    self._load_room(node, metadata, material_adjustments, transform, house_id, level_obj, room_per_object)
-                elif node["type"] == "Ground":
-                    self._load_ground(node, metadata, material_adjustments, transform, house_id, parent)
-                elif node["type"] == "Object":
-                    self._load_object(node, metadata, material_adjustments, transform, parent)
-                elif node["type"] == "Box":
-                    self._load_box(node, material_adjustments, transform, parent)
+        # maps the keys of the created levels and rooms to their objects
+        parents = {}
+        for operation in plan.operations():
+            parent = parents.get(operation.parent)
+            transform = Matrix(operation.transform) if getattr(operation, "transform", None) is not None else None
+            if isinstance(operation, CreateEmpty):
+                # Build empty level or room object which acts as a parent for all objects inside
+                empty_obj = bpy.data.objects.new(operation.name, None)
+                for key, value in operation.properties.items():
+                    empty_obj[key] = value
+                empty_obj.parent = parent
+                bpy.context.scene.collection.objects.link(empty_obj)
+                parents[operation.key] = empty_obj
+            elif isinstance(operation, ImportObject):
+                self._load_obj(operation.path, operation.properties, operation.material_adjustments, transform, parent)
+            elif isinstance(operation, CreateBox):
+                self._load_box(operation.name, operation.dimensions, operation.material_adjustments, transform,
+                               parent)
         self._rename_materials()
 
     def _rename_materials(self):
@@ -125,101 +90,21 @@ def _rename_materials(self):
                     material.name = textures[0].image.name
 
 
-    def _load_room(self, node, metadata, material_adjustments, transform, house_id, parent, room_per_object):
-        """ Load the room specified in the given node.
-
-        :param node: The node dict which contains information from house.json..
-        :param metadata: A dict of metadata which will be written into the object's custom data.
-        :param material_adjustments: Adjustments to the materials which were specified inside house.json.
-        :param transform: The transformation that should be applied to the loaded objects.
-        :param house_id: The id of the current house.
-        :param parent: The parent object to which the room should be linked
-        :param room_per_object: A dict for object -> room lookup (Will be written into)
-        """
-        # Build empty room object which acts as a parent for all objects inside
-        room_obj = bpy.data.objects.new("Room#" + node["id"], None)
-        room_obj["type"] = "Room"
-        room_obj["bbox"] = self._correct_bbox_frame(node["bbox"])
-        room_obj["roomTypes"] = node["roomTypes"]
-        room_obj.parent = parent
-        bpy.context.scene.collection.objects.link(room_obj)
-        # Store indices of all contained objects in
-        if "nodeIndices" in node:
-            for child_id in node["nodeIndices"]:
-                room_per_object[child_id] = room_obj
-
-        if "hideFloor" not in node or node["hideFloor"] != 1:
-            metadata["type"] = "Floor"
-            metadata["category_id"] = LabelIdMapping.label_id_map["floor"]
-            metadata["fine_grained_class"] = "floor"
-            self._load_obj(os.path.join(self.suncg_dir, "room", house_id, node["modelId"] + "f.obj"), metadata, material_adjustments, transform, room_obj)
-
-        if "hideCeiling" not in node or node["hideCeiling"] != 1:
-            metadata["type"] = "Ceiling"
-            metadata["category_id"] = LabelIdMapping.label_id_map["ceiling"]
-            metadata["fine_grained_class"] = "ceiling"
-            self._load_obj(os.path.join(self.suncg_dir, "room", house_id, node["modelId"] + "c.obj"), metadata, material_adjustments, transform, room_obj)
-
-        if "hideWalls" not in node or node["hideWalls"] != 1:
-            metadata["type"] = "Wall"
-            metadata["category_id"] = LabelIdMapping.label_id_map["wall"]
-            metadata["fine_grained_class"] = "wall"
-            self._load_obj(os.path.join(self.suncg_dir, "room", house_id, node["modelId"] + "w.obj"), metadata, material_adjustments, transform, room_obj)
-
-    def _load_ground(self, node, metadata, material_adjustments, transform, house_id, parent):
-        """ Load the ground specified in the given node.
-
-        :param node: The node dict which contains information from house.json..
-        :param metadata: A dict of metadata which will be written into the object's custom data.
-        :param material_adjustments: Adjustments to the materials which were specified inside house.json.
-        :param transform: The transformation that should be applied to the loaded objects.
-        :param house_id: The id of the current house.
-        :param parent: The parent object to which the ground should be linked
-        """
-        metadata["type"] = "Ground"
-        metadata["category_id"] = LabelIdMapping.label_id_map["floor"]
-        metadata["fine_grained_class"] = "ground"
-        self._load_obj(os.path.join(self.suncg_dir, "room", house_id, node["modelId"] + "f.obj"), metadata, material_adjustments, transform, parent)
-
-    def _load_object(self, node, metadata, material_adjustments, transform, parent):
-        """ Load the object specified in the given node.
-
-        :param node: The node dict which contains information from house.json..
-        :param metadata: A dict of metadata which will be written into the object's custom data.
-        :param material_adjustments: Adjustments to the materials which were specified inside house.json.
-        :param transform: The transformation that should be applied to the loaded objects.
-        :param parent: The parent object to which the ground should be linked
-        """
-        if "state" not in node or node["state"] == 0:
-            self._load_obj(os.path.join(self.suncg_dir, "object", node["modelId"], node["modelId"] + ".obj"), metadata, material_adjustments, transform, parent)
-        else:
-            self._load_obj(os.path.join(self.suncg_dir, "object", node["modelId"], node["modelId"] + "_0.obj"), metadata, material_adjustments, transform, parent)
-
-    def _correct_bbox_frame(self, bbox):
-        """ Corrects the coordinate frame of the given bbox.
-
-        :param bbox: The bbox.
-        :return: The corrected bbox.
-        """
-        return {
-            "min": Utility.transform_point_to_blender_coord_frame(bbox["min"], ["X", "-Z", "Y"]),
-            "max": Utility.transform_point_to_blender_coord_frame(bbox["max"], ["X", "-Z", "Y"])
-        }
-
-    def _load_box(self, node, material_adjustments, transform, parent):
+    def _load_box(self, name, dimensions, material_adjustments, transform, parent):
         """ Creates a cube inside blender which follows the specifications of the given node.
 
-        :param node: The node dict which contains information from house.json..
+        :param name: The name of the box.
+        :param dimensions: The dimensions of the box along the three axes.
         :param material_adjustments: Adjustments to the materials which were specified inside house.json.
         :param transform: The transformation that should be applied to the loaded objects.
         :param parent: The parent object to which the ground should be linked
         """
         bpy.ops.mesh.primitive_cube_add(location=(0, 0, 0))
         box = bpy.context.object
-        box.name = "Box#" + node["id"]
+        box.name = name
         box.matrix_world = Matrix.Identity(4)
         # Scale the cube to the required dimensions
-        box.matrix_world @= Matrix.Scale(node["dimensions"][0] / 2, 4, (1.0, 0.0, 0.0)) @ Matrix.Scale(node["dimensions"][1] / 2, 4, (0.0, 1.0, 0.0)) @ Matrix.Scale(node["dimensions"][2] / 2, 4, (0.0, 0.0, 1.0))
+        box.matrix_world @= Matrix.Scale(dimensions[0] / 2, 4, (1.0, 0.0, 0.0)) @ Matrix.Scale(dimensions[1] / 2, 4, (0.0, 1.0, 0.0)) @ Matrix.Scale(dimensions[2] / 2, 4, (0.0, 0.0, 1.0))
 
         # Create UV mapping (beforehand we apply the scaling from the previous step, such that the resulting uv mapping has the correct aspect)
         bpy.ops.object.transform_apply(scale=True)
@@ -250,29 +135,28 @@ def _load_obj(self, path, metadata, material_adjustments, transform=None, parent
         :param transform: The transformation that should be applied to the loaded objects.
         :param parent: The parent object to which the object should be linked
         """
-        if not os.path.exists(path):
-            print("Warning: " + path + " is missing")
-        else:
-            object_already_loaded = path in self._collection_of_loaded_objs
-            loaded_objects = Utility.import_objects(filepath=path, cached_objects=self._collection_of_loaded_objs)
-            if object_already_loaded:
-                print("Duplicate object: {}".format(path))
-                for object in loaded_objects:
-                    # the original object matrix from the .obj loader -> is not an identity matrix
-                    object.matrix_world = Matrix([[1, 0, 0, 0], [0, 0, -1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
-                    # remove all custom properties
-                    keys = object.keys()
-                    for key in keys:
-                        del object[key]
-            # Go through all imported objects
+        object_already_loaded = path in self._collection_of_loaded_objs
+        loaded_objects = Utility.import_objects(filepath=path, cached_objects=self._collection_of_loaded_objs,
+                                                backend=self._import_backend,
+                                                link_duplicates=self.config.get_bool("link_duplicates", False))
+        if object_already_loaded:
+            print("Duplicate object: {}".format(path))
             for object in loaded_objects:
-                for key in metadata.keys():
-                    object[key] = metadata[key]
-
-                self._transform_and_colorize_object(object, material_adjustments, transform, parent)
-
-            # Set the physics property of all imported objects
-            self._set_properties(bpy.context.selected_objects)
+                # the original object matrix from the .obj loader -> is not an identity matrix
+                object.matrix_world = Matrix([[1, 0, 0, 0], [0, 0, -1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
+                # remove all custom properties
+                keys = object.keys()
+                for key in keys:
+                    del object[key]
+        # Go through all imported objects
+        for object in loaded_objects:
+            for key in metadata.keys():
+                object[key] = metadata[key]
+
+            self._transform_and_colorize_object(object, material_adjustments, transform, parent)
+
+        # Set the physics property of all imported objects
+        self._set_properties(bpy.context.selected_objects)
 
     def _transform_and_colorize_object(self, object, material_adjustments, transform=None, parent=None):
         """ Applies the given transformation to the object and refactors its materials.
@@ -372,7 +256,7 @@ def _adjust_material_nodes(self, mat, adjustments):
         Textures or diffuse colors will be changed according to the given material_adjustments.
 
         :param mat: The blender material.
-        :param adjustments: A dict containing a new "diffuse" color or a new "texture" path
+        :param adjustments: A dict containing a new "diffuse" color or a new "texture" with its "texture_path"
         """
         nodes = mat.node_tree.nodes
 
@@ -381,45 +265,12 @@ def _adjust_material_nodes(self, mat, adjustments):
             principle_node.inputs['Base Color'].default_value = Utility.hex_to_rgba(adjustments["diffuse"])
 
         if "texture" in adjustments:
-            image_path = os.path.join(self.suncg_dir, "texture", adjustments["texture"])
-            image_path = Utility.resolve_path(image_path)
-
-            if os.path.exists(image_path + ".png"):
-                image_path += ".png"
-            else:
-                image_path += ".jpg"
-
+            # the path of the existing .png or .jpg file was already looked up by the plan
+            image_path = adjustments["texture_path"]
             image_node = Utility.get_the_one_node_with_type(nodes, "ShaderNodeTexImage")
-            if os.path.exists(image_path):
+            if image_path is not None:
                 image_node.image = bpy.data.images.load(image_path, check_existing=True)
             else:
-                print("Warning: Cannot load texture, path does not exist: {}, remove image node again".format(image_path))
+                print("Warning: Cannot load texture, path does not exist: {}, remove image node again".format(
+                    os.path.join(self.suncg_dir, "texture", adjustments["texture"])))
                 nodes.remove(image_node)
-
-    def _read_model_category_mapping(self, path):
-        """ Reads in the model category mapping csv.
-
-        :param path: The path to the csv file.
-        """
-        self.windows = []       
-        self.object_label_map = {}      
-        self.object_fine_grained_label_map = {}
-        self.object_coarse_grained_label_map = {}              
-        
-        with open(Utility.resolve_path(path), 'r') as csvfile:      
-            reader = csv.DictReader(csvfile)        
-            for row in reader:      
-                self.object_label_map[row["model_id"]] = row["nyuv2_40class"]       
-                self.object_fine_grained_label_map[row["model_id"]] = row["fine_grained_class"]     
-                self.object_coarse_grained_label_map[row["model_id"]] = row["coarse_grained_class"]     
-        
-        # Use the void category as label for the world background
-        bpy.context.scene.world["category_id"] = LabelIdMapping.label_id_map["void"]
-
-    def _get_label_id(self, obj_id):
-        """ Returns the label id for an object with the given model_id.
-
-        :param obj_id: The model_id of the object.
-        :return: The corresponding label index.
-        """
-        return LabelIdMapping.label_id_map[self.object_label_map[obj_id]]
@@ -1,7 +1,6 @@
 import math
 
 import bpy
-import h5py
 import mathutils
 import numpy as np
 
@@ -39,6 +38,7 @@ def run(self):
 
         path_to_hdf5 = Utility.resolve_path(self.config.get_string("path_to_hdf5"))
         data = {}
+        import h5py
         with h5py.File(path_to_hdf5, "r") as file:
             for key in file.keys():
                 data[key] = np.array(file[key])
@@ -54,6 +54,34 @@ def init_global(global_config):
                 raise RuntimeError("This key was already found in the global config: {} it is also used internally, "
                                    "please use another key!".format(key))
 
+    @staticmethod
+    def reset():
+        """
+        Removes all stored values and the global config, this is necessary if several pipelines are run one after
+        another inside the same blender process (e.g. by a batch worker).
+        """
+        GlobalStorage._storage_dict = {}
+        GlobalStorage._global_config = None
+        GlobalStorage._add_to_global_config_at_init = {}
+
+    @staticmethod
+    def get_storage_snapshot():
+        """
+        Returns a copy of all values stored via add() and set(), which can be restored later on, e.g. to run modules
+        several times (composite.Repeat). The values itself are not copied.
+        :return the snapshot, which can be given to restore_storage_snapshot()
+        """
+        return dict(GlobalStorage._storage_dict)
+
+    @staticmethod
+    def restore_storage_snapshot(snapshot):
+        """
+        Replaces all values stored via add() and set() with the ones of the given snapshot. The global config is
+        not changed.
+        :param snapshot a snapshot returned by get_storage_snapshot()
+        """
+        GlobalStorage._storage_dict = dict(snapshot)
+
     @staticmethod
     def add_to_config_before_init(key, value):
         """
@@ -42,7 +42,8 @@ def __init__(self, config):
         # call the init again to make sure all values from the global config where read correctly, too
         self._default_init()
 
-    def run(self):
+    def _configure_compute_device(self):
+        """ Uses cycles and selects the fastest available compute device. """
         prefs = bpy.context.preferences.addons['cycles'].preferences
         # Use cycles
         bpy.context.scene.render.engine = 'CYCLES'
@@ -71,6 +72,14 @@ def run(self):
                 for d in group:
                     d.use = True
 
+    def restore_from_checkpoint(self):
+        # the compute device is stored in the preferences and the random state is not stored at all
+        self._configure_compute_device()
+        self._set_random_seed()
+
+    def run(self):
+        self._configure_compute_device()
+
         # setting the frame end, will be changed by the camera loader modules
         bpy.context.scene.frame_end = 0
 
@@ -84,6 +93,10 @@ def run(self):
         bpy.context.scene.collection.objects.link(cam_ob)
         bpy.context.scene.camera = cam_ob
 
+        self._set_random_seed()
+
+    def _set_random_seed(self):
+        """ Seeds random and numpy random, if the BLENDER_PROC_RANDOM_SEED environment variable is set. """
         random_seed = os.getenv("BLENDER_PROC_RANDOM_SEED")
         if random_seed:
             print("Got random seed: {}".format(random_seed))
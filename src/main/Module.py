@@ -30,6 +30,19 @@ class Module:
        "temp_dir", "The path to a directory where all temporary output files should be stored. If it doesn't exist,"
                    "it is created automatically. Type: string. Default: "/dev/shm" or "/tmp/" depending on what"
                    "is available for Linux and MacOS, and "<env:TEMP>" for Windows."
+       "performance_trace", "If True, the wall time, cpu time, peak memory usage, number of datablocks and produced "
+                            "frames of this module are written to performance_trace.jsonl and "
+                            "performance_trace.json (chrome://tracing or perfetto) in the output_dir. Type: bool. "
+                            "Default: False."
+       "profile", "If True, the run() of this module is profiled with cProfile. The results are written to "
+                  "profile_<index>_<module>.prof and profile_<index>_<module>.collapsed.txt (collapsed stacks, e.g. "
+                  "for flamegraph.pl or speedscope) in the output_dir. Type: bool. Default: False."
+       "checkpoint", "If True, the scene is saved as .blend file after this module. Later runs, in which all modules up "
+                     "to this one have the same configs and input files, load this file and start with the next "
+                     "module. The modules before the checkpoint should therefore not write any files which are needed "
+                     "later on. Type: bool. Default: False."
+       "checkpoint_dir", "The directory in which the checkpoints are stored. Type: string. "
+                         "Default: <output_dir>/checkpoints."
     """
 
     def __init__(self, config):
@@ -120,3 +133,10 @@ def _output_already_registered(self, output, output_list):
                                 .format(_output["key"], _output["path"], output["key"], output["path"]))
 
         return False
+
+    def restore_from_checkpoint(self):
+        """ Is called instead of run(), if the scene after this module was loaded from a checkpoint.
+
+        Only modules which change state, that is not stored in a .blend file (e.g. the preferences), have to override it.
+        """
+        pass
@@ -1,14 +1,20 @@
 
 import shutil
 import os
-import bpy
 
 from src.utility.ConfigParser import ConfigParser
 from src.utility.Utility import Utility, Config
 from src.main.GlobalStorage import GlobalStorage
+from src.utility.ModuleProfiler import ModuleProfiler
+from src.utility.PerformanceTrace import PerformanceTrace
+from src.utility.SceneCheckpoint import SceneCheckpoint
+from src.utility.SceneReset import SceneReset
 
 class Pipeline:
 
+    # the pipeline which is currently running, used to run the modules of composite modules
+    _running_pipeline = None
+
     def __init__(self, config_path, args, working_dir, should_perform_clean_up=True, avoid_rendering=False):
         """
         Inits the pipeline, by calling the constructors of all modules mentioned in the config.
@@ -38,56 +44,113 @@ def __init__(self, config_path, args, working_dir, should_perform_clean_up=True,
         self._temp_dir = Utility.get_temporary_directory(config_object)
         os.makedirs(self._temp_dir, exist_ok=True)
 
+        # has to be computed before the modules are initialized, as they might replace config values with providers
+        self._prefix_hashes = SceneCheckpoint.compute_prefix_hashes(config["modules"])
         self.modules = Utility.initialize_modules(config["modules"])
+        Utility.print_import_timings()
 
 
     def _cleanup(self):
-        """ Cleanup the scene by removing objects, orphan data and custom properties """
-        self._remove_all_objects()
-        self._remove_orphan_data()
-        self._remove_custom_properties()
-
-    def _remove_all_objects(self):
-        """ Removes all objects of the current scene """
-        # Select all
-        for obj in bpy.context.scene.objects:
-            obj.select_set(True)
-        # Delete selection
-        bpy.ops.object.delete()
-
-    def _remove_orphan_data(self):
-        """ Remove all data blocks which are not used anymore. """
-        data_structures = [
-            bpy.data.meshes,
-            bpy.data.materials,
-            bpy.data.textures,
-            bpy.data.images,
-            bpy.data.brushes,
-            bpy.data.cameras,
-            bpy.data.actions,
-            bpy.data.lights
-        ]
-
-        for data_structure in data_structures:
-            for block in data_structure:
-                # If no one uses this block => remove it
-                if block.users == 0:
-                    data_structure.remove(block)
-
-    def _remove_custom_properties(self):
-        """ Remove all custom properties registered at global entities like the scene. """
-        for key in bpy.context.scene.keys():
-            del bpy.context.scene[key]
-    
+        """ Cleanup the scene by removing all datablocks and custom properties, see SceneReset. """
+        SceneReset.reset()
+
     def _clean_up_temp_dir(self):
         """ Cleans up temporary directory """
         if self._do_clean_up_temp_dir:
             shutil.rmtree(self._temp_dir)
 
+    def _run_module(self, module, profile_name):
+        """ Runs the given module and measures its execution time.
+
+        If "performance_trace" is set to True (directly or in the global config) the module is measured in detail, see
+        PerformanceTrace. If "profile" is set to True it is profiled, see ModuleProfiler.
+
+        :param module: The module to run.
+        :param profile_name: Distinguishes the profile files of the modules, e.g. "03_RgbRenderer".
+        """
+        with Utility.BlockStopWatch("Running module " + module.__class__.__name__):
+            if module.config.get_bool("performance_trace", False):
+                with self._performance_trace.measure(module):
+                    self._profile_module(module, profile_name)
+            else:
+                self._profile_module(module, profile_name)
+
+    def _profile_module(self, module, profile_name):
+        """ Runs the given module, if "profile" is set to True (directly or in the global config) it is profiled.
+
+        :param module: The module to run.
+        :param profile_name: Distinguishes the profile files of the modules.
+        """
+        if module.config.get_bool("profile", False):
+            with ModuleProfiler(os.path.join(module._output_dir, "profile_" + profile_name)):
+                module.run()
+        else:
+            module.run()
+
+    @staticmethod
+    def run_nested_module(module, profile_name):
+        """ Runs a module of a composite module, e.g. composite.Repeat, with the same measurements as the modules of
+        the pipeline itself.
+
+        :param module: The module to run.
+        :param profile_name: Distinguishes the profile files of the modules.
+        """
+        if Pipeline._running_pipeline is not None:
+            Pipeline._running_pipeline._run_module(module, profile_name)
+        else:
+            # e.g. if the composite module is run directly inside of blender
+            with Utility.BlockStopWatch("Running module " + module.__class__.__name__):
+                module.run()
+
+    def _get_checkpoint(self, index, module):
+        """ Returns the checkpoint of the scene after the given module or None, if the module is not marked as one.
+
+        :param index: The position of the module in the modules list.
+        :param module: The module.
+        :return: The SceneCheckpoint or None.
+        """
+        if not module.config.get_bool("checkpoint", False):
+            return None
+        checkpoint_dir = module.config.get_string("checkpoint_dir", os.path.join(module._output_dir, "checkpoints"))
+        return SceneCheckpoint(Utility.resolve_path(checkpoint_dir), self._prefix_hashes[index])
+
+    def _restore_latest_checkpoint(self):
+        """ Loads the latest existing checkpoint of this pipeline.
+
+        :return: The index of the first module which still has to be run.
+        """
+        for index in reversed(range(len(self.modules))):
+            checkpoint = self._get_checkpoint(index, self.modules[index])
+            if checkpoint is not None and checkpoint.exists():
+                with Utility.BlockStopWatch("Loading checkpoint after module " + self.modules[index].__class__.__name__):
+                    checkpoint.load()
+                    for module in self.modules[:index + 1]:
+                        module.restore_from_checkpoint()
+                return index + 1
+        return 0
+
     def run(self):
-        """ Runs each module and measuring their execution time. """
-        with Utility.BlockStopWatch("Running blender pipeline"):
-            for module in self.modules:
-                with Utility.BlockStopWatch("Running module " + module.__class__.__name__):
-                    module.run()
-            self._clean_up_temp_dir()
+        """ Runs each module and measuring their execution time.
+
+        Modules with "performance_trace" set to True (directly or in the global config) are additionally measured in
+        detail, see PerformanceTrace.
+
+        If a checkpoint of a leading part of the pipeline exists, it is loaded and only the remaining modules are run,
+        see SceneCheckpoint.
+        """
+        self._performance_trace = PerformanceTrace()
+        Pipeline._running_pipeline = self
+        try:
+            with Utility.BlockStopWatch("Running blender pipeline"):
+                start_index = self._restore_latest_checkpoint()
+                for index, module in enumerate(self.modules):
+                    if index < start_index:
+                        continue
+                    self._run_module(module, "{:02d}_{}".format(index, module.__class__.__name__))
+                    checkpoint = self._get_checkpoint(index, module)
+                    if checkpoint is not None:
+                        checkpoint.save()
+                self._clean_up_temp_dir()
+        finally:
+            Pipeline._running_pipeline = None
+            self._performance_trace.write_trace_files()
@@ -1,7 +1,9 @@
 import bpy
 
 from src.main.Module import Module
-from src.utility.BlenderUtility import check_intersection, check_bb_intersection, get_all_mesh_objects
+from src.utility.BlenderUtility import check_intersection, get_all_mesh_objects
+from src.utility.MeshGeometryCache import MeshGeometryCache
+from src.utility.SpatialHashGrid import SpatialHashGrid
 
 
 class ObjectPoseSampler(Module):
@@ -57,14 +59,14 @@ def run(self):
         2. If no collisions are found keep the point.
         """
         # While we have objects remaining and have not run out of tries - sample a point
-        # List of successfully placed objects
-        placed = []
         # After this many tries we give up on current object and continue with the rest
         max_tries = self.config.get_int("max_iterations", 1000)
         objects = self.config.get_list("objects_to_sample", get_all_mesh_objects())
+        # Grid of successfully placed objects, used to only check objects with overlapping bounding boxes
+        placed = SpatialHashGrid(SpatialHashGrid.cell_size_for_objects(objects))
 
-        # cache to fasten collision detection
-        cache = {}
+        # cache to fasten collision detection, it keeps the geometry of each mesh over all tries
+        cache = MeshGeometryCache()
 
         # for every selected object
         for obj in objects:
@@ -89,14 +91,10 @@ def run(self):
                     bpy.context.view_layer.update()
                     no_collision = True
 
-                    # Now check for collisions
-                    for already_placed in placed:
-                        # First check if bounding boxes collides
-                        intersection = check_bb_intersection(obj, already_placed)
-                        # if they do
-                        if intersection:
-                            # then check for more refined collisions
-                            intersection, cache = check_intersection(obj, already_placed)
+                    # Now check for collisions with all objects whose bounding boxes collide
+                    for already_placed in placed.query_overlapping(obj):
+                        # then check for more refined collisions
+                        intersection, cache = check_intersection(obj, already_placed, cache)
 
                         if intersection:
                             no_collision = False
@@ -105,7 +103,7 @@ def run(self):
                     # If no collision then keep the position, else: reset
                     if no_collision:
                         print("No collision detected, moving forward!")
-                        placed.append(obj)
+                        placed.insert(obj)
                         # then stop trying and keep assigned position and orientation
                         break
                     # if any collisions then reset object to initial state
@@ -3,6 +3,7 @@
 
 from src.main.Module import Module
 from src.utility.BlenderUtility import check_intersection, check_bb_intersection, duplicate_objects, get_all_mesh_objects
+from src.utility.MeshGeometryCache import MeshGeometryCache
 
 
 class ObjectReplacer(Module):
@@ -75,13 +76,15 @@ def _two_points_distance(point1, point2):
         obj_to_add.rotation_euler = obj_to_remove.rotation_euler
         if scale:
             obj_to_add.scale = _bb_ratio(obj_to_remove.bound_box, obj_to_add.bound_box)
+        # the collision checks use the world matrix of the object
+        bpy.context.view_layer.update()
 
         # Check for collision between the new object and other objects in the scene
         for obj in get_all_mesh_objects(): # for each object
 
             if obj != obj_to_add and obj_to_remove != obj and obj not in self._ignore_collision_with:
                 if check_bb_intersection(obj, obj_to_add):
-                    if check_intersection(obj, obj_to_add)[0]:
+                    if check_intersection(obj, obj_to_add, self._geometry_cache)[0]:
                         return False
         return True
 
@@ -95,6 +98,8 @@ def run(self):
         self._objects_to_be_replaced = self.config.get_list("objects_to_be_replaced", [])
         self._objects_to_replace_with = self.config.get_list("objects_to_replace_with", [])
         self._ignore_collision_with = self.config.get_list("ignore_collision_with", [])
+        # cache to fasten collision detection, the objects in the scene do not move between tries
+        self._geometry_cache = MeshGeometryCache()
 
         # Hide new objects from renderers until they are added
         for obj in self._objects_to_replace_with:
@@ -132,6 +137,7 @@ def run(self):
 
                 # Delete the original object and remove it from the list
                 self._objects_to_replace_with.remove(current_object_to_replace_with)
+                self._geometry_cache.remove_object(current_object_to_replace_with)
                 bpy.ops.object.select_all(action='DESELECT')
                 current_object_to_replace_with.select_set(True)
                 bpy.ops.object.delete()
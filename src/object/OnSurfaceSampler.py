@@ -2,7 +2,9 @@
 import mathutils
 
 from src.main.Module import Module
-from src.utility.BlenderUtility import check_intersection, check_bb_intersection, get_bounds
+from src.utility.BlenderUtility import check_intersection, get_bounds
+from src.utility.MeshGeometryCache import MeshGeometryCache
+from src.utility.SpatialHashGrid import SpatialHashGrid
 
 
 class OnSurfaceSampler(Module):
@@ -42,6 +44,10 @@ def __init__(self, config):
         self.max_distance = config.get_float("max_distance", 0.6)
 
         self.placed_objects = []
+        # broad phase index over the placed objects, it is created in run()
+        self.placed_objects_grid = None
+        # cache to fasten collision detection, it keeps the geometry of each mesh over all tries
+        self.geometry_cache = MeshGeometryCache()
         self.surface = None
         self.surface_height = None
 
@@ -70,29 +76,13 @@ def check_spacing(self, obj):
         :param obj: Object for which the check is carried out. Type: blender object.
         :return:
         """
-        closest_distance = None
+        if len(self.placed_objects_grid) == 0:
+            return True
 
-        for already_placed in self.placed_objects:
-            distance = (already_placed.location - obj.location).length
-            if closest_distance is None or distance < closest_distance:
-                closest_distance = distance
+        # only objects closer than max_distance are returned
+        closest_distance = self.placed_objects_grid.nearest_distance(obj.location, self.max_distance)
 
-        return closest_distance is None or (self.min_distance <= closest_distance <= self.max_distance)
-
-    @staticmethod
-    def collision(first_obj, second_obj):
-        """ Checks if two object intersect.
-
-        :param first_obj: The first object for which the check is carried out. Type: blender object.
-        :param second_obj: The second object for which the check is carried out. Type: blender Object.
-        :return: True if objects are intersecting, if not - False.
-        """
-        intersection = check_bb_intersection(first_obj, second_obj)
-        if intersection:
-            # check for more refined collisions
-            intersection, cache = check_intersection(first_obj, second_obj)
-
-        return intersection
+        return closest_distance is not None and self.min_distance <= closest_distance
 
     def check_collision_free(self, obj):
         """ Checks if the object collides with none of the previously placed objects.
@@ -100,8 +90,9 @@ def check_collision_free(self, obj):
         :param obj: Object for which the check is carried out. Type: blender object.
         :return: True if object is collision free, if not - False.
         """
-        for already_placed in self.placed_objects:
-            if self.collision(obj, already_placed):
+        # only objects with overlapping bounding boxes can collide
+        for already_placed in self.placed_objects_grid.query_overlapping(obj):
+            if check_intersection(obj, already_placed, self.geometry_cache)[0]:
                 return False
 
         return True
@@ -129,6 +120,8 @@ def run(self):
         else:
             self.surface = self.surface[0]
 
+        self.placed_objects_grid = SpatialHashGrid(SpatialHashGrid.cell_size_for_objects(objects))
+
         surface_bounds = get_bounds(self.surface)
         self.surface_height = max([self.up_direction.dot(corner) for corner in surface_bounds])
 
@@ -145,6 +138,8 @@ def run(self):
 
                     obj.location = position
                     obj.rotation_euler = rotation
+                    # the collision checks use the world matrix of the object
+                    bpy.context.view_layer.update()
 
                     if not self.check_collision_free(obj):
                         print("Collision detected, retrying!")
@@ -155,6 +150,7 @@ def run(self):
                         continue
 
                     self.drop(obj)
+                    bpy.context.view_layer.update()
 
                     if not self.check_above_surface(obj):
                         print("Not above surface after drop, retrying!")
@@ -171,12 +167,14 @@ def run(self):
                     print("Placed object \"{}\" successfully at {} after {} iterations!".format(obj.name, obj.location,
                                                                                                 i + 1))
                     self.placed_objects.append(obj)
+                    self.placed_objects_grid.insert(obj)
 
                     placed_successfully = True
                     break
 
                 if not placed_successfully:
                     print("Giving up on {}, deleting...".format(obj.name))
+                    self.geometry_cache.remove_object(obj)
                     bpy.ops.object.select_all(action='DESELECT')
                     obj.select_set(True)
                     bpy.ops.object.delete()
@@ -12,60 +12,49 @@ class NoiseRemoval(Module):
     def __init__(self, config):
         Module.__init__(self, config)
 
-    def _get_neighbors(self, data, i, j):
-        """ Returns the valid neighbor pixel indices of the given pixel.
+    def _get_neighbor_min(self, data):
+        """ Returns the smallest value in the 3x3 neighborhood of each pixel, the pixel itself is not considered.
 
-        :param data: The whole image data.
-        :param i: The row index of the pixel
-        :param j: The col index of the pixel.
-        :return: A list of neighbor point indices.
-        """
-        neighbors = []
-        for p in range(max(0, i - 1), min(data.shape[0], i + 2)):
-            for q in range(max(0, j - 1), min(data.shape[1], j + 2)):
-                if not (p == i and q == j):  # We don't want the current pixel, just the neighbors
-                    neighbors.append([p, q])
-
-        return np.array(neighbors)
-
-    def _remove_noise(self, image, noise_indices):
+        The neighbors are represented by shifted views of a padded copy of the data, the padding uses the biggest
+        possible value, so pixels outside of the image are never selected.
 
+        :param data: The 2D image data.
+        :return: An array with the same shape as data.
         """
-
-        A function that takes an image and a few 2D indices, where these indices correspond to pixel values in
-        segmentation maps, where these values are not real labels, but some deviations from the real labels, that were g
-        enerated as a result of Blender doing some interpolation, smooting, or other numerical operations.
-
-        Parameters
-        ----------
-        image: ndarray of the .exr segmap
-        noise_indices: a list of 2D indices that correspond to the noisy pixels. One criteria of finding these pixels
-        is to use a histogram and find the pixels with
-        frequencies lower than a threshold, e.g. 100.
+        rows, cols = data.shape
+        max_value = np.iinfo(data.dtype).max
+        padded = np.pad(data, 1, mode="constant", constant_values=max_value)
+        neighbor_min = np.full(data.shape, max_value, dtype=data.dtype)
+        for p in range(-1, 2):
+            for q in range(-1, 2):
+                if not (p == 0 and q == 0):  # We don't want the current pixel, just the neighbors
+                    np.minimum(neighbor_min, padded[1 + p:1 + p + rows, 1 + q:1 + q + cols], out=neighbor_min)
+        return neighbor_min
+
+    def _remove_noise(self, image, noise_mask):
+        """ Replaces all noisy pixels with the smallest value found in their 3x3 neighborhood.
+
+        The noisy pixels correspond to values in the segmentation maps, which are not real labels, but some deviations
+        from the real labels, that were generated as a result of Blender doing some interpolation, smoothing, or other
+        numerical operations.
+
+        All noisy pixels are processed at once, so the neighbor values are always taken from the input image.
+
+        :param image: The int32 segmap of shape [H, W, C].
+        :param noise_mask: A bool mask of shape [H, W, C], which is True for noisy values. One criteria of finding
+                           these pixels is to use a histogram and find the pixels with frequencies lower than a
+                           threshold, e.g. 100.
+        :return: The image with all noisy pixels replaced.
         """
+        noisy_pixels = np.any(noise_mask, axis=2)
+        if not np.any(noisy_pixels):
+            return image
 
-        for index in noise_indices:
-            neighbors = self._get_neighbors(image, index[0], index[1])  # Extracting the indices surrounding 3x3 neighbors
-            curr_val = image[index[0]][index[1]][0]  # Current value of the noisy pixel
-
-            neighbor_vals = [image[neighbor[0]][neighbor[1]] for neighbor in neighbors]  # Getting the values of the neighbors
-            neighbor_vals = np.unique(np.array([np.array(index) for index in neighbor_vals]))  # Getting the unique values only
-
-            min = 10000000000
-            min_idx = 0
-
-            # Here we iterate through the unique values of the neighbor and find the one closest to the current noisy value
-            for idx, n in enumerate(neighbor_vals):
-                # Is this closer than the current closest value?
-                if n - curr_val <= min:
-                    # If so, update
-                    min = n - curr_val
-                    min_idx = idx
-
-            # Now that we have found the closest value, assign it to the noisy value
-            new_val = neighbor_vals[min_idx]
-            image[index[0]][index[1]] = np.array([new_val, new_val, new_val])
+        # The smallest neighbor value over all neighbors and channels
+        neighbor_min = self._get_neighbor_min(np.min(image, axis=2))
 
+        image = image.copy()
+        image[noisy_pixels] = neighbor_min[noisy_pixels][:, np.newaxis]
         return image
 
     def _isin(self, element, test_elements, assume_unique=False, invert=False):
@@ -84,13 +73,13 @@ def run(self, image, key, version):
         # that should remove some noise or deviations
         image = ((image * 37) / (65536))  # assuming 16 bit color depth
         image = image.astype(np.int32)
+        if len(image.shape) == 2:
+            image = image[:, :, np.newaxis]
         b, counts = np.unique(image.flatten(), return_counts=True)
 
         # Removing further noise where there are some stray pixel values with very small counts, by assigning them to
-        # their closest (numerically, since this deviation is a
-        # result of some numerical operation) neighbor.
-        hist = sorted((np.asarray((b, counts)).T), key=lambda x: x[1])
-        noise_vals = [h[0] for h in hist if h[1] <= 100]  # Assuming the stray pixels wouldn't have a count of more than 100
-        noise_indices = np.argwhere(self._isin(image, noise_vals))
+        # a neighbor value (this deviation is a result of some numerical operation).
+        noise_vals = b[counts <= 100]  # Assuming the stray pixels wouldn't have a count of more than 100
+        noise_mask = self._isin(image, noise_vals)
 
-        return self._remove_noise(image, noise_indices), key, version
+        return self._remove_noise(image, noise_mask), key, version
@@ -1,6 +1,4 @@
-import cv2
 import numpy as np
-from scipy import stats
 
 from src.main.Module import Module
 
@@ -54,6 +52,10 @@ def __init__(self, config):
         Module.__init__(self, config)
 
     def run(self, image, key, version):
+        # cv2 and scipy are only imported, if the filter is actually used
+        import cv2
+        from scipy import stats
+
         filter_size = self.config.get_int("filter_size", 5)
         edges_only = self.config.get_bool("edges_only", True)
 
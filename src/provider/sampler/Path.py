@@ -1,13 +1,17 @@
-from glob import glob
-from random import choice
+import os
+import random
 
 from src.main.Provider import Provider
+from src.utility.PathIndex import PathIndex
 from src.utility.Utility import Utility
 
 
 class Path(Provider):
     """ Samples a path to one of the files in folder defined by a path.
 
+    The list of matching files is computed only once per pattern and then reused for every sample, optionally it is
+    also stored in a cache file, so it can be reused by later runs, see PathIndex.
+
         Example 1: return a path to a random .obj file in the defined folder.
 
         {
@@ -15,16 +19,64 @@ class Path(Provider):
           "path": "/home/path/to/folder/*.obj"
         }
 
+        Example 2: return the paths of ShapeNet models, first chooses a category (the first folder below the root
+        of the pattern) with equal probability, chairs twice as often as other categories, and never returns the same
+        model twice until all models of this category have been used. The file index is stored in a cache file.
+
+        {
+          "provider": "sampler.Path",
+          "path": "/home/path/to/ShapeNet/*/*/models/model_normalized.obj",
+          "index_cache_file": "/home/path/to/ShapeNet/path_index.json",
+          "strata_level": 0,
+          "strata_weights": {"03001627": 2.0},
+          "replacement": False
+        }
+
     **Configuration**:
 
     .. csv-table::
         :header: "Parameter", "Description"
 
         "path", "A path to a folder containing files. Type: string."
+        "index_cache_file", "Path to a json file, in which the list of matching files is stored and reused across runs. "
+                            "An entry is invalidated if the modification time of the root folder of the path (the part "
+                            "without wildcards) changes. Type: string. Default: no cache file."
+        "replacement", "If False, a path is only returned again after all other paths (of its stratum) have been "
+                       "returned. Type: bool. Default: True."
+        "strata_level", "If set, the paths are grouped by the name of their folder at this depth below the root "
+                        "folder of the path, 0 is the first folder. A group is chosen first and then a path inside it, "
+                        "so every group is sampled equally often, independent of its size. Type: int. Default: -1, "
+                        "which means no grouping."
+        "strata_weights", "Maps group names to their sampling weight, groups which are not listed have a weight of 1. "
+                          "Only used together with strata_level. Type: dict. Default: {}."
     """
 
     def __init__(self, config):
         Provider.__init__(self, config)
+        # maps a resolved path pattern to its strata
+        self._strata = {}
+        # maps a pattern and stratum name to the paths which have not been returned yet, if sampling without replacement
+        self._unused_paths = {}
+
+    def _get_strata(self, path, paths):
+        """ Groups the given paths by the name of their folder at the configured strata level.
+
+        :param path: The resolved glob pattern.
+        :param paths: All paths matching the pattern.
+        :return: A dict mapping each stratum name to its paths.
+        """
+        strata_level = self.config.get_int("strata_level", -1)
+        if strata_level < 0:
+            return {"": paths}
+
+        root_dir = PathIndex.get_root_dir(path)
+        strata = {}
+        for matched_path in paths:
+            folders = os.path.relpath(matched_path, root_dir).split(os.sep)[:-1]
+            if strata_level >= len(folders):
+                raise Exception("The path {} has no folder at strata level {}".format(matched_path, strata_level))
+            strata.setdefault(folders[strata_level], []).append(matched_path)
+        return strata
 
     def run(self):
         """ Samples a path to an object.
@@ -34,10 +86,29 @@ def run(self):
         # get path to folder
         path = Utility.resolve_path(self.config.get_string("path"))
 
-        # get list of paths
-        paths = glob(path)
+        # get list of paths, grouped into strata
+        if path not in self._strata:
+            paths = PathIndex.get_paths(path, self.config.get_string("index_cache_file", ""))
+            if not paths:
+                raise Exception("No file matches the path: {}".format(path))
+            self._strata[path] = self._get_strata(path, paths)
+        strata = self._strata[path]
+
+        # chose a stratum
+        if len(strata) > 1:
+            strata_weights = self.config.get_raw_dict("strata_weights", {})
+            names = sorted(strata.keys())
+            stratum = random.choices(names, weights=[float(strata_weights.get(name, 1.0)) for name in names])[0]
+        else:
+            stratum = next(iter(strata))
 
-        # chose a random one
-        chosen_path = choice(paths)
+        # chose a random path inside of it
+        if self.config.get_bool("replacement", True):
+            chosen_path = random.choice(strata[stratum])
+        else:
+            if not self._unused_paths.get((path, stratum)):
+                self._unused_paths[(path, stratum)] = list(strata[stratum])
+                random.shuffle(self._unused_paths[(path, stratum)])
+            chosen_path = self._unused_paths[(path, stratum)].pop()
 
         return chosen_path
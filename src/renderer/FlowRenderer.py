@@ -73,6 +73,51 @@ def _output_vector_field(self):
             bwd_flow_output_file.file_slots.values()[0].path = "bwd_flow_"
             links.new(combine_bwd_flow.outputs['Image'], bwd_flow_output_file.inputs['Image'])
 
+    def _save_flow_files(self):
+        """ Converts the rendered vector fields of all frames into forward and backward optical flow and saves them. """
+        get_forward_flow = self.config.get_bool('forward_flow', False)
+        get_backward_flow = self.config.get_bool('backward_flow', False)
+        temporary_fwd_flow_file_path = os.path.join(self._temp_dir, 'fwd_flow_')
+        temporary_bwd_flow_file_path = os.path.join(self._temp_dir, 'bwd_flow_')
+
+        for frame in range(bpy.context.scene.frame_start, bpy.context.scene.frame_end):
+            # temporarily save respective vector fields
+            if get_forward_flow:
+
+                file_path = temporary_fwd_flow_file_path + "%04d" % frame + ".exr"
+                fwd_flow_field = load_image(file_path, num_channels=4).astype(np.float32)
+
+                if not self.config.get_bool('blender_image_coordinate_style', False):
+                    fwd_flow_field[:, :, 1] = fwd_flow_field[:, :, 1] * -1
+
+                fname = os.path.join(self._determine_output_dir(),
+                                     self.config.get_string('forward_flow_output_file_prefix',
+                                                            'forward_flow_')) + '%04d' % frame
+                forward_flow = fwd_flow_field * -1  # invert forward flow to point at next frame
+                np.save(fname + '.npy', forward_flow[:, :, :2])
+
+            if get_backward_flow:
+                file_path = temporary_bwd_flow_file_path + "%04d" % frame + ".exr"
+                bwd_flow_field = load_image(file_path, num_channels=4).astype(np.float32)
+
+                if not self.config.get_bool('blender_image_coordinate_style', False):
+                    bwd_flow_field[:, :, 1] = bwd_flow_field[:, :, 1] * -1
+
+                fname = os.path.join(self._determine_output_dir(),
+                                     self.config.get_string('backward_flow_output_file_prefix', 'backward_flow_')) + '%04d' % frame
+                np.save(fname + '.npy', bwd_flow_field[:, :, :2])
+
+    def _register_flow_outputs(self):
+        """ Registers the forward and backward optical flow outputs, which were requested. """
+        if self.config.get_bool('forward_flow', False):
+            self._register_output(default_prefix=self.config.get_string('forward_flow_output_file_prefix', 'forward_flow_'),
+                                  default_key=self.config.get_string("forward_flow_output_key", "forward_flow"),
+                                  suffix='.npy', version='2.0.0')
+        if self.config.get_bool('backward_flow', False):
+            self._register_output(default_prefix=self.config.get_string('backward_flow_output_file_prefix', 'backward_flow_'),
+                                  default_key=self.config.get_string("backward_flow_output_key", "backward_flow"),
+                                  suffix='.npy', version='2.0.0')
+
     def run(self):
         # determine whether to get optical flow or scene flow - get scene flow per default
         get_forward_flow = self.config.get_bool('forward_flow', False)
@@ -87,45 +132,12 @@ def run(self):
             self._output_vector_field()
 
             # only need to render once; both fwd and bwd flow will be saved
-            temporary_fwd_flow_file_path = os.path.join(self._temp_dir, 'fwd_flow_')
             temporary_bwd_flow_file_path = os.path.join(self._temp_dir, 'bwd_flow_')
             self._render("bwd_flow_", custom_file_path=temporary_bwd_flow_file_path)
 
             # After rendering: convert to optical flow or calculate hsv visualization, if desired
             if not self._avoid_rendering:
-                for frame in range(bpy.context.scene.frame_start, bpy.context.scene.frame_end):
-                    # temporarily save respective vector fields
-                    if get_forward_flow:
-
-                        file_path = temporary_fwd_flow_file_path + "%04d" % frame + ".exr"
-                        fwd_flow_field = load_image(file_path, num_channels=4).astype(np.float32)
-
-                        if not self.config.get_bool('blender_image_coordinate_style', False):
-                            fwd_flow_field[:, :, 1] = fwd_flow_field[:, :, 1] * -1
-
-                        fname = os.path.join(self._determine_output_dir(),
-                                             self.config.get_string('forward_flow_output_file_prefix',
-                                                                    'forward_flow_')) + '%04d' % frame
-                        forward_flow = fwd_flow_field * -1  # invert forward flow to point at next frame
-                        np.save(fname + '.npy', forward_flow[:, :, :2])
-
-                    if get_backward_flow:
-                        file_path = temporary_bwd_flow_file_path + "%04d" % frame + ".exr"
-                        bwd_flow_field = load_image(file_path, num_channels=4).astype(np.float32)
-
-                        if not self.config.get_bool('blender_image_coordinate_style', False):
-                            bwd_flow_field[:, :, 1] = bwd_flow_field[:, :, 1] * -1
-
-                        fname = os.path.join(self._determine_output_dir(),
-                                             self.config.get_string('backward_flow_output_file_prefix', 'backward_flow_')) + '%04d' % frame
-                        np.save(fname + '.npy', bwd_flow_field[:, :, :2])
+                self._save_flow_files()
 
         # register desired outputs
-        if get_forward_flow:
-            self._register_output(default_prefix=self.config.get_string('forward_flow_output_file_prefix', 'forward_flow_'),
-                                  default_key=self.config.get_string("forward_flow_output_key", "forward_flow"),
-                                  suffix='.npy', version='2.0.0')
-        if get_backward_flow:
-            self._register_output(default_prefix=self.config.get_string('backward_flow_output_file_prefix', 'backward_flow_'),
-                                  default_key=self.config.get_string("backward_flow_output_key", "backward_flow"),
-                                  suffix='.npy', version='2.0.0')
+        self._register_flow_outputs()
@@ -1,5 +1,6 @@
 import math
 import os
+import subprocess
 
 import addon_utils
 import bpy
@@ -78,6 +79,14 @@ class RendererInterface(Module):
                            "actual rendering call is omitted. Type: bool. Default: False"
         "cpu_threads", "Set number of cpu cores used for rendering (1 thread is always used for coordination "
                        "if more than one cpu thread means GPU-only rendering). Type: int. Default: 1"
+        "render_processes", "If bigger than one, the prepared scene is saved and the frames are split into this many "
+                            "disjoint subsets, which are rendered in parallel by separate blender processes. The "
+                            "files are written with the same names as in a single process. Images which are neither "
+                            "stored in a file nor packed are not available in the child processes. The compute "
+                            "devices selected in this process are also used by the child processes. "
+                            "Type: int. Default: 1"
+        "render_process_threads", "The number of threads used by each of the render processes. 0 means the number "
+                                  "of cpu cores divided by render_processes. Type: int. Default: 0"
 
         "render_normals", "If true, the normals are also rendered. Type: bool. Default: False"
         "normals_output_file_prefix", "The file prefix that should be used when writing normals. "
@@ -296,10 +305,82 @@ def _render(self, default_prefix, custom_file_path=None):
             # blender will render all frames in [frame_start, frame_ned]
             bpy.context.scene.frame_end -= 1
             if not self._avoid_rendering:
-                bpy.ops.render.render(animation=True, write_still=True)
+                num_processes = self.config.get_int("render_processes", 1)
+                if num_processes > 1:
+                    self._render_in_child_processes(num_processes)
+                else:
+                    bpy.ops.render.render(animation=True, write_still=True)
             # Revert changes
             bpy.context.scene.frame_end += 1
 
+    def _render_in_child_processes(self, num_processes):
+        """ Renders all frames in [frame_start, frame_end] with several blender processes in parallel.
+
+        The scene is saved into the temp dir and every process renders a disjoint subset of the frames. As every frame
+        keeps its number and all output paths are absolute, the files end up with the same names as if they had been
+        rendered by this process.
+
+        :param num_processes: The number of blender processes, which are started.
+        """
+        frames = list(range(bpy.context.scene.frame_start, bpy.context.scene.frame_end + 1))
+        num_processes = min(num_processes, len(frames))
+        threads = self.config.get_int("render_process_threads", 0)
+        if threads <= 0:
+            threads = max(1, os.cpu_count() // num_processes)
+
+        blend_path = os.path.join(self._temp_dir, "render_scene.blend")
+        # keep absolute paths, as the file is not stored next to the used textures
+        bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True, relative_remap=False)
+        setup_script_path = self._write_render_process_setup_script(threads)
+
+        processes = []
+        for index in range(num_processes):
+            # interleave the frames, so every process gets a similar amount of work
+            process_frames = frames[index::num_processes]
+            log_path = os.path.join(self._temp_dir, "render_process_{}.log".format(index))
+            # the arguments are executed in order, so the setup has to be done before the frames are rendered
+            command = [bpy.app.binary_path, "--background", blend_path, "--python", setup_script_path,
+                       "--threads", str(threads), "--render-frame", ",".join(str(frame) for frame in process_frames)]
+            log_file = open(log_path, "w")
+            processes.append((subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT), log_file, log_path))
+        print("Rendering {} frames with {} processes using {} threads each".format(len(frames), num_processes, threads))
+
+        failed_logs = []
+        for process, log_file, log_path in processes:
+            process.wait()
+            log_file.close()
+            if process.returncode != 0:
+                failed_logs.append(log_path)
+        os.remove(blend_path)
+        os.remove(setup_script_path)
+        if failed_logs:
+            raise Exception("{} of the render processes failed, see: {}".format(len(failed_logs), ", ".join(failed_logs)))
+
+    def _write_render_process_setup_script(self, threads):
+        """ Writes a python script, which applies the compute device settings of this process in a render process.
+
+        The compute device type and the enabled devices are stored in the user preferences and not in the .blend file,
+        so without the script the render processes would use the default preferences and render on the cpu.
+
+        :param threads: The number of threads each render process should use.
+        :return: The path to the script.
+        """
+        preferences = bpy.context.preferences.addons['cycles'].preferences
+        enabled_devices = [device.id for device in preferences.devices if device.use]
+        script_path = os.path.join(self._temp_dir, "render_process_setup.py")
+        with open(script_path, "w") as f:
+            f.write("import bpy\n"
+                    "preferences = bpy.context.preferences.addons['cycles'].preferences\n"
+                    "preferences.compute_device_type = {!r}\n"
+                    "# fills the list of available devices\n"
+                    "preferences.get_devices()\n"
+                    "for device in preferences.devices:\n"
+                    "    device.use = device.id in {!r}\n"
+                    "bpy.context.scene.render.threads_mode = 'FIXED'\n"
+                    "bpy.context.scene.render.threads = {}\n".format(preferences.compute_device_type,
+                                                                     enabled_devices, threads))
+        return script_path
+
     def add_alpha_channel_to_textures(self, blurry_edges):
         """
         Adds transparency to all textures, which contain an .png image as an image input
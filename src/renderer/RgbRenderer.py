@@ -1,6 +1,9 @@
 import bpy
 
+from src.renderer.FlowRenderer import FlowRenderer
 from src.renderer.RendererInterface import RendererInterface
+from src.renderer.SegMapRenderer import SegMapRenderer
+from src.utility.Config import Config
 from src.utility.Utility import Utility
 
 
@@ -8,6 +11,29 @@ class RgbRenderer(RendererInterface):
     """ Renders rgb images for each registered keypoint.
 
     Images are stored as PNG-files or JPEG-files with 8bit color depth.
+
+    Next to the distance and the normals, also the segmentation and the optical flow can be rendered in the same pass
+    as the color image, which avoids a separate scene synchronization per renderer. The segmentation is then taken
+    from the object index pass instead of colorizing the objects, it is therefore not anti-aliased and does not
+    consider transparent textures. The optical flow is averaged over all samples and the pixel filter of the color
+    image, so at the borders of objects it is a mix of the flow of the foreground and the background. If exact flow
+    values are needed at these borders, use the renderer.FlowRenderer, which renders a single sample per pixel.
+
+    Example 1: Render color, distance, segmentation and forward flow at once.
+
+        {
+          "module": "renderer.RgbRenderer",
+          "config": {
+            "render_distance": True,
+            "segmap": {
+              "map_by": ["instance", "class"]
+            },
+            "flow": {
+              "forward_flow": True
+            }
+          }
+        }
+
     .. csv-table::
         :header: "Parameter", "Description"
 
@@ -15,11 +41,38 @@ class RgbRenderer(RendererInterface):
                                 "materials, Type: bool. Default: False."
         "image_type", "Image type of saved rendered images, Type: str. Default: 'PNG'. Available: ['PNG','JPEG']"
         "transparent_background", "Whether to render the background as transparent or not, Type: bool. Default: False."
+        "segmap", "If given, the segmentation is rendered in the same pass. Contains the config of the segmentation, "
+                  "see renderer.SegMapRenderer. Type: dict."
+        "flow", "If given, the optical flow is rendered in the same pass. Contains the config of the optical flow, "
+                "see renderer.FlowRenderer. The flow is averaged over the samples of the color image, so it is "
+                "smeared at object borders. Type: dict."
     """
     def __init__(self, config):
         RendererInterface.__init__(self, config)
         self._texture_less_mode = config.get_bool('render_texture_less', False)
         self._image_type = config.get_string('image_type', 'PNG')
+        self._segmap_renderer = self._create_pass_renderer(SegMapRenderer, "segmap")
+        self._flow_renderer = self._create_pass_renderer(FlowRenderer, "flow")
+
+    def _create_pass_renderer(self, renderer_class, name):
+        """ Creates the renderer, whose outputs are rendered in the same pass as the color image.
+
+        The output and temp dir settings are taken over from this renderer, if they are not given in the sub config.
+
+        :param renderer_class: The class of the renderer.
+        :param name: The name of the parameter, which contains the config of the renderer.
+        :return: The renderer or None, if the parameter is not given.
+        """
+        if not self.config.has_param(name):
+            return None
+        if self.config.get_bool("stereo", False):
+            raise Exception("The {} can not be rendered together with stereo images.".format(name))
+
+        data = dict(self.config.get_raw_dict(name))
+        for key in ["output_dir", "output_is_temp", "temp_dir", "avoid_rendering"]:
+            if key not in data and self.config.has_param(key):
+                data[key] = self.config.get_raw_value(key)
+        return renderer_class(Config(data))
 
     def change_to_texture_less_render(self):
         """
@@ -77,11 +130,26 @@ def run(self):
             if self._use_alpha_channel:
                 self.add_alpha_channel_to_textures(blurry_edges=True)
 
+            if self._flow_renderer is not None:
+                self._flow_renderer._output_vector_field()
+            if self._segmap_renderer is not None:
+                used_objects, load_instance_segmap = self._segmap_renderer._write_instance_ids_to_file()
+
             self._render("rgb_")
 
+            if self._flow_renderer is not None and not self._avoid_rendering:
+                self._flow_renderer._save_flow_files()
+            if self._segmap_renderer is not None:
+                save_in_csv_attributes = self._segmap_renderer._save_segmaps(used_objects, load_instance_segmap)
+
         if self._image_type == 'PNG':
             self._register_output("rgb_", "colors", ".png", "1.0.0")
         elif self._image_type == 'JPEG':
             self._register_output("rgb_", "colors", ".jpg", "1.0.0")
         else:
             raise Exception("Unknown Image Type " + self._image_type)
+
+        if self._flow_renderer is not None:
+            self._flow_renderer._register_flow_outputs()
+        if self._segmap_renderer is not None:
+            self._segmap_renderer._register_segmap_outputs(save_in_csv_attributes)
@@ -151,6 +151,284 @@ def _colorize_objects_for_instance_segmentation(self, objects):
 
         return colors, num_splits_per_dimension, color_map
 
+    def _write_instance_ids_to_file(self):
+        """ Configures the object index pass, s.t. the instance id of every pixel is written to file by the next rendering.
+
+        In contrast to colorizing the objects, the materials stay untouched, so the instance ids can be rendered in the
+        same pass as the color image.
+
+        :return: The list of objects, the index in the list is the instance id, and a function which returns the
+                 instance ids of the given frame as 2D array.
+        """
+        objects = get_all_mesh_objects()
+        # the pass index of an object is limited to [0, 32767]
+        if len(objects) > 32767:
+            raise Exception("The object index pass supports at most 32767 objects, but there are {}.".format(len(objects)))
+
+        # the world background gets the instance id zero, as in the colorized segmentation
+        used_objects = [bpy.context.scene.world] + objects
+        for obj in bpy.context.scene.objects:
+            obj.pass_index = 0
+        for instance_id, obj in enumerate(objects, 1):
+            obj.pass_index = instance_id
+
+        bpy.context.scene.render.use_compositing = True
+        bpy.context.scene.use_nodes = True
+        bpy.context.view_layer.use_pass_object_index = True
+
+        tree = bpy.context.scene.node_tree
+        render_layer_node = tree.nodes.get('Render Layers')
+        output_file = tree.nodes.new("CompositorNodeOutputFile")
+        output_file.base_path = self._temp_dir
+        output_file.format.file_format = "OPEN_EXR"
+        output_file.format.color_depth = "32"
+        output_file.file_slots.values()[0].path = "instance_ids_"
+        tree.links.new(render_layer_node.outputs["IndexOB"], output_file.inputs["Image"])
+
+        def load_instance_segmap(frame):
+            file_path = os.path.join(self._temp_dir, "instance_ids_" + "%04d" % frame + ".exr")
+            return np.rint(load_image(file_path, num_channels=1)[:, :, 0])
+
+        return used_objects, load_instance_segmap
+
+    def _get_attribute_value(self, current_obj, current_attribute, used_attribute, default_value_set, default_value):
+        """ Returns the value of the requested attribute for the given object.
+
+        :param current_obj: The object to get the value from.
+        :param current_attribute: The attribute as it was given in map_by, e.g. "cp_category_id" or "cf_basename".
+        :param used_attribute: The attribute without the "cp_" prefix.
+        :param default_value_set: True, if a default value was specified for this attribute.
+        :param default_value: The default value.
+        :return: The value, if it was found and if the default value was used.
+        """
+        # if the current obj has a attribute with that name -> get it
+        if hasattr(current_obj, used_attribute):
+            return getattr(current_obj, used_attribute), True, False
+        # if the current object has a custom property with that name -> get it
+        elif current_attribute.startswith("cp_") and used_attribute in current_obj:
+            return current_obj[used_attribute], True, False
+        elif current_attribute.startswith("cf_"):
+            if current_attribute == "cf_basename":
+                used_value = current_obj.name
+                if "." in used_value:
+                    used_value = used_value[:used_value.rfind(".")]
+                return used_value, True, False
+            else:
+                raise Exception("The custom function {} is not supported.".format(current_attribute))
+        elif default_value_set:
+            # if none of the above applies use the default value
+            return default_value, True, True
+        return None, False, False
+
+    def _build_attribute_lookup_table(self, used_objects, current_attribute, used_attribute, default_value_set,
+                                      default_value):
+        """ Resolves the given attribute for all objects, s.t. each frame can be mapped by indexing with the segmap.
+
+        :param used_objects: The list of objects, the index in the list is the instance id.
+        :param current_attribute: The attribute as it was given in map_by, e.g. "cp_category_id" or "cf_basename".
+        :param used_attribute: The attribute without the "cp_" prefix.
+        :param default_value_set: True, if a default value was specified for this attribute.
+        :param default_value: The default value.
+        :return: The list of raw values, a bool array marking objects which have the attribute, a bool array marking
+                 default values, a bool array marking values which can be stored in an image and the float lookup table.
+        """
+        num_objects = len(used_objects)
+        values = [None] * num_objects
+        was_found = np.zeros(num_objects, dtype=bool)
+        is_default = np.zeros(num_objects, dtype=bool)
+        is_numeric = np.zeros(num_objects, dtype=bool)
+        lookup_table = np.zeros(num_objects)
+        for object_id, current_obj in enumerate(used_objects):
+            values[object_id], was_found[object_id], is_default[object_id] = self._get_attribute_value(
+                current_obj, current_attribute, used_attribute, default_value_set, default_value)
+            if was_found[object_id]:
+                # check if the value can be saved as an image or only in the csv file
+                try:
+                    lookup_table[object_id] = values[object_id]
+                    is_numeric[object_id] = True
+                except (ValueError, TypeError):
+                    pass
+        return values, was_found, is_default, is_numeric, lookup_table
+
+    def _save_segmaps(self, used_objects, load_instance_segmap):
+        """ Maps the rendered instance ids of every frame to the attributes given in map_by and saves the results.
+
+        :param used_objects: The list of objects, the index in the list is the instance id.
+        :param load_instance_segmap: A function, which returns the instance ids of the given frame as 2D array.
+        :return: The attributes, which were saved per object in the .csv file.
+        """
+        final_segmentation_file_path = os.path.join(self._determine_output_dir(),
+                                                    self.config.get_string("output_file_prefix", "segmap_"))
+
+        # Find optimal dtype of output based on max index
+        for dtype in [np.uint8, np.uint16, np.uint32]:
+            optimal_dtype = dtype
+            if np.iinfo(optimal_dtype).max >= len(used_objects) - 1:
+                break
+
+        # get the type of mappings which should be performed
+        used_attributes = self.config.get_raw_dict("map_by", "class")
+
+        used_default_values = self.config.get_raw_dict("default_values", {})
+        if 'class' in used_default_values:
+            used_default_values['cp_category_id'] = used_default_values['class']
+
+        if isinstance(used_attributes, str):
+            # only one result is requested
+            result_channels = 1
+            used_attributes = [used_attributes]
+        elif isinstance(used_attributes, list):
+            result_channels = len(used_attributes)
+        else:
+            raise Exception("The type of this is not supported here: {}".format(used_attributes))
+
+        save_in_csv_attributes = {}
+        # define them for the avoid rendering case
+        there_was_an_instance_rendering = False
+        list_of_used_attributes = []
+        # maps each attribute to its per object lookup table, these are only built once for all frames
+        attribute_lookup_tables = {}
+
+        # After rendering
+        if not self._avoid_rendering:
+            for frame in range(bpy.context.scene.frame_start, bpy.context.scene.frame_end):  # for each rendered frame
+                segmap = load_instance_segmap(frame).astype(optimal_dtype)
+
+                # counting is cheaper than sorting the whole image via np.unique
+                object_id_counts = np.bincount(segmap.ravel())
+                if len(object_id_counts) > len(used_objects):
+                    raise Exception("There are more object colors than there are objects")
+                used_object_ids = np.flatnonzero(object_id_counts)
+                combined_result_map = []
+                there_was_an_instance_rendering = False
+                list_of_used_attributes = []
+                used_channels = []
+                for channel_id in range(result_channels):
+                    resulting_map = None
+                    was_used = False
+                    current_attribute = used_attributes[channel_id]
+                    org_attribute = current_attribute
+
+                    # if the class is used the category_id attribute is evaluated
+                    if current_attribute == "class":
+                        current_attribute = "cp_category_id"
+                    # in the instance case the resulting ids are directly used
+                    if current_attribute == "instance":
+                        there_was_an_instance_rendering = True
+                        resulting_map = segmap
+                        was_used = True
+                        # a non default value was also used
+                        non_default_value_was_used = True
+                    else:
+                        if current_attribute != "cp_category_id":
+                            list_of_used_attributes.append(current_attribute)
+                        # for the current attribute remove cp_ and _csv, if present
+                        used_attribute = current_attribute
+                        if used_attribute.startswith("cp_"):
+                            used_attribute = used_attribute[len("cp_"):]
+                        # check if a default value was specified
+                        default_value_set = False
+                        default_value = None
+                        if current_attribute in used_default_values or used_attribute in used_default_values:
+                            default_value_set = True
+                            if current_attribute in used_default_values:
+                                default_value = used_default_values[current_attribute]
+                            elif used_attribute in used_default_values:
+                                default_value = used_default_values[used_attribute]
+                        # resolve the attribute only once per run for all objects
+                        if current_attribute not in attribute_lookup_tables:
+                            attribute_lookup_tables[current_attribute] = self._build_attribute_lookup_table(
+                                used_objects, current_attribute, used_attribute, default_value_set, default_value)
+                        values, was_found, is_default, is_numeric, lookup_table = attribute_lookup_tables[current_attribute]
+
+                        for object_id in used_object_ids:
+                            if not was_found[object_id]:
+                                # if the requested current_attribute is not a custom property or a attribute
+                                # or there is a default value stored
+                                # it throws an exception
+                                raise Exception("The obj: {} does not have the "
+                                                "attribute: {}, striped: {}. Maybe try a default "
+                                                "value.".format(used_objects[object_id].name, current_attribute,
+                                                                used_attribute))
+
+                        used_is_numeric = is_numeric[used_object_ids]
+                        if np.any(used_is_numeric) and not np.all(used_is_numeric):
+                            raise Exception("During creating the mapping, the saving to an image or a csv file "
+                                            "switched, this might indicated that the used default value, does "
+                                            "not have the same type as the returned value, "
+                                            "for: {}".format(current_attribute))
+                        if np.all(used_is_numeric):
+                            # all values can be stored in the image -> map the whole frame with one lookup
+                            resulting_map = lookup_table[segmap]
+                            was_used = True
+                        # this avoids that for certain attributes only the default value is written
+                        non_default_value_was_used = not np.all(is_default[used_object_ids])
+
+                        # all values of this attribute are also saved in the .csv
+                        for object_id in used_object_ids:
+                            if object_id in save_in_csv_attributes:
+                                save_in_csv_attributes[object_id][used_attribute] = values[object_id]
+                            else:
+                                save_in_csv_attributes[object_id] = {used_attribute: values[object_id]}
+                    if was_used and non_default_value_was_used:
+                        used_channels.append(org_attribute)
+                        combined_result_map.append(resulting_map)
+
+                fname = final_segmentation_file_path + "%04d" % frame
+                # combine all resulting images to one image
+                resulting_map = np.stack(combined_result_map, axis=2)
+                # remove the unneeded third dimension
+                if resulting_map.shape[2] == 1:
+                    resulting_map = resulting_map[:, :, 0]
+                np.save(fname, resulting_map)
+        if not there_was_an_instance_rendering:
+            if len(list_of_used_attributes) > 0:
+                raise Exception("There were attributes specified in the may_by, which could not be saved as "
+                                "there was no \"instance\" may_by key used. This is true for this/these "
+                                "keys: {}".format(", ".join(list_of_used_attributes)))
+            # if there was no instance rendering no .csv file is generated!
+            # delete all saved infos about .csv
+            save_in_csv_attributes = {}
+
+        # write color mappings to file
+        if save_in_csv_attributes and not self._avoid_rendering:
+            csv_file_path = os.path.join(self._determine_output_dir(),
+                                         self.config.get_string("segcolormap_output_file_prefix",
+                                                                "class_inst_col_map") + ".csv")
+            with open(csv_file_path, 'w', newline='') as csvfile:
+                # get from the first element the used field names
+                fieldnames = ["idx"]
+                # get all used object element keys
+                for object_element in save_in_csv_attributes.values():
+                    fieldnames.extend(list(object_element.keys()))
+                    break
+                for channel_name in used_channels:
+                    fieldnames.append("channel_{}".format(channel_name))
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer.writeheader()
+                # save for each object all values in one row
+                for obj_idx, object_element in save_in_csv_attributes.items():
+                    object_element["idx"] = obj_idx
+                    for i, channel_name in enumerate(used_channels):
+                        object_element["channel_{}".format(channel_name)] = i
+                    writer.writerow(object_element)
+        return save_in_csv_attributes
+
+    def _register_segmap_outputs(self, save_in_csv_attributes):
+        """ Registers the segmaps and, if it was written, the .csv file.
+
+        :param save_in_csv_attributes: The attributes, which were saved per object in the .csv file.
+        """
+        self._register_output("segmap_", "segmap", ".npy", "2.0.0")
+        if save_in_csv_attributes:
+            self._register_output("class_inst_col_map",
+                                  "segcolormap",
+                                  ".csv",
+                                  "2.0.0",
+                                  unique_for_camposes=False,
+                                  output_key_parameter_name="segcolormap_output_key",
+                                  output_file_prefix_parameter_name="segcolormap_output_file_prefix")
+
     def run(self):
         with Utility.UndoAfterExecution():
             self._configure_renderer(default_samples=1)
@@ -170,195 +448,17 @@ def run(self):
             if self._use_alpha_channel:
                 self.add_alpha_channel_to_textures(blurry_edges=False)
 
-            # Determine path for temporary and for final output
+            # Determine path for temporary output
             temporary_segmentation_file_path = os.path.join(self._temp_dir, "seg_")
-            final_segmentation_file_path = os.path.join(self._determine_output_dir(),
-                                                        self.config.get_string("output_file_prefix", "segmap_"))
 
             # Render the temporary output
             self._render("seg_", custom_file_path=temporary_segmentation_file_path)
 
-            # Find optimal dtype of output based on max index
-            for dtype in [np.uint8, np.uint16, np.uint32]:
-                optimal_dtype = dtype
-                if np.iinfo(optimal_dtype).max >= len(colors) - 1:
-                    break
-
-            # get the type of mappings which should be performed
-            used_attributes = self.config.get_raw_dict("map_by", "class")
-
-            used_default_values = self.config.get_raw_dict("default_values", {})
-            if 'class' in used_default_values:
-                used_default_values['cp_category_id'] = used_default_values['class']
-
-            if isinstance(used_attributes, str):
-                # only one result is requested
-                result_channels = 1
-                used_attributes = [used_attributes]
-            elif isinstance(used_attributes, list):
-                result_channels = len(used_attributes)
-            else:
-                raise Exception("The type of this is not supported here: {}".format(used_attributes))
+            def load_instance_segmap(frame):
+                segmentation = load_image(temporary_segmentation_file_path + "%04d" % frame + ".exr")
+                return Utility.map_back_from_equally_spaced_equidistant_values(segmentation, num_splits_per_dimension,
+                                                                               self.render_colorspace_size_per_dimension)
 
-            save_in_csv_attributes = {}
-            # define them for the avoid rendering case
-            there_was_an_instance_rendering = False
-            list_of_used_attributes = []
-
-            # After rendering
-            if not self._avoid_rendering:
-                for frame in range(bpy.context.scene.frame_start, bpy.context.scene.frame_end):  # for each rendered frame
-                    file_path = temporary_segmentation_file_path + "%04d" % frame + ".exr"
-                    segmentation = load_image(file_path)
-
-                    segmap = Utility.map_back_from_equally_spaced_equidistant_values(segmentation,
-                                                                                     num_splits_per_dimension,
-                                                                                     self.render_colorspace_size_per_dimension)
-                    segmap = segmap.astype(optimal_dtype)
-
-                    used_object_ids = np.unique(segmap)
-                    max_id = np.max(used_object_ids)
-                    if max_id >= len(used_objects):
-                        raise Exception("There are more object colors than there are objects")
-                    combined_result_map = []
-                    there_was_an_instance_rendering = False
-                    list_of_used_attributes = []
-                    used_channels = []
-                    for channel_id in range(result_channels):
-                        resulting_map = np.empty((segmap.shape[0], segmap.shape[1]))
-                        was_used = False
-                        current_attribute = used_attributes[channel_id]
-                        org_attribute = current_attribute
-
-                        # if the class is used the category_id attribute is evaluated
-                        if current_attribute == "class":
-                            current_attribute = "cp_category_id"
-                        # in the instance case the resulting ids are directly used
-                        if current_attribute == "instance":
-                            there_was_an_instance_rendering = True
-                            resulting_map = segmap
-                            was_used = True
-                            # a non default value was also used
-                            non_default_value_was_used = True
-                        else:
-                            if current_attribute != "cp_category_id":
-                                list_of_used_attributes.append(current_attribute)
-                            # for the current attribute remove cp_ and _csv, if present
-                            used_attribute = current_attribute
-                            if used_attribute.startswith("cp_"):
-                                used_attribute = used_attribute[len("cp_"):]
-                            # check if a default value was specified
-                            default_value_set = False
-                            if current_attribute in used_default_values or used_attribute in used_default_values:
-                                default_value_set = True
-                                if current_attribute in used_default_values:
-                                    default_value = used_default_values[current_attribute]
-                                elif used_attribute in used_default_values:
-                                    default_value = used_default_values[used_attribute]
-                            last_state_save_in_csv = None
-                            # this avoids that for certain attributes only the default value is written
-                            non_default_value_was_used = False
-                            # iterate over all object ids
-                            for object_id in used_object_ids:
-                                is_default_value = False
-                                # get the corresponding object via the id
-                                current_obj = used_objects[object_id]
-                                # if the current obj has a attribute with that name -> get it
-                                if hasattr(current_obj, used_attribute):
-                                    used_value = getattr(current_obj, used_attribute)
-                                # if the current object has a custom property with that name -> get it
-                                elif current_attribute.startswith("cp_") and used_attribute in current_obj:
-                                    used_value = current_obj[used_attribute]
-                                elif current_attribute.startswith("cf_"):
-                                    if current_attribute == "cf_basename":
-                                        used_value = current_obj.name
-                                        if "." in used_value:
-                                            used_value = used_value[:used_value.rfind(".")]
-                                elif default_value_set:
-                                    # if none of the above applies use the default value
-                                    used_value = default_value
-                                    is_default_value = True
-                                else:
-                                    # if the requested current_attribute is not a custom property or a attribute
-                                    # or there is a default value stored
-                                    # it throws an exception
-                                    raise Exception("The obj: {} does not have the "
-                                                    "attribute: {}, striped: {}. Maybe try a default "
-                                                    "value.".format(current_obj.name, current_attribute, used_attribute))
-
-                                # check if the value should be saved as an image or in the csv file
-                                save_in_csv = False
-                                try:
-                                    resulting_map[segmap == object_id] = used_value
-                                    was_used = True
-                                    if not is_default_value:
-                                        non_default_value_was_used = True
-                                    # save everything which is not instance also in the .csv
-                                    if current_attribute != "instance":
-                                        save_in_csv = True
-                                except ValueError:
-                                    save_in_csv = True
-
-                                if last_state_save_in_csv is not None and last_state_save_in_csv != save_in_csv:
-                                    raise Exception("During creating the mapping, the saving to an image or a csv file "
-                                                    "switched, this might indicated that the used default value, does "
-                                                    "not have the same type as the returned value, "
-                                                    "for: {}".format(current_attribute))
-                                last_state_save_in_csv = save_in_csv
-                                if save_in_csv:
-                                    if object_id in save_in_csv_attributes:
-                                        save_in_csv_attributes[object_id][used_attribute] = used_value
-                                    else:
-                                        save_in_csv_attributes[object_id] = {used_attribute: used_value}
-                        if was_used and non_default_value_was_used:
-                            used_channels.append(org_attribute)
-                            combined_result_map.append(resulting_map)
-
-                    fname = final_segmentation_file_path + "%04d" % frame
-                    # combine all resulting images to one image
-                    resulting_map = np.stack(combined_result_map, axis=2)
-                    # remove the unneeded third dimension
-                    if resulting_map.shape[2] == 1:
-                        resulting_map = resulting_map[:, :, 0]
-                    np.save(fname, resulting_map)
-            if not there_was_an_instance_rendering:
-                if len(list_of_used_attributes) > 0:
-                    raise Exception("There were attributes specified in the may_by, which could not be saved as "
-                                    "there was no \"instance\" may_by key used. This is true for this/these "
-                                    "keys: {}".format(", ".join(list_of_used_attributes)))
-                # if there was no instance rendering no .csv file is generated!
-                # delete all saved infos about .csv
-                save_in_csv_attributes = {}
-
-            # write color mappings to file
-            if save_in_csv_attributes and not self._avoid_rendering:
-                csv_file_path = os.path.join(self._determine_output_dir(),
-                                             self.config.get_string("segcolormap_output_file_prefix",
-                                                                    "class_inst_col_map") + ".csv")
-                with open(csv_file_path, 'w', newline='') as csvfile:
-                    # get from the first element the used field names
-                    fieldnames = ["idx"]
-                    # get all used object element keys
-                    for object_element in save_in_csv_attributes.values():
-                        fieldnames.extend(list(object_element.keys()))
-                        break
-                    for channel_name in used_channels:
-                        fieldnames.append("channel_{}".format(channel_name))
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
-                    # save for each object all values in one row
-                    for obj_idx, object_element in save_in_csv_attributes.items():
-                        object_element["idx"] = obj_idx
-                        for i, channel_name in enumerate(used_channels):
-                            object_element["channel_{}".format(channel_name)] = i
-                        writer.writerow(object_element)
+            save_in_csv_attributes = self._save_segmaps(used_objects, load_instance_segmap)
 
-        self._register_output("segmap_", "segmap", ".npy", "2.0.0")
-        if save_in_csv_attributes:
-            self._register_output("class_inst_col_map",
-                                  "segcolormap",
-                                  ".csv",
-                                  "2.0.0",
-                                  unique_for_camposes=False,
-                                  output_key_parameter_name="segcolormap_output_key",
-                                  output_file_prefix_parameter_name="segcolormap_output_file_prefix")
+        self._register_segmap_outputs(save_in_csv_attributes)
@@ -27,21 +27,56 @@
 if "--batch-process" in argv:
     batch_index_file = argv[argv.index("--batch-process") + 1]
 
+# In worker pool mode, the lines of the index file are pulled from the queue of the launcher
+batch_queue_address = None
+batch_worker_id = 0
+if "--batch-queue" in argv:
+    host, port = argv[argv.index("--batch-queue") + 1].rsplit(":", 1)
+    batch_queue_address = (host, int(port))
+    batch_worker_id = int(argv[argv.index("--batch-worker-id") + 1])
+
 argv = argv[argv.index("--") + 1:]
 working_dir = os.path.dirname(os.path.abspath(__file__))
 
 from src.main.Pipeline import Pipeline
+from src.main.GlobalStorage import GlobalStorage
+from src.utility.PathIndex import PathIndex
 from src.utility.Utility import Utility
 
 config_path = argv[0]
 if batch_index_file == None:
     pipeline = Pipeline(config_path, argv[1:], working_dir)
     pipeline.run()
+elif batch_queue_address is not None:
+    import traceback
+    from src.utility.BatchQueue import BatchQueueClient
+
+    client = BatchQueueClient(batch_queue_address, bytes.fromhex(os.environ["BLENDER_PROC_BATCH_AUTHKEY"]), batch_worker_id)
+    while True:
+        next_line = client.next_line()
+        if next_line is None:
+            break
+        line_index, line = next_line
+        print("Worker {} processes line {}: {}".format(batch_worker_id, line_index, line))
+        try:
+            # Values stored by the previous pipeline run must not leak into this one
+            GlobalStorage.reset()
+            # Files might have been added since the last run
+            PathIndex.clear()
+            pipeline = Pipeline(config_path, line.split(" "), working_dir)
+            pipeline.run()
+        except Exception:
+            traceback.print_exc()
+            client.report(line_index, False, traceback.format_exc())
+        else:
+            client.report(line_index, True)
+    client.close()
 else:
     with open(Utility.resolve_path(batch_index_file), "r") as f:
         lines = f.readlines()
 
         for line in lines:
             args = line.split(" ")
+            PathIndex.clear()
             pipeline = Pipeline(config_path, args, working_dir)
             pipeline.run()
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import re
+import time
+
+import bpy
+
+
+class AssetCache:
+    """ Stores imported and post-processed models as .blend files, so later imports of the same model only have to
+    append the datablocks instead of parsing the model file again.
+
+    Each model is stored in <cache_dir>/<hash>.blend. The hash covers the content of the model file, the content of
+    the .mtl files it references, the blender version and a variant string, which identifies the import and the
+    post-processing (e.g. the loader). Textures are not copied, they are referenced with their absolute path.
+
+    The cache can be shared by several processes on one machine: every file is first written under a temporary name
+    and then renamed, so no process reads an incomplete file. Every hit updates the modification time of the file and
+    if the cache exceeds its size limit, the least recently used files are removed.
+    """
+
+    # temporary files, which are older than this, were left behind by crashed processes
+    _stale_tmp_file_age = 3600
+
+    def __init__(self, cache_dir, max_size_gb):
+        """
+        :param cache_dir: The directory, in which the .blend files are stored. Type: string.
+        :param max_size_gb: The maximum size of all .blend files in the cache in GB. Type: float.
+        """
+        self._cache_dir = cache_dir
+        self._max_size = max_size_gb * 1024 ** 3
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _asset_path(self, filepath, variant):
+        """ Returns the path of the .blend file for the given model file.
+
+        :param filepath: The path to the model file.
+        :param variant: Identifies the import and the post-processing of the model.
+        :return: The path inside the cache dir.
+        """
+        hasher = hashlib.sha256()
+        hasher.update("{}|{}|".format(bpy.app.version_string, variant).encode("utf-8"))
+        with open(filepath, "rb") as f:
+            data = f.read()
+        hasher.update(data)
+        if filepath.endswith(".obj"):
+            # the materials of .obj files are defined in separate files
+            for match in re.finditer(rb"^mtllib\s+(.+?)\s*$", data, re.MULTILINE):
+                mtl_path = os.path.join(os.path.dirname(filepath), match.group(1).decode("utf-8", errors="replace"))
+                if os.path.exists(mtl_path):
+                    with open(mtl_path, "rb") as f:
+                        hasher.update(f.read())
+        return os.path.join(self._cache_dir, hasher.hexdigest()[:32] + ".blend")
+
+    def load(self, filepath, import_function, variant=""):
+        """ Returns the objects of the given model file, either from the cache or by importing them.
+
+        :param filepath: The path to the model file.
+        :param import_function: A function without parameters, which imports and post-processes the model file and
+                                returns the list of created objects.
+        :param variant: Identifies the import and the post-processing of the model.
+        :return: The list of loaded objects.
+        """
+        asset_path = self._asset_path(filepath, variant)
+        if os.path.exists(asset_path):
+            try:
+                # mark the file as recently used, this fails if another process has just removed it
+                os.utime(asset_path)
+                return AssetCache._append_objects(asset_path)
+            except OSError as e:
+                print("Warning: The cached asset {} could not be loaded: {}".format(asset_path, e))
+
+        objects = import_function()
+        if objects:
+            self._save(asset_path, objects)
+            self._evict()
+        return objects
+
+    @staticmethod
+    def _append_objects(asset_path):
+        """ Appends all objects of the given .blend file and links them into the active collection.
+
+        As after an import, only the appended objects are selected afterwards.
+
+        :param asset_path: The path to the .blend file.
+        :return: The list of appended objects.
+        """
+        with bpy.data.libraries.load(asset_path, link=False) as (data_from, data_to):
+            data_to.objects = data_from.objects
+        for obj in bpy.context.selected_objects:
+            obj.select_set(False)
+        collection = bpy.context.view_layer.active_layer_collection.collection
+        for obj in data_to.objects:
+            collection.objects.link(obj)
+            obj.select_set(True)
+        return list(data_to.objects)
+
+    def _save(self, asset_path, objects):
+        """ Writes the given objects with all their meshes, materials and images into the given .blend file.
+
+        :param asset_path: The path to the .blend file.
+        :param objects: The objects to store.
+        """
+        tmp_path = "{}.{}.tmp".format(asset_path, os.getpid())
+        bpy.data.libraries.write(tmp_path, set(objects), relative_remap=False)
+        os.replace(tmp_path, asset_path)
+
+    def _evict(self):
+        """ Removes the least recently used files, until the cache is smaller than its size limit. """
+        entries = []
+        total_size = 0
+        now = time.time()
+        for entry in os.scandir(self._cache_dir):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # removed by another process in the meantime
+                continue
+            if entry.name.endswith(".tmp") and now - stat.st_mtime > AssetCache._stale_tmp_file_age:
+                AssetCache._remove(entry.path)
+            elif entry.name.endswith(".blend"):
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total_size <= self._max_size:
+                break
+            AssetCache._remove(path)
+            total_size -= size
+
+    @staticmethod
+    def _remove(path):
+        """ Removes the given file, if it has not already been removed by another process. """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
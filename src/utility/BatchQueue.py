@@ -0,0 +1,229 @@
+import json
+import os
+import threading
+from multiprocessing.connection import Client, Listener
+
+
+class BatchQueueServer:
+    """ Hands out the lines of a batch index file to a pool of long-lived blender worker processes.
+
+    The server runs inside the launcher (run.py) and listens on a local socket. Each worker connects once and then
+    repeatedly asks for the next line, runs the pipeline for it and reports back whether it succeeded.
+
+    - Failed lines are put back into the queue until they have been tried max_retries + 1 times.
+    - If a worker dies while processing a line, this counts as a failed try of that line.
+    - Every finished line is appended to a ledger file, lines which are marked as done in the ledger are skipped when
+      the same index file is processed again (resume after a crash or a canceled cluster job).
+
+    The messages are json encoded, so the launcher python and the python of blender do not have to agree on a
+    pickle protocol.
+    """
+
+    def __init__(self, index_file, ledger_path, max_retries=1):
+        """
+        :param index_file: The path to the index file, each line contains the arguments for one pipeline run.
+        :param ledger_path: The path to the ledger file, used for resuming a batch. Type: string.
+        :param max_retries: How often a failed line is retried, before it is marked as failed. Type: int.
+        """
+        self._ledger_path = ledger_path
+        self._max_retries = max_retries
+
+        with open(index_file, "r") as f:
+            lines = [line.rstrip("\n") for line in f.readlines()]
+
+        already_done = self._read_ledger()
+        self._pending = []
+        self._skipped = 0
+        for line_index, line in enumerate(lines):
+            if line.strip() == "":
+                continue
+            if (line_index, line) in already_done:
+                self._skipped += 1
+            else:
+                self._pending.append(line_index)
+        self._lines = lines
+        self._tries = {}
+        self._in_flight = {}
+        self.succeeded = []
+        self.failed = []
+
+        self._condition = threading.Condition()
+        self._listener = None
+        self._closed = False
+        self.authkey = os.urandom(16)
+
+    def _read_ledger(self):
+        """ Reads all lines, which were already successfully processed, from the ledger.
+
+        :return: A set of (line_index, line) tuples.
+        """
+        done = set()
+        if os.path.exists(self._ledger_path):
+            with open(self._ledger_path, "r") as f:
+                for entry in f:
+                    try:
+                        entry = json.loads(entry)
+                    except ValueError:
+                        # The last entry might be incomplete, if the launcher was killed during writing
+                        continue
+                    if entry["status"] == "done":
+                        done.add((entry["line"], entry["args"]))
+        return done
+
+    def _append_to_ledger(self, line_index, status, message=""):
+        """ Appends the result of one line to the ledger.
+
+        :param line_index: The index of the line inside the index file.
+        :param status: Either "done" or "failed".
+        :param message: An optional error message.
+        """
+        with open(self._ledger_path, "a") as f:
+            f.write(json.dumps({"line": line_index, "args": self._lines[line_index], "status": status,
+                                "tries": self._tries.get(line_index, 0), "message": message}) + "\n")
+
+    def start(self):
+        """ Opens the local socket and starts accepting workers in a background thread.
+
+        :return: The (host, port) address the workers should connect to.
+        """
+        self._listener = Listener(("127.0.0.1", 0), authkey=self.authkey)
+        accept_thread = threading.Thread(target=self._accept_workers, daemon=True)
+        accept_thread.start()
+        print("Batch queue: {} lines to process, {} lines skipped as they are already done according to "
+              "{}".format(len(self._pending), self._skipped, self._ledger_path))
+        return self._listener.address
+
+    def stop(self):
+        """ Stops accepting new workers. """
+        self._closed = True
+        if self._listener is not None:
+            self._listener.close()
+
+    def has_open_jobs(self):
+        """ Returns True, if there are lines which still have to be processed or are currently being processed. """
+        with self._condition:
+            return len(self._pending) > 0 or len(self._in_flight) > 0
+
+    def _accept_workers(self):
+        """ Accepts new worker connections, every worker is served in its own thread. """
+        while not self._closed:
+            try:
+                connection = self._listener.accept()
+            except Exception:
+                # Either the listener was closed or a client failed the authentication
+                continue
+            threading.Thread(target=self._serve_worker, args=(connection,), daemon=True).start()
+
+    def _next_line(self, worker_id):
+        """ Blocks until a line is available or all lines have been finished.
+
+        :param worker_id: The id of the worker asking for a line.
+        :return: The index of the next line or None, if there is nothing left to do.
+        """
+        with self._condition:
+            while len(self._pending) == 0 and len(self._in_flight) > 0:
+                # A line which is currently processed might fail and be requeued
+                self._condition.wait()
+            if len(self._pending) == 0:
+                return None
+            line_index = self._pending.pop(0)
+            self._tries[line_index] = self._tries.get(line_index, 0) + 1
+            self._in_flight[line_index] = worker_id
+            return line_index
+
+    def _finish_line(self, line_index, success, message=""):
+        """ Marks the given line as finished, failed lines are requeued if they have retries left.
+
+        :param line_index: The index of the finished line.
+        :param success: True, if the pipeline run was successful.
+        :param message: An optional error message.
+        """
+        with self._condition:
+            if line_index not in self._in_flight:
+                return
+            del self._in_flight[line_index]
+            if success:
+                self.succeeded.append(line_index)
+                self._append_to_ledger(line_index, "done")
+            elif self._tries[line_index] <= self._max_retries:
+                print("Batch queue: line {} failed (try {}), it will be retried.".format(line_index, self._tries[line_index]))
+                self._pending.append(line_index)
+            else:
+                print("Batch queue: line {} failed {} times, giving up.".format(line_index, self._tries[line_index]))
+                self.failed.append(line_index)
+                self._append_to_ledger(line_index, "failed", message)
+            self._condition.notify_all()
+
+    def _serve_worker(self, connection):
+        """ Answers all requests of one worker until it disconnects.
+
+        :param connection: The connection to the worker.
+        """
+        current_line = None
+        try:
+            while True:
+                request = json.loads(connection.recv_bytes().decode("utf-8"))
+                if request["type"] == "next":
+                    current_line = self._next_line(request["worker_id"])
+                    if current_line is None:
+                        response = {"line": None}
+                    else:
+                        response = {"line": current_line, "args": self._lines[current_line]}
+                    connection.send_bytes(json.dumps(response).encode("utf-8"))
+                elif request["type"] == "finished":
+                    self._finish_line(request["line"], request["success"], request.get("message", ""))
+                    current_line = None
+                    connection.send_bytes(json.dumps({"ack": True}).encode("utf-8"))
+                else:
+                    raise Exception("Unknown request type: {}".format(request["type"]))
+        except (EOFError, OSError):
+            # The worker has disconnected, if it was still working on a line, it probably crashed
+            if current_line is not None:
+                self._finish_line(current_line, False, "The worker process terminated unexpectedly.")
+        finally:
+            connection.close()
+
+
+class BatchQueueClient:
+    """ Used inside a blender worker process to pull lines from the BatchQueueServer of the launcher. """
+
+    def __init__(self, address, authkey, worker_id):
+        """
+        :param address: The (host, port) address of the server.
+        :param authkey: The authentication key of the server. Type: bytes.
+        :param worker_id: The id of this worker, only used for logging. Type: int.
+        """
+        self._connection = Client(address, authkey=authkey)
+        self._worker_id = worker_id
+
+    def _request(self, request):
+        """ Sends the given request to the server and returns its response.
+
+        :param request: A json serializable dict.
+        :return: The response dict.
+        """
+        self._connection.send_bytes(json.dumps(request).encode("utf-8"))
+        return json.loads(self._connection.recv_bytes().decode("utf-8"))
+
+    def next_line(self):
+        """ Returns the next line to process, blocks if currently no line is available.
+
+        :return: A tuple of line index and the arguments as a string or None, if there is nothing left to do.
+        """
+        response = self._request({"type": "next", "worker_id": self._worker_id})
+        if response["line"] is None:
+            return None
+        return response["line"], response["args"]
+
+    def report(self, line_index, success, message=""):
+        """ Tells the server, that the given line has been processed.
+
+        :param line_index: The index of the processed line.
+        :param success: True, if the pipeline run was successful.
+        :param message: An optional error message.
+        """
+        self._request({"type": "finished", "line": line_index, "success": success, "message": message})
+
+    def close(self):
+        """ Closes the connection to the server. """
+        self._connection.close()
@@ -4,6 +4,8 @@
 
 import numpy as np
 
+from src.utility.MeshGeometryCache import MeshGeometryCache
+
 
 def triangulate(obj, transform=True, triangulate=True, apply_modifiers=False):
     """
@@ -97,83 +99,33 @@ def is_overlapping_1D(x_min_1, x_max_1, x_min_2, x_max_2):
 
 def check_intersection(obj, obj2, cache = None):
     """
-    Checks if the two objects are colliding, the code is from:
-        https://blender.stackexchange.com/questions/9073/how-to-check-if-two-meshes-intersect-in-python
+    Checks if the two objects are colliding, by checking if their triangles overlap.
 
-    The check is performed along the edges from the object, which has less edges.
+    The geometry of each mesh is only read once and for each object a bvh tree is only built once per pose, both is
+    stored in the given cache. The scene is not changed by this check.
 
     :param obj1: object 1 to check for intersection, must be a mesh
     :param obj2: object 2 to check for intersection, must be a mesh
-    returns a boolean and the cache of the objects, which already have been triangulated
+    :param cache: a MeshGeometryCache, which should be reused over several checks. A dict is also accepted, the
+                  MeshGeometryCache is then stored inside of it.
+    returns a boolean and the cache of the objects, which have already been processed
     """
     assert(obj != obj2)
 
     if cache is None:
-        cache = {}
-    
-    assert(type(cache) == type({})) # cache must be a dict
+        cache = MeshGeometryCache()
 
-    # Triangulate (Load from cache if available)
-    if obj.name in cache:
-        bm = cache[obj.name]
+    if isinstance(cache, dict):
+        geometry_cache = cache.setdefault("mesh_geometry_cache", MeshGeometryCache())
     else:
-        bm = triangulate(obj, transform=True, triangulate=True)
-        cache[obj.name] = bm
+        geometry_cache = cache
 
-    if obj2.name in cache:
-        bm2 = cache[obj2.name]
-    else:
-        bm2 = triangulate(obj2, transform=True, triangulate=True)
-        cache[obj2.name] = bm2
-
-    # If bm has more edges, use bm2 instead for looping over its edges
-    # (so we cast less rays from the simpler object to the more complex object)
-    if len(bm.edges) > len(bm2.edges):
-        bm2, bm = bm, bm2
-
-    # Create a real mesh 
-    scene = bpy.context.scene
-    me_tmp = bpy.data.meshes.new(name="~temp~")
-    bm2.to_mesh(me_tmp)
-    bm2.free()
-    obj_tmp = bpy.data.objects.new(name=me_tmp.name, object_data=me_tmp)
-    scene.collection.objects.link(obj_tmp)
-    bpy.context.view_layer.update()
-    
-    # this ray_cast is performed in object coordinates, but both objects were moved in world coordinates
-    # so the world_matrix is the identity matrix
-    ray_cast = obj_tmp.ray_cast
-
-    intersect = False
-
-    EPS_NORMAL = 0.000001
-    EPS_CENTER = 0.01  # should always be bigger
-
-    #for ed in me_tmp.edges:
-    for ed in bm.edges:
-        v1, v2 = ed.verts
-
-        # setup the edge with an offset
-        co_1 = v1.co.copy()
-        co_2 = v2.co.copy()
-        co_mid = (co_1 + co_2) * 0.5
-        no_mid = (v1.normal + v2.normal).normalized() * EPS_NORMAL
-        # interpolation between co_1 and co_mid, with a small value to get away from the original co_1
-        # plus the average direction of the normal to get away from the object itself
-        co_1 = co_1.lerp(co_mid, EPS_CENTER) + no_mid
-        co_2 = co_2.lerp(co_mid, EPS_CENTER) + no_mid
-
-        t, co, no, index = ray_cast(co_1, (co_2 - co_1).normalized(), distance=ed.calc_length())
-        if index != -1:
-            intersect = True
-            break
-
-    scene.collection.objects.unlink(obj_tmp)
-    bpy.data.objects.remove(obj_tmp)
-    bpy.data.meshes.remove(me_tmp)
-
-    # new method to udpate scene
-    bpy.context.view_layer.update()
+    bvh_tree = geometry_cache.get_world_bvh_tree(obj)
+    bvh_tree2 = geometry_cache.get_world_bvh_tree(obj2)
+    if bvh_tree is None or bvh_tree2 is None:
+        return False, cache
+
+    intersect = len(bvh_tree.overlap(bvh_tree2)) > 0
 
     return intersect, cache
 
@@ -321,21 +273,29 @@ def load_image(file_path, num_channels=3):
 
     The alpha channel is neglected.
 
+    The pixels are copied with foreach_get directly into a preallocated float32 array, which avoids the creation of a
+    python list of all pixel values. The blender image is removed right afterwards, so no image data blocks are
+    leaked, when this is called for every frame.
+
     :param file_path: The path to the image.
     :param num_channels: Number of channels to return.
     :return: The numpy array
     """
     # load image with blender function
     img = bpy.data.images.load(file_path, check_existing=False)
-    # convert image to proper size
-    size = img.size
-    channels = img.channels
-    img = np.array(img.pixels).reshape(size[1], size[0], channels)
-    img = np.flip(img, axis=0)
+    try:
+        width, height = img.size
+        channels = img.channels
+        pixels = np.empty(width * height * channels, dtype=np.float32)
+        img.pixels.foreach_get(pixels)
+    finally:
+        bpy.data.images.remove(img)
+    # blender stores the rows from bottom to top, flip them and only keep the requested channels
+    img = pixels.reshape(height, width, channels)[::-1, :, :num_channels]
     if file_path.endswith('.png') or file_path.endswith('.jpg'):
         # convert the 0 to 1 space to 0 ... 255 and save it as uint8
-        img = (img * 255).astype(np.uint8)
-    return img[:, :, :num_channels]
+        return (img * 255).astype(np.uint8)
+    return np.ascontiguousarray(img)
 
 def get_bound_volume(obj):
     """ Gets the volume of a possible orientated bounding box.
@@ -357,20 +317,32 @@ def get_bound_volume(obj):
     # use the diagonal to calculate the volume of the box
     return abs(diag[0]) * abs(diag[1]) * abs(diag[2])
 
-def duplicate_objects(objects):
+def duplicate_objects(objects, linked=False, collection=None):
     """
     Creates duplicates of objects, first duplicates are given name <orignial_object_name>.001
-    
+
+    The objects are copied on the data level via obj.copy(), which is much faster than the duplicate operator and
+    does not change the selection. As with the operator, the materials are shared with the original objects.
+
     :param objects: an object or a list of objects to be duplicated
+    :param linked: If True, the duplicates share their mesh data with the original objects (instancing), this saves
+                   memory, but changes to the mesh or its materials, e.g. by the SegMapRenderer, affect all of them.
+    :param collection: The collection the duplicates are linked to. Per default, they are linked to the collections of
+                       the original objects.
     :return: a list of objects
     """
     if not isinstance(objects, list):
         objects = [objects]
 
-    bpy.ops.object.select_all(action='DESELECT')
+    duplicates = []
     for obj in objects:
-        obj.select_set(True)
-    bpy.ops.object.duplicate()
-    duplicates = bpy.context.selected_objects
-    bpy.ops.object.select_all(action='DESELECT')
+        duplicate = obj.copy()
+        if not linked and obj.data is not None:
+            duplicate.data = obj.data.copy()
+        duplicates.append(duplicate)
+
+    # link all duplicates after they have been created
+    for obj, duplicate in zip(objects, duplicates):
+        for target_collection in ([collection] if collection is not None else obj.users_collection):
+            target_collection.objects.link(duplicate)
     return duplicates
@@ -2,7 +2,6 @@
 from itertools import groupby
 
 import numpy as np
-from skimage import measure
 
 
 class CocoUtility:
@@ -240,6 +239,9 @@ def binary_mask_to_polygon(binary_mask, tolerance=0):
          :param tolerance: Maximum distance from original points of polygon to approximated polygonal chain. If
                            tolerance is 0, the original coordinate array is returned.
         """
+        # skimage is only needed for the polygon encoding
+        from skimage import measure
+
         polygons = []
         # pad mask to close contours of shapes which start and end at an edge
         padded_binary_mask = np.pad(binary_mask, pad_width=1, mode='constant', constant_values=0)
@@ -4,10 +4,47 @@
 from src.main.Provider import Provider
 from src.main.GlobalStorage import GlobalStorage
 
+# Marks parameters which could not be found
+_MISSING = object()
+
+
+class _CacheEntry:
+    """ The location of a resolved parameter, its value and the typed values derived from it. """
+
+    __slots__ = ["block", "key", "value", "converted"]
+
+    def __init__(self, block, key):
+        self.block = block
+        self.key = key
+        self.value = block[key]
+        # maps a conversion (e.g. ("vector", 3)) to the converted value, only used for static values
+        self.converted = {}
+
+    def is_valid(self):
+        """ Returns True, if the value stored in the config data is still the cached one. """
+        return self.block.get(self.key, _MISSING) is self.value
+
+    def is_static(self):
+        """ Returns True, if the value is not generated by a provider. """
+        return type(self.value) is not dict and not isinstance(self.value, Provider)
+
+
 class Config:
+    """ Gives typed access to a configuration dict.
+
+    The location of every looked up parameter (the resolved "/" separated path or the fallback to the global config)
+    is cached, so repeated lookups, e.g. inside of sampling loops, only need one dict access. A cache entry is only
+    used, if the config data still contains the same value object at this location, so replaced values are noticed,
+    but lists which are changed in place are not. Vectors and matrices of static values are only created once and
+    then copied. Values which are generated by a provider are still evaluated at every lookup.
+    """
 
     def __init__(self, data):
         self.data = data
+        # maps a parameter name to its _CacheEntry
+        self._lookup_cache = {}
+        # the global config the cache entries were resolved with
+        self._cached_global_config = None
 
     def has_param(self, name, block=None):
         """ Check if parameter is defined in config 
@@ -28,16 +65,17 @@ def has_param(self, name, block=None):
             return name in block
             
         return False
-            
-    def _get_value(self, name, block=None, allow_invoke_provider=False, global_check=True):
-        """ Returns the value of the parameter with the given name inside the given block.
 
-        Basically just a recursive dict lookup, making sure the parameter exists, otherwise an error is thrown.
+    def _find(self, name, block=None, global_check=True):
+        """ Returns the location of the parameter with the given name.
+
+        Basically just a recursive dict lookup, if the parameter does not exist in the given block, the global config
+        is checked.
 
         :param name: The name of the parameter. "/" can be used to represent nested parameters (e.q. "render/iterations" results in ["render"]["iterations]
         :param block: A dict containing the configuration. If none, the whole data of this config object will be used.
-        :param allow_invoke_provider: If set to True, then a provider is automatically invoked if the parameter value is a dict.
-        :return: The value of the parameter.
+        :param global_check: If True, the global config is checked, if the parameter is not found in the block.
+        :return: A tuple of the dict containing the parameter and its key or None, if the parameter does not exist.
         """
         if block is None:
             block = self.data
@@ -46,27 +84,56 @@ def _get_value(self, name, block=None, allow_invoke_provider=False, global_check
             delimiter_pos = name.find("/")
             block_name = name[:delimiter_pos]
             if block_name in block and type(block[block_name]) is dict:
-                return self._get_value(name[delimiter_pos + 1:], block[block_name], allow_invoke_provider)
-            else:
-                raise NotFoundError("No such configuration block '" + block_name + "'!")
-        else:
-            if name in block:
-
-                # Check for whether a provider should be invoked
-                if allow_invoke_provider and type(block[name]) is dict:
-                    block[name] = Utility.Utility.build_provider_based_on_config(block[name])
-
-                # If the parameter is set to a provider object, call the provider to return the parameter value
-                if isinstance(block[name], Provider):
-                    return block[name].run()
-                else:
-                    return block[name]
-            elif global_check and GlobalStorage.has_param(name):
-                # this might also throw an NotFoundError
-                return GlobalStorage.get_global_config()._get_value(name, None, allow_invoke_provider, global_check=False)
-            else:
-                raise NotFoundError("No such configuration '" + name + "'!")
-            
+                return self._find(name[delimiter_pos + 1:], block[block_name])
+            return None
+        elif name in block:
+            return block, name
+        elif global_check and GlobalStorage.has_param(name):
+            return GlobalStorage.get_global_config()._find(name, None, global_check=False)
+        return None
+
+    def _get_cache_entry(self, name):
+        """ Returns the cache entry of the parameter with the given name, the parameter is resolved if necessary.
+
+        :param name: The name of the parameter. "/" can be used to represent nested parameters (e.q. "render/iterations" results in ["render"]["iterations]
+        :return: The _CacheEntry or None, if the parameter does not exist.
+        """
+        # The fallback to the global config depends on the global config, which is replaced by each pipeline run
+        if GlobalStorage._global_config is not self._cached_global_config:
+            self._lookup_cache = {}
+            self._cached_global_config = GlobalStorage._global_config
+
+        entry = self._lookup_cache.get(name)
+        if entry is None or not entry.is_valid():
+            location = self._find(name)
+            if location is None:
+                # Missing parameters are not cached, as they could be added to the data later on
+                return None
+            entry = _CacheEntry(*location)
+            self._lookup_cache[name] = entry
+        return entry
+
+    def _get_value(self, name, allow_invoke_provider=False):
+        """ Returns the value of the parameter with the given name.
+
+        :param name: The name of the parameter. "/" can be used to represent nested parameters (e.q. "render/iterations" results in ["render"]["iterations]
+        :param allow_invoke_provider: If set to True, then a provider is automatically invoked if the parameter value is a dict.
+        :return: The value of the parameter or _MISSING, if it does not exist.
+        """
+        entry = self._get_cache_entry(name)
+        if entry is None:
+            return _MISSING
+
+        # Check for whether a provider should be invoked
+        if allow_invoke_provider and type(entry.value) is dict:
+            entry.value = Utility.Utility.build_provider_based_on_config(entry.value)
+            entry.block[entry.key] = entry.value
+
+        # If the parameter is set to a provider object, call the provider to return the parameter value
+        if isinstance(entry.value, Provider):
+            return entry.value.run()
+        return entry.value
+
     def _get_value_with_fallback(self, name, fallback=None, allow_invoke_provider=False):
         """ Returns the value of the given parameter with the given name.
 
@@ -78,13 +145,30 @@ def _get_value_with_fallback(self, name, fallback=None, allow_invoke_provider=Fa
         :param allow_invoke_provider: If set to True, then a provider is automatically invoked if the parameter value is a dict.
         :return: The value of the parameter.
         """
-        try:
-            return self._get_value(name, None, allow_invoke_provider)
-        except NotFoundError:
+        value = self._get_value(name, allow_invoke_provider)
+        if value is _MISSING:
             if fallback is not None:
                 return fallback
             else:
-                raise
+                raise NotFoundError("No such configuration '" + name + "'!")
+        return value
+
+    def _get_converted(self, name, conversion, convert, fallback):
+        """ Returns the converted value of the given parameter, for static values the conversion is only done once.
+
+        :param name: The name of the parameter.
+        :param conversion: A hashable description of the conversion, e.g. ("vector", 3).
+        :param convert: A function converting the fallback-aware raw value, called with the name and the fallback.
+        :param fallback: The fallback value.
+        :return: A copy of the converted value.
+        """
+        entry = self._get_cache_entry(name)
+        if entry is None or not entry.is_static():
+            return convert(name, fallback)
+        if conversion not in entry.converted:
+            entry.converted[conversion] = convert(name, fallback)
+        # mathutils objects are mutable, so the cached one must not be handed out
+        return entry.converted[conversion].copy()
 
     def get_raw_dict(self, name, fallback=None):
         """ Returns the complete dict stored at the given parameter path.
@@ -194,6 +278,10 @@ def get_vector(self, name, fallback=None, dimensions=None):
         :param dimensions: If not None, specifies the required number of dimensions. If the configured vector has not exactly this number of dimensions, an error is thrown.
         :return: The vector.
         """
+        return self._get_converted(name, ("vector", dimensions), lambda name, fallback: self._to_vector(name, fallback, dimensions), fallback)
+
+    def _to_vector(self, name, fallback, dimensions):
+        """ Converts the list stored at the given parameter path into a mathutils vector, see get_vector(). """
         value = self.get_list(name, fallback)
 
         if dimensions is not None and len(value) != dimensions:
@@ -249,6 +337,10 @@ def get_matrix(self, name, fallback=None, dimensions=None):
         :param dimensions: If not None, specifies the required number of dimensions. If the configured matrix has not exactly this dimensional, an error is thrown.
         :return: The matrix.
         """
+        return self._get_converted(name, ("matrix", dimensions), lambda name, fallback: self._to_matrix(name, fallback, dimensions), fallback)
+
+    def _to_matrix(self, name, fallback, dimensions):
+        """ Converts the value stored at the given parameter path into a mathutils matrix, see get_matrix(). """
         value = self.get_raw_value(name, fallback)
 
         if dimensions is not None and (len(value) != dimensions or not all(len(item) == dimensions for item in value)):
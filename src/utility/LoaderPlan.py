@@ -0,0 +1,400 @@
+import csv
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from src.utility.LabelIdMapping import LabelIdMapping
+
+# Creates an empty object, which acts as parent for other objects. Later operations reference it via its key.
+CreateEmpty = namedtuple("CreateEmpty", ["key", "name", "parent", "properties"])
+# Imports the .obj file at path, sets the properties and material adjustments and applies the 4x4 transform (row-wise)
+ImportObject = namedtuple("ImportObject", ["path", "parent", "properties", "material_adjustments", "transform"])
+# Creates a cube with the given dimensions
+CreateBox = namedtuple("CreateBox", ["name", "dimensions", "parent", "material_adjustments", "transform"])
+# Creates a mesh object from flat arrays, which can directly be passed to foreach_set
+CreateMesh = namedtuple("CreateMesh", ["name", "category_id", "material", "vertices", "normals", "vertex_indices",
+                                       "loop_start", "loop_total", "uvs"])
+# Imports the 3D-FUTURE model stored in folder_path for the furniture element with the given uid
+ImportFurniture = namedtuple("ImportFurniture", ["jid", "uid", "folder_path", "path", "name", "category_id"])
+# Places the furniture element with the given uid, rotation is a 3x3 matrix already in the blender coordinate system
+PlaceFurniture = namedtuple("PlaceFurniture", ["uid", "room_id", "location", "rotation", "scale"])
+
+
+class LoaderPlan:
+    """ Does all the work of a loader which does not need blender: parsing the scene files and the category mappings,
+    checking which model files exist and computing the transformations.
+
+    The result is a list of operations (the namedtuples of this module), which the loader only has to execute in
+    blender. The work is distributed over a pool of threads and operations() returns the operations in order, as soon
+    as each one is ready, so the loader can already create the first objects while the following ones are prepared.
+
+    As nothing here depends on bpy, the plans can also be created and checked outside of blender.
+    """
+
+    def __init__(self, num_worker_threads=4):
+        """
+        :param num_worker_threads: The number of threads which prepare the operations. Type: int.
+        """
+        self._num_worker_threads = max(1, num_worker_threads)
+
+    def operations(self):
+        """ Yields the operations in the order in which they have to be executed.
+
+        :return: A generator of operations.
+        """
+        with ThreadPoolExecutor(max_workers=self._num_worker_threads) as pool:
+            for operation in self._plan(pool):
+                # operations which are still prepared by the pool are submitted as futures
+                if isinstance(operation, Future):
+                    operation = operation.result()
+                # None marks operations which turned out to be unnecessary, e.g. as their file is missing
+                if operation is not None:
+                    yield operation
+
+    def plan(self):
+        """ Returns all operations at once.
+
+        :return: The list of operations.
+        """
+        return list(self.operations())
+
+    def _plan(self, pool):
+        """ Yields the operations or futures of them. All futures should be submitted, before the first one is
+        yielded, otherwise the pool only works on one future at a time.
+
+        :param pool: The thread pool, which should be used for the preparation.
+        :return: A generator of operations or futures.
+        """
+        raise NotImplementedError("Please implement this method")
+
+    @staticmethod
+    def _read_json(path):
+        """ Parses the given json file.
+
+        :param path: The path to the json file.
+        :return: The parsed data.
+        """
+        with open(path, "r") as f:
+            return json.load(f)
+
+
+
+class SuncgLoaderPlan(LoaderPlan):
+    """ Plans the loading of a SUNCG house.json file: levels and rooms become empties, floors, ceilings, walls and
+    objects are imported from their .obj files and boxes are created as cubes.
+    """
+
+    def __init__(self, house_path, suncg_dir, category_mapping_path, label_id_map, num_worker_threads=4):
+        """
+        :param house_path: The path to the house.json file. Type: string.
+        :param suncg_dir: The absolute path to the suncg root directory. Type: string.
+        :param category_mapping_path: The path to the csv file, which maps model ids to categories. Type: string.
+        :param label_id_map: Maps category names to their ids. Type: dict.
+        :param num_worker_threads: The number of threads which prepare the operations. Type: int.
+        """
+        LoaderPlan.__init__(self, num_worker_threads)
+        self._house_path = house_path
+        self._suncg_dir = suncg_dir
+        self._category_mapping_path = category_mapping_path
+        self._label_id_map = label_id_map
+
+    def _plan(self, pool):
+        house_future = pool.submit(LoaderPlan._read_json, self._house_path)
+        mapping_future = pool.submit(SuncgLoaderPlan._read_model_category_mapping, self._category_mapping_path)
+        house = house_future.result()
+        category_mapping = mapping_future.result()
+
+        # the levels are independent of each other
+        level_futures = [pool.submit(self._plan_level, level, house["id"], category_mapping)
+                         for level in house["levels"]]
+        for level_future in level_futures:
+            # the files of each operation are checked in the pool, while the previous operations are already executed
+            for operation_future in [pool.submit(self._check_files, operation) for operation in level_future.result()]:
+                yield operation_future
+
+    def _check_files(self, operation):
+        """ Checks the model file of the given operation and looks up the files of its textures.
+
+        :param operation: A planned operation.
+        :return: The operation with the paths of its textures or None, if its model file is missing.
+        """
+        if isinstance(operation, ImportObject) and not os.path.exists(operation.path):
+            print("Warning: " + operation.path + " is missing")
+            return None
+        if isinstance(operation, CreateEmpty):
+            return operation
+        # the adjustments of one node are shared by its operations, so they are copied before they are changed
+        material_adjustments = [dict(adjustment) for adjustment in operation.material_adjustments]
+        for adjustment in material_adjustments:
+            if "texture" in adjustment:
+                adjustment["texture_path"] = self._find_texture(adjustment["texture"])
+        return operation._replace(material_adjustments=material_adjustments)
+
+    @staticmethod
+    def _read_model_category_mapping(path):
+        """ Reads in the model category mapping csv.
+
+        :param path: The path to the csv file.
+        :return: A dict mapping each model id to a dict with its "nyuv2_40class", "fine_grained_class" and
+                 "coarse_grained_class".
+        """
+        category_mapping = {}
+        with open(path, 'r') as csvfile:
+            reader = csv.DictReader(csvfile)
+            for row in reader:
+                category_mapping[row["model_id"]] = {key: row[key] for key in ["nyuv2_40class", "fine_grained_class",
+                                                                               "coarse_grained_class"]}
+        return category_mapping
+
+    def _find_texture(self, texture):
+        """ Returns the path of the given texture of the house.json file.
+
+        :param texture: The name of the texture.
+        :return: The path of the .png or .jpg file of the texture or None, if neither exists.
+        """
+        for extension in [".png", ".jpg"]:
+            image_path = os.path.join(self._suncg_dir, "texture", texture) + extension
+            if os.path.exists(image_path):
+                return image_path
+        return None
+
+    @staticmethod
+    def _correct_bbox_frame(bbox):
+        """ Corrects the coordinate frame of the given bbox.
+
+        :param bbox: The bbox.
+        :return: The corrected bbox.
+        """
+        return {
+            "min": [bbox["min"][0], -bbox["min"][2], bbox["min"][1]],
+            "max": [bbox["max"][0], -bbox["max"][2], bbox["max"][1]]
+        }
+
+    def _plan_level(self, level, house_id, category_mapping):
+        """ Plans the loading of one level.
+
+        :param level: The level dict of the house.json.
+        :param house_id: The id of the current house.
+        :param category_mapping: The model category mapping.
+        :return: The list of operations of this level.
+        """
+        # Build empty level object which acts as a parent for all rooms on the level
+        level_key = "Level#" + level["id"]
+        level_properties = {"type": "Level"}
+        if "bbox" in level:
+            level_properties["bbox"] = self._correct_bbox_frame(level["bbox"])
+        else:
+            print("Warning: The level with id " + level["id"] + " is missing the bounding box attribute in the given house.json file!")
+        operations = [CreateEmpty(level_key, level_key, None, level_properties)]
+
+        room_per_object = {}
+        for node in level["nodes"]:
+            # Skip invalid nodes (This is the same behavior as in the SUNCG Toolbox)
+            if "valid" in node and node["valid"] == 0:
+                continue
+
+            # Metadata is directly stored in the objects custom data
+            metadata = {
+                "type": node["type"],
+                "is_suncg": True
+            }
+
+            if "modelId" in node:
+                metadata["modelId"] = node["modelId"]
+
+                if node["modelId"] in category_mapping:
+                    categories = category_mapping[node["modelId"]]
+                    metadata["fine_grained_class"] = categories["fine_grained_class"]
+                    metadata["coarse_grained_class"] = categories["coarse_grained_class"]
+                    metadata["category_id"] = self._label_id_map[categories["nyuv2_40class"]]
+
+            if "bbox" in node:
+                metadata["bbox"] = self._correct_bbox_frame(node["bbox"])
+
+            if "transform" in node:
+                # Transpose, as given transform matrix was col-wise, but blender expects row-wise
+                transform = np.array(node["transform"], dtype=np.float64).reshape(4, 4).T.tolist()
+            else:
+                transform = None
+
+            material_adjustments = node["materials"] if "materials" in node else []
+
+            # Lookup if the object belongs to a room
+            object_id = int(node["id"].split("_")[-1])
+            parent = room_per_object.get(object_id, level_key)
+
+            if node["type"] == "Room":
+                operations.extend(self._plan_room(node, metadata, material_adjustments, transform, house_id,
+                                                  level_key, room_per_object))
+            elif node["type"] == "Ground":
+                metadata.update({"type": "Ground", "category_id": self._label_id_map["floor"],
+                                 "fine_grained_class": "ground"})
+                operations.append(ImportObject(os.path.join(self._suncg_dir, "room", house_id, node["modelId"] + "f.obj"),
+                                               parent, metadata, material_adjustments, transform))
+            elif node["type"] == "Object":
+                if "state" not in node or node["state"] == 0:
+                    path = os.path.join(self._suncg_dir, "object", node["modelId"], node["modelId"] + ".obj")
+                else:
+                    path = os.path.join(self._suncg_dir, "object", node["modelId"], node["modelId"] + "_0.obj")
+                operations.append(ImportObject(path, parent, metadata, material_adjustments, transform))
+            elif node["type"] == "Box":
+                operations.append(CreateBox("Box#" + node["id"], node["dimensions"], parent, material_adjustments,
+                                            transform))
+        return operations
+
+    def _plan_room(self, node, metadata, material_adjustments, transform, house_id, parent, room_per_object):
+        """ Plans the loading of the room specified in the given node.
+
+        :param node: The node dict which contains information from house.json..
+        :param metadata: A dict of metadata which will be written into the object's custom data.
+        :param material_adjustments: Adjustments to the materials which were specified inside house.json.
+        :param transform: The transformation that should be applied to the loaded objects.
+        :param house_id: The id of the current house.
+        :param parent: The key of the level to which the room should be linked
+        :param room_per_object: A dict for object -> room lookup (Will be written into)
+        :return: The list of operations of this room.
+        """
+        # Build empty room object which acts as a parent for all objects inside
+        room_key = "Room#" + node["id"]
+        operations = [CreateEmpty(room_key, room_key, parent, {"type": "Room",
+                                                               "bbox": self._correct_bbox_frame(node["bbox"]),
+                                                               "roomTypes": node["roomTypes"]})]
+        # Store indices of all contained objects in
+        if "nodeIndices" in node:
+            for child_id in node["nodeIndices"]:
+                room_per_object[child_id] = room_key
+
+        for hide_key, category, fine_grained_class, suffix in [("hideFloor", "floor", "Floor", "f"),
+                                                               ("hideCeiling", "ceiling", "Ceiling", "c"),
+                                                               ("hideWalls", "wall", "Wall", "w")]:
+            if hide_key not in node or node[hide_key] != 1:
+                part_metadata = dict(metadata)
+                part_metadata.update({"type": fine_grained_class, "category_id": self._label_id_map[category],
+                                      "fine_grained_class": category})
+                operations.append(ImportObject(os.path.join(self._suncg_dir, "room", house_id,
+                                                            node["modelId"] + suffix + ".obj"),
+                                               room_key, part_metadata, material_adjustments, transform))
+        return operations
+
+
+class Front3DLoaderPlan(LoaderPlan):
+    """ Plans the loading of a 3D-Front json file: the meshes of the rooms are parsed into flat arrays, the used
+    3D-FUTURE models are looked up and the placement of each furniture element is computed.
+    """
+
+    def __init__(self, json_path, future_model_path, mapping_file, num_worker_threads=4):
+        """
+        :param json_path: The path to the json file of the house. Type: string.
+        :param future_model_path: The path to the 3D-FUTURE models. Type: string.
+        :param mapping_file: The csv file, which maps the names of the objects to ids. Type: string.
+        :param num_worker_threads: The number of threads which prepare the operations. Type: int.
+        """
+        LoaderPlan.__init__(self, num_worker_threads)
+        self._json_path = json_path
+        self._future_model_path = future_model_path
+        self._mapping_file = mapping_file
+
+    def _plan(self, pool):
+        data_future = pool.submit(LoaderPlan._read_json, self._json_path)
+        mapping_future = pool.submit(LabelIdMapping.read_csv_mapping, self._mapping_file)
+        data = data_future.result()
+        _, mapping = mapping_future.result()
+        if "scene" not in data:
+            raise Exception("There is no scene data in this json file: {}".format(self._json_path))
+
+        # extract all used materials -> there are more materials defined than used
+        used_materials = {}
+        for mat in data["material"]:
+            if mat["uid"] not in used_materials:
+                used_materials[mat["uid"]] = {"texture": mat["texture"], "normaltexture": mat["normaltexture"],
+                                              "color": mat["color"]}
+        # submit all meshes and file checks at once, so they are prepared while the first meshes are created
+        mesh_futures = [pool.submit(Front3DLoaderPlan._plan_mesh, mesh_data, used_materials, mapping)
+                        for mesh_data in data["mesh"]]
+        model_paths = {ele["jid"]: os.path.join(self._future_model_path, ele["jid"], "raw_model.obj")
+                       for ele in data["furniture"]}
+        model_exists = {jid: pool.submit(os.path.exists, path) for jid, path in model_paths.items()}
+
+        for mesh_future in mesh_futures:
+            yield mesh_future
+
+        # if the object exists load it -> a lot of object do not exist
+        # we are unsure why this is -> we assume that not all objects have been made public
+        loaded_uids = set()
+        for ele in data["furniture"]:
+            if model_exists[ele["jid"]].result():
+                # extract the name, which serves as category id
+                used_obj_name = ele["category"]
+                yield ImportFurniture(ele["jid"], ele["uid"], os.path.dirname(model_paths[ele["jid"]]),
+                                      model_paths[ele["jid"]], used_obj_name, mapping[used_obj_name.lower()])
+                loaded_uids.add(ele["uid"])
+
+        for room_id, room in enumerate(data["scene"]["room"]):
+            for child in room["children"]:
+                if "furniture" in child["instanceid"] and child["ref"] in loaded_uids:
+                    # this flips the y and z coordinate to bring it to the blender coordinate system
+                    location = [child["pos"][0], child["pos"][2], child["pos"][1]]
+                    yield PlaceFurniture(child["ref"], room_id, location,
+                                         Front3DLoaderPlan._rotation_to_blender(child["rot"]), child["scale"])
+
+    @staticmethod
+    def _plan_mesh(mesh_data, used_materials, mapping):
+        """ Converts the given mesh of the json file into arrays, which can be directly used by blender.
+
+        :param mesh_data: The mesh dict of the json file.
+        :param used_materials: Maps the uids of the materials to their data.
+        :param mapping: Maps the lower case names of the objects to their ids.
+        :return: The CreateMesh operation.
+        """
+        # extract the obj name, which also is used as the category_id name
+        used_obj_name = mesh_data["type"].strip()
+        # get the material of the current mesh data via its uid
+        used_mat = used_materials.get(mesh_data["material"])
+        if used_mat:
+            if used_mat["texture"]:
+                raise Exception("The material should use a texture, this was not implemented yet!")
+            if used_mat["normaltexture"]:
+                raise Exception("The material should use a normal texture, this was not implemented yet!")
+
+        # extract the vertices, normals, uvs and faces from the mesh_data, the values might be stored as strings
+        vertices = np.array(mesh_data["xyz"], dtype=np.float64).reshape(-1, 3)
+        normal = np.array(mesh_data["normal"], dtype=np.float64).reshape(-1, 3)
+        uv = np.array(mesh_data["uv"], dtype=np.float64).reshape(-1, 2)
+        faces = np.array(mesh_data["faces"], dtype=np.int32)
+
+        # map those to the blender coordinate system by flipping the second and third value and reshape them back
+        # to a long list
+        vertices = vertices[:, [0, 2, 1]].astype(np.float32).ravel()
+        normal = normal[:, [0, 2, 1]].astype(np.float32).ravel()
+
+        # always 3 vertices form one triangle
+        num_vertex_indicies = len(faces)
+        loop_start = np.arange(0, num_vertex_indicies, 3, dtype=np.int32)
+        # the total size of each triangle is therefore 3
+        loop_total = np.full(len(loop_start), 3, dtype=np.int32)
+
+        # the uv coordinates of the face corners are extracted and reshaped back to the long list
+        used_uvs = np.reshape(uv[faces, :], [2 * num_vertex_indicies]).astype(np.float32)
+
+        return CreateMesh(used_obj_name, mapping[used_obj_name.lower()], used_mat if used_mat and used_mat["color"]
+                          else None, vertices, normal, faces, loop_start, loop_total, used_uvs)
+
+    @staticmethod
+    def _rotation_to_blender(quaternion):
+        """ Converts the given rotation of a furniture element into a rotation matrix in the blender coordinate system.
+
+        :param quaternion: The quaternion as [w, x, y, z].
+        :return: The 3x3 rotation matrix as nested list.
+        """
+        quaternion = np.array(quaternion, dtype=np.float64)
+        norm = np.linalg.norm(quaternion)
+        w, x, y, z = quaternion / norm if norm > 0 else [1.0, 0.0, 0.0, 0.0]
+        rotation = np.array([[1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+                             [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+                             [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)]])
+        # this rotation of -90 degrees around the x axis rotates the given quaternion into the blender coordinate system
+        blender_rot_mat = np.array([[1, 0, 0], [0, 0, 1], [0, -1, 0]], dtype=np.float64)
+        return (blender_rot_mat @ rotation).tolist()
@@ -0,0 +1,328 @@
+import os
+
+import numpy as np
+
+
+class MeshFileParser:
+    """ Parses .obj and .ply files into numpy arrays, without creating any blender data.
+
+    The arrays are turned into blender objects by the MeshImporter.
+    """
+
+    # maps the scalar types of .ply files to numpy types
+    _ply_types = {
+        "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+        "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+        "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+        "float": "f4", "float32": "f4", "double": "f8", "float64": "f8"
+    }
+
+    @staticmethod
+    def _parse_floats(lines, num_columns):
+        """ Parses the given lines of whitespace separated numbers into an array with num_columns columns.
+
+        :param lines: The list of lines, every line contains at least num_columns numbers.
+        :param num_columns: The number of columns which are returned, further numbers of a line are ignored.
+        :return: The array of shape [len(lines), num_columns].
+        """
+        if not lines:
+            return np.zeros((0, num_columns))
+        # the lines can have different lengths, e.g. if only some vertices have a w coordinate or a color
+        return np.array([line.split()[:num_columns] for line in lines], dtype=np.float64)
+
+    @staticmethod
+    def _make_indices_absolute(corners, counts):
+        """ Replaces the relative (negative) indices in the given face corners with absolute ones.
+
+        :param corners: The corners of one face, e.g. ["-3/-3", "-2/-2", "-1/-1"].
+        :param counts: The number of positions, tex coords and normals defined before the face.
+        :return: The corners with absolute indices.
+        """
+        absolute_corners = []
+        for corner in corners:
+            parts = corner.split("/")
+            for i, part in enumerate(parts):
+                if part.startswith("-"):
+                    parts[i] = str(int(part) + counts[i] + 1)
+            absolute_corners.append("/".join(parts))
+        return absolute_corners
+
+    @staticmethod
+    def _parse_face_corners(corners):
+        """ Parses the corners of all faces into zero based position, tex coord and normal indices.
+
+        :param corners: The list of corners of all faces, e.g. ["1/1/1", "2/2/2", ...].
+        :return: The position indices and the tex coord and normal indices, which are -1 where they are not given.
+        """
+        first = corners[0]
+        num_slashes = first.count("/")
+        has_double_slash = "//" in first
+        joined = " ".join(corners)
+        if all(corner.count("/") == num_slashes for corner in corners) and \
+                joined.count("//") == (len(corners) if has_double_slash else 0):
+            # all corners have the same format as the first one
+            indices = np.array(joined.replace("//", " ").replace("/", " ").split(), dtype=np.int64)
+            indices = indices.reshape(len(corners), -1) - 1
+            positions = indices[:, 0]
+            tex_coords = indices[:, 1] if num_slashes >= 1 and not has_double_slash else np.full(len(corners), -1)
+            normals = indices[:, -1] if num_slashes == 2 else np.full(len(corners), -1)
+            return positions, tex_coords, normals
+
+        indices = np.full((len(corners), 3), -1, dtype=np.int64)
+        for i, corner in enumerate(corners):
+            for j, part in enumerate(corner.split("/")[:3]):
+                if part:
+                    indices[i, j] = int(part) - 1
+        return indices[:, 0], indices[:, 1], indices[:, 2]
+
+    @staticmethod
+    def read_obj(filepath):
+        """ Reads the geometry and the object, material and smooth group assignments of the given .obj file.
+
+        :param filepath: The path to the .obj file.
+        :return: A dict with the arrays "positions", "tex_coords" and "normals", the zero based indices of every face
+                 corner in "loop_positions", "loop_tex_coords" and "loop_normals" (-1 if not given), the per face
+                 arrays "face_sizes", "face_objects", "face_materials" (-1 if no material is used) and "face_smooth"
+                 and the lists "object_names", "material_names" and "mtl_files". None, if the file has no faces.
+        """
+        with open(filepath, "r", errors="replace") as f:
+            lines = f.read().splitlines()
+
+        position_lines, tex_coord_lines, normal_lines = [], [], []
+        corners, face_sizes, face_objects, face_materials, face_smooth = [], [], [], [], []
+        object_names, material_names, mtl_files = [], [], []
+        current_object, current_material, smooth = -1, -1, False
+        for line in lines:
+            parts = line.split(None, 1)
+            if len(parts) < 2:
+                continue
+            keyword, value = parts
+            if keyword == "v":
+                position_lines.append(value)
+            elif keyword == "vt":
+                tex_coord_lines.append(value)
+            elif keyword == "vn":
+                normal_lines.append(value)
+            elif keyword == "f":
+                face_corners = value.split()
+                if "-" in value:
+                    face_corners = MeshFileParser._make_indices_absolute(
+                        face_corners, [len(position_lines), len(tex_coord_lines), len(normal_lines)])
+                if current_object == -1:
+                    # faces before the first "o" statement are stored in an object named after the file
+                    object_names.append(os.path.splitext(os.path.basename(filepath))[0])
+                    current_object = 0
+                corners.extend(face_corners)
+                face_sizes.append(len(face_corners))
+                face_objects.append(current_object)
+                face_materials.append(current_material)
+                face_smooth.append(smooth)
+            elif keyword == "o":
+                object_names.append(value.strip())
+                current_object = len(object_names) - 1
+            elif keyword == "usemtl":
+                name = value.strip()
+                if name not in material_names:
+                    material_names.append(name)
+                current_material = material_names.index(name)
+            elif keyword == "s":
+                smooth = value.strip() not in ["off", "0"]
+            elif keyword == "mtllib":
+                mtl_files.append(os.path.join(os.path.dirname(filepath), value.strip()))
+
+        if not corners:
+            return None
+
+        loop_positions, loop_tex_coords, loop_normals = MeshFileParser._parse_face_corners(corners)
+        return {
+            "positions": MeshFileParser._parse_floats(position_lines, 3),
+            "tex_coords": MeshFileParser._parse_floats(tex_coord_lines, 2),
+            "normals": MeshFileParser._parse_floats(normal_lines, 3),
+            "loop_positions": loop_positions,
+            "loop_tex_coords": loop_tex_coords,
+            "loop_normals": loop_normals,
+            "face_sizes": np.array(face_sizes, dtype=np.int64),
+            "face_objects": np.array(face_objects, dtype=np.int64),
+            "face_materials": np.array(face_materials, dtype=np.int64),
+            "face_smooth": np.array(face_smooth, dtype=bool),
+            "object_names": object_names,
+            "material_names": material_names,
+            "mtl_files": mtl_files
+        }
+
+    @staticmethod
+    def _read_ply_header(data):
+        """ Parses the header of a .ply file.
+
+        :param data: The content of the file as bytes.
+        :return: The format, the elements as list of (name, count, properties) and the offset of the body. Each
+                 property is a tuple of (name, type, count type), where the count type is None for scalar properties.
+        """
+        header_end = data.find(b"end_header")
+        if not data.startswith(b"ply") or header_end == -1:
+            raise Exception("The file is not a valid .ply file.")
+        body_offset = data.index(b"\n", header_end) + 1
+
+        file_format = None
+        elements = []
+        for line in data[:header_end].decode("ascii", errors="replace").splitlines():
+            parts = line.split()
+            if not parts:
+                continue
+            if parts[0] == "format":
+                file_format = parts[1]
+            elif parts[0] == "element":
+                elements.append((parts[1], int(parts[2]), []))
+            elif parts[0] == "property":
+                if parts[1] == "list":
+                    elements[-1][2].append((parts[4], MeshFileParser._ply_types[parts[3]],
+                                            MeshFileParser._ply_types[parts[2]]))
+                else:
+                    elements[-1][2].append((parts[2], MeshFileParser._ply_types[parts[1]], None))
+        return file_format, elements, body_offset
+
+    @staticmethod
+    def _read_ply_element_binary(data, offset, count, properties, endian):
+        """ Reads one element of a binary .ply file.
+
+        If all lists of the element have the same length as in the first row, the element is read with one
+        np.frombuffer() call, otherwise it is read row by row.
+
+        :return: The properties as dict, lists are stored as tuple of (sizes, flat values), and the new offset.
+        """
+        if count == 0:
+            return {}, offset
+
+        # determine the list lengths of the first row
+        fields = []
+        row_offset = offset
+        for name, value_type, count_type in properties:
+            if count_type is None:
+                fields.append((name, endian + value_type))
+                row_offset += np.dtype(value_type).itemsize
+            else:
+                list_length = int(np.frombuffer(data, endian + count_type, 1, row_offset)[0])
+                fields.append((name + "_count", endian + count_type))
+                fields.append((name, endian + value_type, (list_length,)))
+                row_offset += np.dtype(count_type).itemsize + list_length * np.dtype(value_type).itemsize
+        dtype = np.dtype(fields)
+
+        if offset + count * dtype.itemsize <= len(data):
+            rows = np.frombuffer(data, dtype, count, offset)
+            if all(np.all(rows[name + "_count"] == rows.dtype[name].shape[0])
+                   for name, _, count_type in properties if count_type is not None):
+                values = {}
+                for name, _, count_type in properties:
+                    if count_type is None:
+                        values[name] = rows[name]
+                    else:
+                        values[name] = (rows[name + "_count"].astype(np.int64), rows[name].ravel())
+                return values, offset + count * dtype.itemsize
+
+        # the lists have different lengths, so read the rows one by one
+        values = {name: [] for name, _, _ in properties}
+        for _ in range(count):
+            for name, value_type, count_type in properties:
+                if count_type is None:
+                    values[name].append(np.frombuffer(data, endian + value_type, 1, offset)[0])
+                    offset += np.dtype(value_type).itemsize
+                else:
+                    list_length = int(np.frombuffer(data, endian + count_type, 1, offset)[0])
+                    offset += np.dtype(count_type).itemsize
+                    values[name].append(np.frombuffer(data, endian + value_type, list_length, offset))
+                    offset += list_length * np.dtype(value_type).itemsize
+        for name, value_type, count_type in properties:
+            if count_type is None:
+                values[name] = np.array(values[name], dtype=value_type)
+            else:
+                values[name] = (np.array([len(row) for row in values[name]], dtype=np.int64),
+                                np.concatenate(values[name]) if values[name] else np.zeros(0, dtype=value_type))
+        return values, offset
+
+    @staticmethod
+    def _read_ply_element_ascii(tokens, position, count, properties):
+        """ Reads one element of an ascii .ply file.
+
+        If all lists of the element have the same length as in the first row, the element is converted at once,
+        otherwise it is read row by row.
+
+        :return: The properties as dict, lists are stored as tuple of (sizes, flat values), and the new position.
+        """
+        if count == 0:
+            return {}, position
+
+        # determine the columns of the first row
+        columns = []
+        row_position = position
+        for name, value_type, count_type in properties:
+            if count_type is None:
+                columns.append(row_position)
+                row_position += 1
+            else:
+                list_length = int(tokens[row_position])
+                columns.append((row_position, list_length))
+                row_position += 1 + list_length
+        row_length = row_position - position
+
+        if position + count * row_length <= len(tokens):
+            rows = np.array(tokens[position:position + count * row_length]).astype(np.float64).reshape(count, row_length)
+            lists_match = all(np.all(rows[:, column[0] - position] == column[1])
+                              for column in columns if isinstance(column, tuple))
+            if lists_match:
+                values = {}
+                for (name, value_type, count_type), column in zip(properties, columns):
+                    if count_type is None:
+                        values[name] = rows[:, column - position].astype(value_type)
+                    else:
+                        start = column[0] - position + 1
+                        values[name] = (np.full(count, column[1], dtype=np.int64),
+                                        rows[:, start:start + column[1]].astype(value_type).ravel())
+                return values, position + count * row_length
+
+        # the lists have different lengths, so read the rows one by one
+        values = {name: [] for name, _, _ in properties}
+        for _ in range(count):
+            for name, value_type, count_type in properties:
+                if count_type is None:
+                    values[name].append(float(tokens[position]))
+                    position += 1
+                else:
+                    list_length = int(tokens[position])
+                    values[name].append([float(token) for token in tokens[position + 1:position + 1 + list_length]])
+                    position += 1 + list_length
+        for name, value_type, count_type in properties:
+            if count_type is None:
+                values[name] = np.array(values[name]).astype(value_type)
+            else:
+                values[name] = (np.array([len(row) for row in values[name]], dtype=np.int64),
+                                np.array([value for row in values[name] for value in row]).astype(value_type))
+        return values, position
+
+    @staticmethod
+    def read_ply(filepath):
+        """ Reads all elements of the given .ply file.
+
+        :param filepath: The path to the .ply file.
+        :return: A dict mapping the element names to their properties and the types of the properties.
+        """
+        with open(filepath, "rb") as f:
+            data = f.read()
+        file_format, elements, offset = MeshFileParser._read_ply_header(data)
+
+        values = {}
+        types = {}
+        if file_format == "ascii":
+            tokens = data[offset:].split()
+            position = 0
+            for name, count, properties in elements:
+                values[name], position = MeshFileParser._read_ply_element_ascii(tokens, position, count, properties)
+                types[name] = {prop[0]: prop[1] for prop in properties}
+        elif file_format in ["binary_little_endian", "binary_big_endian"]:
+            endian = "<" if file_format == "binary_little_endian" else ">"
+            for name, count, properties in elements:
+                values[name], offset = MeshFileParser._read_ply_element_binary(data, offset, count, properties,
+                                                                               endian)
+                types[name] = {prop[0]: prop[1] for prop in properties}
+        else:
+            raise Exception("The .ply format {} is not supported: {}".format(file_format, filepath))
+        return values, types
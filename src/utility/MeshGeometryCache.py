@@ -0,0 +1,118 @@
+import bpy
+import numpy as np
+from mathutils.bvhtree import BVHTree
+
+
+class MeshGeometryCache:
+    """ Caches the geometry of meshes for collision checks.
+
+    The local space geometry (vertices and polygons) is stored once per mesh data block and modifier state, so
+    objects sharing the same mesh share one entry.
+
+    From this local geometry a world space bvh tree is built lazily per object and pose. It is only rebuilt, if the
+    world matrix of the object changed, so already placed objects are not processed again and a sampled candidate pose
+    is only transformed once, no matter against how many objects it is checked.
+
+    Changes of the mesh or of the modifiers of an object are not detected, after those invalidate() has to be called.
+    Objects, which are going to be deleted, should be evicted via remove_object().
+    """
+
+    def __init__(self):
+        # maps (mesh, modifier state) to the local vertices and polygons
+        self._local_geometry = {}
+        # maps an object to its world matrix and its world space bvh tree
+        self._world_trees = {}
+
+    @staticmethod
+    def _modifier_state(obj):
+        """ Returns a hashable description of all modifiers of the given object.
+
+        :param obj: A mesh object.
+        :return: A tuple containing the values of all non collection properties of all modifiers.
+        """
+        state = []
+        for modifier in obj.modifiers:
+            values = []
+            for prop in modifier.bl_rna.properties:
+                if prop.type == "COLLECTION" or prop.identifier == "rna_type":
+                    continue
+                value = getattr(modifier, prop.identifier)
+                if prop.type == "POINTER":
+                    value = value.name if value is not None and hasattr(value, "name") else None
+                elif getattr(prop, "is_array", False):
+                    value = tuple(value)
+                values.append((prop.identifier, value))
+            state.append(tuple(values))
+        return tuple(state)
+
+    def get_local_geometry(self, obj):
+        """ Returns the local space geometry of the given mesh object, modifiers are applied.
+
+        :param obj: A mesh object.
+        :return: A dict with the "vertices" as numpy array [Nx3] and the "polygons" as a list of vertex index tuples.
+        """
+        # the mesh itself is used as key, so renaming it does not matter
+        key = (obj.data, self._modifier_state(obj))
+        if key not in self._local_geometry:
+            if obj.modifiers:
+                evaluated_obj = obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+                mesh = evaluated_obj.to_mesh()
+            else:
+                evaluated_obj = None
+                mesh = obj.data
+            vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+            mesh.vertices.foreach_get("co", vertices)
+            polygons = [tuple(polygon.vertices) for polygon in mesh.polygons]
+            if evaluated_obj is not None:
+                evaluated_obj.to_mesh_clear()
+            self._local_geometry[key] = {
+                "vertices": vertices.reshape(-1, 3).astype(np.float64),
+                "polygons": polygons
+            }
+        return self._local_geometry[key]
+
+    def get_world_bvh_tree(self, obj):
+        """ Returns a bvh tree of the given object at its current pose.
+
+        :param obj: A mesh object.
+        :return: The bvh tree in world space or None, if the mesh has no polygons.
+        """
+        matrix_world = tuple(value for row in obj.matrix_world for value in row)
+        if obj in self._world_trees:
+            cached_matrix_world, bvh_tree = self._world_trees[obj]
+            if cached_matrix_world == matrix_world:
+                return bvh_tree
+
+        geometry = self.get_local_geometry(obj)
+        if geometry["polygons"]:
+            matrix_world_array = np.array(matrix_world).reshape(4, 4)
+            vertices = geometry["vertices"] @ matrix_world_array[:3, :3].T + matrix_world_array[:3, 3]
+            bvh_tree = BVHTree.FromPolygons(vertices.tolist(), geometry["polygons"])
+        else:
+            bvh_tree = None
+        self._world_trees[obj] = (matrix_world, bvh_tree)
+        return bvh_tree
+
+    def invalidate(self, obj):
+        """ Evicts all entries of the given object and of its mesh, this has to be called after the mesh or the
+        modifiers of the object were changed.
+
+        :param obj: A mesh object.
+        """
+        for current_obj in [current_obj for current_obj in self._world_trees if current_obj.data == obj.data]:
+            del self._world_trees[current_obj]
+        for key in [key for key in self._local_geometry if key[0] == obj.data]:
+            del self._local_geometry[key]
+
+    def remove_object(self, obj):
+        """ Evicts all entries belonging to the given object, this has to be called before the object is deleted.
+
+        The local geometry is only removed, if no other object uses the same mesh.
+
+        :param obj: A mesh object.
+        """
+        if obj in self._world_trees:
+            del self._world_trees[obj]
+        if obj.data is not None and obj.data.users <= 1:
+            for key in [key for key in self._local_geometry if key[0] == obj.data]:
+                del self._local_geometry[key]
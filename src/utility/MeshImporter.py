@@ -0,0 +1,257 @@
+import os
+from math import sqrt
+
+import bpy
+import numpy as np
+from bpy_extras.image_utils import load_image
+from bpy_extras.io_utils import axis_conversion
+from bpy_extras.node_shader_utils import PrincipledBSDFWrapper
+
+from src.utility.MeshFileParser import MeshFileParser
+
+
+class MeshImporter:
+    """ Imports .obj and .ply files by parsing them with numpy instead of the python import operators of blender.
+
+    The files are parsed by the MeshFileParser and all vertices, loops and polygons of a mesh are handed over to
+    blender with foreach_set, so no python objects are created per vertex or face. The created objects match the ones
+    of the operators with their default settings:
+
+    - .obj: one object per "o" statement, rotated from the y-up into the z-up frame via its matrix_world, with uvs,
+      smooth groups, custom normals and the materials defined in the referenced .mtl files
+    - .ply: one object named after the file, with uvs and vertex colors
+
+    Not supported are e.g. free form geometry, lines, tristrips and the options of the import operators.
+    """
+
+    # maps the .mtl statements of texture maps to the textures of the principled bsdf wrapper
+    _mtl_texture_maps = {
+        "map_kd": "base_color_texture",
+        "map_ks": "specular_texture",
+        "map_ns": "roughness_texture",
+        "map_d": "alpha_texture",
+        "map_ke": "emission_color_texture",
+        "map_bump": "normalmap_texture",
+        "bump": "normalmap_texture"
+    }
+
+    @staticmethod
+    def import_file(filepath):
+        """ Imports the given .obj or .ply file.
+
+        :param filepath: The path to the file.
+        :return: The list of created objects, files with other extensions are ignored and return an empty list.
+        """
+        # as with the import operators, only the new objects are selected afterwards
+        for obj in bpy.context.selected_objects:
+            obj.select_set(False)
+        if filepath.endswith(".obj"):
+            return MeshImporter.import_obj(filepath)
+        elif filepath.endswith(".ply"):
+            return MeshImporter.import_ply(filepath)
+        return []
+
+    @staticmethod
+    def _load_mtl_materials(mtl_paths, material_names):
+        """ Creates the given materials and sets them up according to the given .mtl files.
+
+        :param mtl_paths: The paths to the .mtl files.
+        :param material_names: The names of the materials which are used by the faces.
+        :return: The list of created materials, in the order of material_names.
+        """
+        materials = [bpy.data.materials.new(name) for name in material_names]
+        wrappers = {}
+        for name, material in zip(material_names, materials):
+            wrappers[name] = PrincipledBSDFWrapper(material, is_readonly=False)
+            wrappers[name].use_nodes = True
+
+        for mtl_path in mtl_paths:
+            if not os.path.exists(mtl_path):
+                print("Warning: The material file {} does not exist.".format(mtl_path))
+                continue
+            dirname = os.path.dirname(mtl_path)
+            with open(mtl_path, "r", errors="replace") as f:
+                lines = f.read().splitlines()
+
+            wrapper = None
+            for line in lines:
+                parts = line.split(None, 1)
+                if len(parts) < 2 or parts[0].startswith("#"):
+                    continue
+                keyword, value = parts[0].lower(), parts[1].strip()
+                if keyword == "newmtl":
+                    wrapper = wrappers.get(value)
+                elif wrapper is None:
+                    continue
+                elif keyword == "kd":
+                    wrapper.base_color = [float(v) for v in value.split()[:3]]
+                elif keyword == "ks":
+                    wrapper.specular = float(np.mean([float(v) for v in value.split()[:3]]))
+                elif keyword == "ns":
+                    wrapper.roughness = 1.0 - sqrt(min(max(float(value), 0.0), 1000.0) / 1000.0)
+                elif keyword == "ke":
+                    wrapper.emission_color = [float(v) for v in value.split()[:3]]
+                elif keyword in ["d", "tr"]:
+                    alpha = float(value.split()[-1])
+                    wrapper.alpha = alpha if keyword == "d" else 1.0 - alpha
+                    if wrapper.alpha < 1.0:
+                        wrapper.material.blend_method = "BLEND"
+                elif keyword in MeshImporter._mtl_texture_maps:
+                    # the options of the texture map are skipped, the file name is the last part
+                    image = load_image(value.split()[-1], dirname, recursive=False, place_holder=True,
+                                       check_existing=True)
+                    getattr(wrapper, MeshImporter._mtl_texture_maps[keyword]).image = image
+        return materials
+
+    @staticmethod
+    def _create_object(name, positions, loop_vertices, face_sizes, collection):
+        """ Creates a new mesh object with the given geometry.
+
+        :param name: The name of the object and its mesh.
+        :param positions: The vertex positions, shape [N, 3].
+        :param loop_vertices: The vertex index of every face corner.
+        :param face_sizes: The number of corners of every face.
+        :param collection: The collection, the object is linked to.
+        :return: The new object.
+        """
+        mesh = bpy.data.meshes.new(name)
+        mesh.vertices.add(len(positions))
+        mesh.vertices.foreach_set("co", positions.astype(np.float32).ravel())
+        mesh.loops.add(len(loop_vertices))
+        mesh.loops.foreach_set("vertex_index", loop_vertices.astype(np.int32))
+        mesh.polygons.add(len(face_sizes))
+        loop_starts = np.concatenate(([0], np.cumsum(face_sizes)[:-1])) if len(face_sizes) > 0 else face_sizes
+        mesh.polygons.foreach_set("loop_start", loop_starts.astype(np.int32))
+        mesh.polygons.foreach_set("loop_total", face_sizes.astype(np.int32))
+
+        obj = bpy.data.objects.new(name, mesh)
+        collection.objects.link(obj)
+        obj.select_set(True)
+        return obj
+
+    @staticmethod
+    def import_obj(filepath):
+        """ Imports the given .obj file.
+
+        :param filepath: The path to the .obj file.
+        :return: The list of created objects.
+        """
+        obj_data = MeshFileParser.read_obj(filepath)
+        if obj_data is None:
+            return []
+
+        positions, tex_coords, normals = obj_data["positions"], obj_data["tex_coords"], obj_data["normals"]
+        loop_positions, loop_tex_coords, loop_normals = obj_data["loop_positions"], obj_data["loop_tex_coords"], \
+            obj_data["loop_normals"]
+        face_sizes, face_objects = obj_data["face_sizes"], obj_data["face_objects"]
+        face_materials, face_smooth = obj_data["face_materials"], obj_data["face_smooth"]
+        loop_objects = np.repeat(face_objects, face_sizes)
+
+        materials = MeshImporter._load_mtl_materials(obj_data["mtl_files"], obj_data["material_names"])
+
+        collection = bpy.context.view_layer.active_layer_collection.collection
+        # the .obj files use y as up axis, the rotation is stored in the object, as done by the import operator
+        axis_matrix = axis_conversion(from_forward='-Z', from_up='Y').to_4x4()
+        created_objects = []
+        for object_index, name in enumerate(obj_data["object_names"]):
+            face_mask = face_objects == object_index
+            if not np.any(face_mask):
+                continue
+            loop_mask = loop_objects == object_index
+
+            # only the vertices used by the faces of this object are added to its mesh
+            used_vertices, loop_vertices = np.unique(loop_positions[loop_mask], return_inverse=True)
+            obj = MeshImporter._create_object(name, positions[used_vertices], loop_vertices, face_sizes[face_mask],
+                                              collection)
+            mesh = obj.data
+            mesh.polygons.foreach_set("use_smooth", face_smooth[face_mask])
+
+            # add the used materials in the order of their first usage
+            object_face_materials = face_materials[face_mask]
+            used_materials, first_usage = np.unique(object_face_materials, return_index=True)
+            used_materials = used_materials[np.argsort(first_usage)]
+            used_materials = used_materials[used_materials >= 0]
+            if len(used_materials) > 0:
+                for material_index in used_materials:
+                    mesh.materials.append(materials[material_index])
+                slot_per_material = np.zeros(len(materials) + 1, dtype=np.int32)
+                slot_per_material[used_materials] = np.arange(len(used_materials))
+                # faces without material use the first slot, -1 indexes the last entry which stays zero
+                mesh.polygons.foreach_set("material_index", slot_per_material[object_face_materials])
+
+            object_tex_coords = loop_tex_coords[loop_mask]
+            if len(tex_coords) > 0 and np.any(object_tex_coords >= 0):
+                uv_layer = mesh.uv_layers.new(name="UVMap")
+                uvs = tex_coords[np.maximum(object_tex_coords, 0)]
+                uvs[object_tex_coords < 0] = 0
+                uv_layer.data.foreach_set("uv", uvs.astype(np.float32).ravel())
+
+            mesh.update(calc_edges=True)
+
+            object_normals = loop_normals[loop_mask]
+            use_normals = len(normals) > 0 and np.all(object_normals >= 0)
+            if use_normals:
+                mesh.create_normals_split()
+                mesh.loops.foreach_set("normal", normals[object_normals].astype(np.float32).ravel())
+            mesh.validate(clean_customdata=False)
+            if use_normals:
+                # validate() might have removed faces, so the normals are read back from the loops
+                custom_normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+                mesh.loops.foreach_get("normal", custom_normals)
+                if not np.any(face_smooth[face_mask]):
+                    mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=bool))
+                mesh.normals_split_custom_set(custom_normals.reshape(-1, 3))
+                mesh.use_auto_smooth = True
+
+            obj.matrix_world = axis_matrix
+            created_objects.append(obj)
+        return created_objects
+
+    @staticmethod
+    def import_ply(filepath):
+        """ Imports the given .ply file.
+
+        :param filepath: The path to the .ply file.
+        :return: The list containing the created object.
+        """
+        values, types = MeshFileParser.read_ply(filepath)
+        if "vertex" not in values:
+            raise Exception("The .ply file does not contain any vertices: {}".format(filepath))
+        vertex = values["vertex"]
+        positions = np.stack([vertex["x"], vertex["y"], vertex["z"]], axis=1)
+
+        face = values.get("face", {})
+        if "vertex_indices" in face:
+            face_sizes, loop_vertices = face["vertex_indices"]
+        elif "vertex_index" in face:
+            face_sizes, loop_vertices = face["vertex_index"]
+        else:
+            face_sizes, loop_vertices = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        collection = bpy.context.view_layer.active_layer_collection.collection
+        obj = MeshImporter._create_object(name, positions, loop_vertices, face_sizes, collection)
+        mesh = obj.data
+
+        for u_name, v_name in [("s", "t"), ("u", "v"), ("texture_u", "texture_v"), ("texture_s", "texture_t")]:
+            if u_name in vertex and v_name in vertex:
+                uvs = np.stack([vertex[u_name], vertex[v_name]], axis=1)[loop_vertices]
+                mesh.uv_layers.new().data.foreach_set("uv", uvs.astype(np.float32).ravel())
+                break
+
+        for prefix in ["", "diffuse_"]:
+            if prefix + "red" in vertex:
+                channels = [prefix + "red", prefix + "green", prefix + "blue", prefix + "alpha"]
+                colors = np.ones((len(positions), 4), dtype=np.float32)
+                for i, channel in enumerate(channels):
+                    if channel in vertex:
+                        colors[:, i] = vertex[channel]
+                        # integer colors are stored in the range [0, 255]
+                        if np.dtype(types["vertex"][channel]).kind in "iu":
+                            colors[:, i] /= 255.0
+                mesh.vertex_colors.new().data.foreach_set("color", colors[loop_vertices].ravel())
+                break
+
+        mesh.update(calc_edges=True)
+        mesh.validate()
+        return [obj]
@@ -0,0 +1,104 @@
+import cProfile
+import os
+import pstats
+
+
+class ModuleProfiler:
+    """ Profiles the run() of one module with cProfile.
+
+    Two files are written:
+
+    - <prefix>.prof: The raw cProfile data, which can be inspected with pstats, snakeviz, etc.
+    - <prefix>.collapsed.txt: The call stacks in the collapsed format ("a;b;c <microseconds>"), which can be turned
+      into a flamegraph with flamegraph.pl or speedscope.
+
+    As cProfile only records caller/callee pairs and not complete stacks, the time of a function which is called from
+    several stacks is split between them proportionally to the time spent in each caller.
+
+    Usage: with ModuleProfiler(output_prefix):
+    """
+
+    # Stacks with less time than this (in seconds) are not written to the collapsed stacks file
+    min_stack_time = 1e-5
+    # Stacks with less than this fraction of the total profiled time are not written either
+    min_stack_fraction = 1e-4
+    # Stacks deeper than this are cut off
+    max_stack_depth = 128
+    # At most this many stacks are written, the ones with the most time are kept
+    max_num_stacks = 10000
+
+    def __init__(self, output_prefix):
+        """
+        :param output_prefix: The path of the output files without extension. Type: string.
+        """
+        self._output_prefix = output_prefix
+        self._profile = cProfile.Profile()
+
+    def __enter__(self):
+        self._profile.enable()
+
+    def __exit__(self, type, value, traceback):
+        self._profile.disable()
+        self._profile.dump_stats(self._output_prefix + ".prof")
+        with open(self._output_prefix + ".collapsed.txt", "w") as f:
+            for stack, stack_time in self._collapse_stacks(pstats.Stats(self._profile).stats):
+                f.write("{} {}\n".format(";".join(stack), int(round(stack_time * 1e6))))
+        print("Wrote profile to {}.prof and {}.collapsed.txt".format(self._output_prefix, self._output_prefix))
+
+    @staticmethod
+    def _label(function):
+        """ Returns a readable label for the given pstats function key.
+
+        :param function: A tuple of file name, line number and function name.
+        :return: The label, which does not contain any semicolons.
+        """
+        file_name, line, function_name = function
+        if file_name == "~":
+            # built-in functions have no file
+            label = function_name
+        else:
+            label = "{} ({}:{})".format(function_name, os.path.basename(file_name), line)
+        return label.replace(";", ",")
+
+    def _collapse_stacks(self, stats):
+        """ Converts the caller/callee statistics of cProfile into stacks with their self time.
+
+        :param stats: The stats dict of a pstats.Stats object.
+        :return: A list of tuples containing the stack (list of labels, from the root to the leaf) and its self time.
+        """
+        callees = {}
+        for function, (_, _, _, _, callers) in stats.items():
+            for caller, (_, _, _, edge_cumulative_time) in callers.items():
+                callees.setdefault(caller, []).append((function, edge_cumulative_time))
+
+        # functions called from outside of the profiled block (e.g. the run() of the module) are the roots
+        roots = [function for function, (_, _, _, _, callers) in stats.items()
+                 if not any(caller in stats for caller in callers)]
+        # the threshold is relative to the total time, so long running modules do not produce millions of stacks
+        min_time = max(self.min_stack_time, self.min_stack_fraction * sum(stats[root][3] for root in roots))
+        collapsed = []
+        # each entry contains the functions of a stack and the time spent in it, including its callees
+        pending = [([root], stats[root][3]) for root in roots]
+        while pending:
+            stack, stack_time = pending.pop()
+            function = stack[-1]
+            total_time, cumulative_time = stats[function][2], stats[function][3]
+            if cumulative_time <= 0:
+                continue
+
+            self_time = stack_time * min(total_time / cumulative_time, 1.0)
+            if self_time >= min_time:
+                collapsed.append(([self._label(stack_function) for stack_function in stack], self_time))
+
+            if len(stack) < self.max_stack_depth:
+                for callee, edge_cumulative_time in callees.get(function, []):
+                    # Recursive calls are already contained in the time of the first occurrence
+                    if callee in stack:
+                        continue
+                    callee_time = stack_time * edge_cumulative_time / cumulative_time
+                    if callee_time >= min_time:
+                        pending.append((stack + [callee], callee_time))
+
+        if len(collapsed) > self.max_num_stacks:
+            collapsed = sorted(collapsed, key=lambda entry: entry[1], reverse=True)[:self.max_num_stacks]
+        return collapsed
@@ -0,0 +1,107 @@
+import json
+import os
+from glob import glob, has_magic
+
+
+class PathIndex:
+    """ Memoizes the results of glob patterns, so big directory trees are only scanned once.
+
+    Inside one run, the result of each pattern is kept in memory, it is cleared between the runs of a batch.
+    Optionally the results can be stored in a json file, so they are reused across runs. An entry in memory or in that
+    file is only used, if the modification time of the root directory of the pattern (the longest part without any
+    wildcards) has not changed since the entry was written.
+
+    Changes deeper inside the directory tree do not change the modification time of the root directory, so in this
+    case the cache file has to be deleted manually.
+    """
+
+    # maps a resolved glob pattern to the modification time of its root dir and the sorted list of matching paths
+    _memory_cache = {}
+
+    @staticmethod
+    def get_root_dir(pattern):
+        """ Returns the longest leading directory of the given pattern, which does not contain any wildcards.
+
+        :param pattern: A glob pattern.
+        :return: The path to the root directory.
+        """
+        root_dir = os.path.dirname(pattern)
+        while has_magic(root_dir):
+            root_dir = os.path.dirname(root_dir)
+        return root_dir if root_dir else "."
+
+    @staticmethod
+    def _get_mtime(path):
+        """ Returns the modification time of the given path or None, if it does not exist. """
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_cache_file(cache_file):
+        """ Reads the given cache file, a missing or broken file results in an empty cache.
+
+        :param cache_file: The path to the json cache file.
+        :return: A dict mapping patterns to their cache entries.
+        """
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, "r") as f:
+                    return json.load(f)
+            except ValueError:
+                print("Warning: The path index cache file {} is broken, it will be rebuilt.".format(cache_file))
+        return {}
+
+    @staticmethod
+    def _write_cache_file(cache_file, cache):
+        """ Writes the given cache atomically, so concurrent runs never read a half written file.
+
+        :param cache_file: The path to the json cache file.
+        :param cache: A dict mapping patterns to their cache entries.
+        """
+        cache_dir = os.path.dirname(os.path.abspath(cache_file))
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        tmp_file = "{}.{}.tmp".format(cache_file, os.getpid())
+        with open(tmp_file, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, cache_file)
+
+    @staticmethod
+    def get_paths(pattern, cache_file=""):
+        """ Returns all paths matching the given glob pattern.
+
+        :param pattern: An absolute glob pattern.
+        :param cache_file: The path to a json file, in which the result is persisted. If empty, the result is only
+                           kept in memory.
+        :return: The sorted list of matching paths.
+        """
+        root_mtime = PathIndex._get_mtime(PathIndex.get_root_dir(pattern))
+        if pattern in PathIndex._memory_cache:
+            memory_root_mtime, paths = PathIndex._memory_cache[pattern]
+            if root_mtime is not None and memory_root_mtime == root_mtime:
+                return paths
+
+        paths = None
+        if cache_file:
+            cache = PathIndex._read_cache_file(cache_file)
+            entry = cache.get(pattern)
+            if entry is not None and root_mtime is not None and entry["root_mtime"] == root_mtime:
+                paths = entry["paths"]
+
+        if paths is None:
+            paths = sorted(glob(pattern))
+            if cache_file and root_mtime is not None:
+                # Read the file again, another run could have added entries in the meantime
+                cache = PathIndex._read_cache_file(cache_file)
+                cache[pattern] = {"root_mtime": root_mtime, "paths": paths}
+                PathIndex._write_cache_file(cache_file, cache)
+
+        PathIndex._memory_cache[pattern] = (root_mtime, paths)
+        return paths
+
+    @staticmethod
+    def clear():
+        """ Removes all results kept in memory. """
+        PathIndex._memory_cache = {}
@@ -0,0 +1,158 @@
+import json
+import os
+import sys
+import time
+
+import bpy
+
+try:
+    import resource
+except ImportError:
+    # not available on windows
+    resource = None
+
+
+class PerformanceTrace:
+    """ Collects performance statistics of the modules of one pipeline run.
+
+    For every measured module one json object is appended to performance_trace.jsonl in the output dir of the module,
+    it contains:
+
+    - the wall and cpu time
+    - the peak resident set size of the process before and after the module (not available on windows)
+    - the number of datablocks (objects, meshes, materials, textures, images, node groups) before and after the module
+    - the number of frames (registered camera poses) after the module
+    - the keys of newly registered outputs and the number of new files in the output dir
+
+    In the end, all measured modules are written as a trace into performance_trace.json, which can be opened in
+    chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    def __init__(self):
+        self._events = []
+        self._output_dirs = set()
+        self._pid = os.getpid()
+
+    @staticmethod
+    def _peak_rss_mb():
+        """ Returns the peak resident set size of this process in MB or None, if it can not be determined. """
+        if resource is None:
+            return None
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # linux reports kilobytes, mac os bytes
+        return peak_rss / (1024.0 * 1024.0) if sys.platform == "darwin" else peak_rss / 1024.0
+
+    @staticmethod
+    def _datablock_counts():
+        """ Returns the number of datablocks of the types, which usually dominate the memory usage. """
+        return {
+            "objects": len(bpy.data.objects),
+            "meshes": len(bpy.data.meshes),
+            "materials": len(bpy.data.materials),
+            "textures": len(bpy.data.textures),
+            "images": len(bpy.data.images),
+            "node_groups": len(bpy.data.node_groups)
+        }
+
+    @staticmethod
+    def _output_keys():
+        """ Returns the keys of all outputs registered in the scene. """
+        if "output" in bpy.context.scene:
+            return [output["key"] for output in bpy.context.scene["output"]]
+        return []
+
+    @staticmethod
+    def _list_files(output_dir):
+        """ Returns the names of all files directly inside of the given dir. """
+        if not os.path.exists(output_dir):
+            return set()
+        return set(entry.name for entry in os.scandir(output_dir) if entry.is_file())
+
+    class Measurement:
+        """ Measures the execution of one module, the result is added to the trace when the block is left.
+
+        Usage: with trace.measure(module):
+        """
+
+        def __init__(self, trace, module):
+            self._trace = trace
+            self._module = module
+
+        def __enter__(self):
+            self._output_dir = self._module._output_dir
+            self._files_before = PerformanceTrace._list_files(self._output_dir)
+            self._output_keys_before = PerformanceTrace._output_keys()
+            self._datablocks_before = PerformanceTrace._datablock_counts()
+            self._peak_rss_before = PerformanceTrace._peak_rss_mb()
+            self._start_timestamp = time.time()
+            self._start = time.perf_counter()
+            self._cpu_start = time.process_time()
+
+        def __exit__(self, type, value, traceback):
+            wall_time = time.perf_counter() - self._start
+            cpu_time = time.process_time() - self._cpu_start
+            new_files = PerformanceTrace._list_files(self._output_dir) - self._files_before
+            # the performance trace and profile files are not an output of the module
+            new_files = [name for name in new_files if not name.startswith(("performance_trace.", "profile_"))]
+            record = {
+                "module": self._module.__class__.__module__.replace("src.", "", 1),
+                "start": self._start_timestamp,
+                "wall_time": wall_time,
+                "cpu_time": cpu_time,
+                "peak_rss_mb_before": self._peak_rss_before,
+                "peak_rss_mb_after": PerformanceTrace._peak_rss_mb(),
+                "datablocks_before": self._datablocks_before,
+                "datablocks_after": PerformanceTrace._datablock_counts(),
+                "num_frames": bpy.context.scene.frame_end - bpy.context.scene.frame_start,
+                "new_outputs": [key for key in PerformanceTrace._output_keys() if key not in self._output_keys_before],
+                "new_output_files": len(new_files),
+                "failed": type is not None
+            }
+            self._trace._add_record(self._output_dir, record)
+
+    def measure(self, module):
+        """ Returns a context manager, which measures the execution of the given module.
+
+        :param module: The module, which is run inside the block.
+        :return: The context manager.
+        """
+        return PerformanceTrace.Measurement(self, module)
+
+    def _add_record(self, output_dir, record):
+        """ Writes the given record to the json lines file and keeps it for the trace file.
+
+        :param output_dir: The directory where the files of the trace are stored.
+        :param record: The measured statistics of one module.
+        """
+        jsonl_path = os.path.join(output_dir, "performance_trace.jsonl")
+        # every pipeline run starts a new file
+        mode = "a" if output_dir in self._output_dirs else "w"
+        self._output_dirs.add(output_dir)
+        with open(jsonl_path, mode) as f:
+            f.write(json.dumps(record) + "\n")
+
+        self._events.append((output_dir, {
+            "name": record["module"],
+            "cat": "module",
+            "ph": "X",
+            "ts": record["start"] * 1e6,
+            "dur": record["wall_time"] * 1e6,
+            "pid": self._pid,
+            "tid": 0,
+            "args": {key: value for key, value in record.items() if key not in ["module", "start"]}
+        }))
+        if record["peak_rss_mb_after"] is not None:
+            self._events.append((output_dir, {
+                "name": "peak_rss_mb",
+                "ph": "C",
+                "ts": (record["start"] + record["wall_time"]) * 1e6,
+                "pid": self._pid,
+                "args": {"peak_rss_mb": record["peak_rss_mb_after"]}
+            }))
+
+    def write_trace_files(self):
+        """ Writes all measured modules into a trace file per output dir, which can be opened in chrome or perfetto. """
+        for output_dir in self._output_dirs:
+            events = [event for event_output_dir, event in self._events if event_output_dir == output_dir]
+            with open(os.path.join(output_dir, "performance_trace.json"), "w") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
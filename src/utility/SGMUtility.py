@@ -1,10 +1,10 @@
 
-import cv2
 import numpy as np
-from PIL import Image
 
 
 def resize(img, new_size, method="nearest"):
+    from PIL import Image
+
     method = method.lower()
     if "lanczos" in method:
         return np.asarray(Image.fromarray(img).resize(new_size, Image.LANCZOS))
@@ -32,6 +32,7 @@ def fill_in_fast(depth_map, max_depth=100.0, custom_kernel=None,
     Returns:
         depth_map: dense depth map
     """
+    import cv2
 
     # Full kernels
     FULL_KERNEL_5 = np.ones((5, 5), np.uint8)
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import pickle
+
+import bpy
+
+from src.main.GlobalStorage import GlobalStorage
+from src.utility.Utility import Utility
+
+
+class SceneCheckpoint:
+    """ Stores the scene after a module as .blend file, so later runs with the same leading modules can skip them.
+
+    A checkpoint is identified by a hash over the prefix of the pipeline up to and including the marked module. The
+    hash covers:
+
+    - the module names and their configs (after all arguments have been inserted)
+    - every input file or folder referenced in these configs, identified by path, size and modification time
+    - the random seed given via BLENDER_PROC_RANDOM_SEED and the blender version
+
+    Next to the .blend file, the values of the GlobalStorage are pickled, the global config is not part of the
+    checkpoint as it is always recreated by the main.Initializer.
+    """
+
+    def __init__(self, checkpoint_dir, prefix_hash):
+        """
+        :param checkpoint_dir: The directory in which the checkpoints are stored. Type: string.
+        :param prefix_hash: The hash of the pipeline prefix, see compute_prefix_hashes(). Type: string.
+        """
+        self.blend_path = os.path.join(checkpoint_dir, "checkpoint_{}.blend".format(prefix_hash))
+        self.storage_path = os.path.join(checkpoint_dir, "checkpoint_{}.pickle".format(prefix_hash))
+
+    @staticmethod
+    def _collect_input_files(value, input_files):
+        """ Recursively collects all strings inside the given config value, which point to existing files or folders.
+
+        :param value: A config value.
+        :param input_files: The set, the resolved paths are added to.
+        """
+        if isinstance(value, dict):
+            for sub_value in value.values():
+                SceneCheckpoint._collect_input_files(sub_value, input_files)
+        elif isinstance(value, list):
+            for sub_value in value:
+                SceneCheckpoint._collect_input_files(sub_value, input_files)
+        elif isinstance(value, str) and value.strip() != "":
+            path = Utility.resolve_path(value)
+            if os.path.exists(path):
+                input_files.add(path)
+
+    @staticmethod
+    def compute_prefix_hashes(module_configs):
+        """ Computes for every module the hash of all modules up to and including it.
+
+        :param module_configs: The list of module configs, as given in the config file.
+        :return: A list of hashes, one per module.
+        """
+        hasher = hashlib.sha256()
+        hasher.update(bpy.app.version_string.encode("utf-8"))
+        hasher.update(os.environ.get("BLENDER_PROC_RANDOM_SEED", "").encode("utf-8"))
+
+        prefix_hashes = []
+        for module_config in module_configs:
+            hasher.update(json.dumps(module_config, sort_keys=True, default=str).encode("utf-8"))
+
+            input_files = set()
+            SceneCheckpoint._collect_input_files(module_config, input_files)
+            for path in sorted(input_files):
+                stat = os.stat(path)
+                hasher.update("{}|{}|{}".format(path, stat.st_size, stat.st_mtime).encode("utf-8"))
+
+            prefix_hashes.append(hasher.copy().hexdigest()[:16])
+        return prefix_hashes
+
+    def exists(self):
+        """ Returns True, if the checkpoint has been written completely. """
+        return os.path.exists(self.blend_path) and os.path.exists(self.storage_path)
+
+    def save(self):
+        """ Saves the current scene and the GlobalStorage.
+
+        If the GlobalStorage contains values which can not be pickled, no checkpoint is written.
+        """
+        try:
+            storage = pickle.dumps(dict(GlobalStorage._storage_dict))
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            print("Warning: The checkpoint was not saved, as the GlobalStorage can not be pickled: {}".format(e))
+            return
+
+        os.makedirs(os.path.dirname(self.blend_path), exist_ok=True)
+        # the storage file marks the checkpoint as complete, so it is written last
+        if os.path.exists(self.storage_path):
+            os.remove(self.storage_path)
+        bpy.ops.wm.save_as_mainfile(filepath=self.blend_path, copy=True)
+        tmp_storage_path = "{}.{}.tmp".format(self.storage_path, os.getpid())
+        with open(tmp_storage_path, "wb") as f:
+            f.write(storage)
+        os.replace(tmp_storage_path, self.storage_path)
+        print("Saved checkpoint to {}".format(self.blend_path))
+
+    def load(self):
+        """ Replaces the current scene with the one of the checkpoint and restores the GlobalStorage. """
+        bpy.ops.wm.open_mainfile(filepath=self.blend_path, load_ui=False)
+        with open(self.storage_path, "rb") as f:
+            storage = pickle.load(f)
+        for key, value in storage.items():
+            GlobalStorage.set(key, value)
+        print("Loaded checkpoint from {}".format(self.blend_path))
@@ -0,0 +1,89 @@
+import os
+import time
+
+import bpy
+
+
+class SceneReset:
+    """ Resets the blender file to an empty scene, e.g. between the runs of a batch.
+
+    All datablocks of all types are removed with one bpy.data.batch_remove() call, this is much faster than deleting
+    the objects via operators and removing the orphan datablocks one by one. Only the current scene, its world and
+    the datablocks belonging to the user interface are kept.
+
+    After every reset, the remaining datablocks are compared with the ones remaining after the first reset in this
+    process. Additional datablocks are reported as leaked, together with the memory usage of the process.
+    """
+
+    # bpy.data collections which are never emptied, as they belong to the user interface
+    _kept_collections = ["screens", "workspaces", "window_managers", "brushes", "palettes"]
+
+    # the number of datablocks per type after the first reset of this process
+    _baseline_counts = None
+
+    @staticmethod
+    def _id_collections():
+        """ Returns the names of all bpy.data collections, which contain datablocks. """
+        return [prop.identifier for prop in bpy.data.bl_rna.properties if prop.type == "COLLECTION"]
+
+    @staticmethod
+    def removable_datablocks():
+        """ Returns all datablocks, which do not belong to the user interface. """
+        datablocks = []
+        for name in SceneReset._id_collections():
+            if name not in SceneReset._kept_collections:
+                datablocks.extend(getattr(bpy.data, name))
+        return datablocks
+
+    @staticmethod
+    def _datablock_counts():
+        """ Returns the number of datablocks per bpy.data collection. """
+        return {name: len(getattr(bpy.data, name)) for name in SceneReset._id_collections()}
+
+    @staticmethod
+    def _current_rss_mb():
+        """ Returns the current resident set size of this process in MB or None, if it can not be determined. """
+        try:
+            with open("/proc/self/statm", "r") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+        except (OSError, ValueError, IndexError):
+            # only available on linux
+            return None
+
+    @staticmethod
+    def reset():
+        """ Removes all datablocks, except the current scene, its world and the user interface, and all custom
+        properties of the scene.
+        """
+        start = time.perf_counter()
+        scene = bpy.context.scene
+        kept = {scene}
+        if scene.world is not None:
+            kept.add(scene.world)
+
+        datablocks = [datablock for datablock in SceneReset.removable_datablocks() if datablock not in kept]
+        bpy.data.batch_remove(datablocks)
+
+        for key in list(scene.keys()):
+            del scene[key]
+
+        SceneReset._report(len(datablocks), time.perf_counter() - start)
+
+    @staticmethod
+    def _report(num_removed, duration):
+        """ Prints the duration of the reset, leaked datablocks and the memory usage.
+
+        :param num_removed: The number of removed datablocks.
+        :param duration: The duration of the reset in seconds.
+        """
+        counts = SceneReset._datablock_counts()
+        if SceneReset._baseline_counts is None:
+            SceneReset._baseline_counts = counts
+        leaked = {name: count - SceneReset._baseline_counts.get(name, 0) for name, count in counts.items()
+                  if count > SceneReset._baseline_counts.get(name, 0)}
+
+        rss = SceneReset._current_rss_mb()
+        print("Scene reset removed {} datablocks in {:.1f} ms, memory usage: {}".format(
+            num_removed, duration * 1000, "{:.1f} MB".format(rss) if rss is not None else "unknown"))
+        if leaked:
+            print("Warning: {} datablocks were not removed by the scene reset: {}".format(sum(leaked.values()), leaked))
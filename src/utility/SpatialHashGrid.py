@@ -0,0 +1,190 @@
+import itertools
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from src.utility.BlenderUtility import get_bounds
+
+
+class SpatialHashGrid:
+    """ A uniform grid over the world space axis aligned bounding boxes of objects, which is used as a broad phase
+    for collision and spacing checks.
+
+    Each inserted object is registered in all grid cells its bounding box touches, so a query only has to look at the
+    objects in the cells around the query instead of at all inserted objects. The cells are stored in a dict, so the
+    grid is not bounded.
+
+    Objects whose bounding box would cover too many cells, are stored separately and are checked in every query.
+    """
+
+    def __init__(self, cell_size, max_cells_per_object=4096):
+        """
+        :param cell_size: The edge length of one grid cell. Type: float.
+        :param max_cells_per_object: Objects touching more cells are not stored in the grid. Type: int.
+        """
+        if cell_size <= 0:
+            raise Exception("The cell size of the grid has to be bigger than zero: {}".format(cell_size))
+        self._cell_size = float(cell_size)
+        self._max_cells_per_object = max_cells_per_object
+        # maps a cell index to the objects, whose bounding box touches the cell
+        self._cells = defaultdict(set)
+        # maps a cell index to the objects, whose location lies inside the cell
+        self._location_cells = defaultdict(set)
+        # maps each object to its bounding box and the cells it is registered in
+        self._bounds = {}
+        # maps each object to its location at the time of insertion
+        self._locations = {}
+        self._large_objects = set()
+
+    @staticmethod
+    def get_world_aabb(obj):
+        """ Returns the world space axis aligned bounding box of the given object.
+
+        :param obj: A mesh object. Type: blender object.
+        :return: The minimum and the maximum corner as numpy arrays.
+        """
+        bounds = np.array(get_bounds(obj))
+        return np.min(bounds, axis=0), np.max(bounds, axis=0)
+
+    @staticmethod
+    def cell_size_for_objects(objects, fallback=1.0):
+        """ Returns a cell size which fits the given objects, this is the mean diagonal of their bounding boxes.
+
+        :param objects: The objects which will be inserted into the grid. Type: list.
+        :param fallback: The cell size used, if no object has a bounding box with a size bigger than zero.
+        :return: The cell size.
+        """
+        diagonals = []
+        for obj in objects:
+            if obj.type == "MESH":
+                aabb_min, aabb_max = SpatialHashGrid.get_world_aabb(obj)
+                diagonals.append(np.linalg.norm(aabb_max - aabb_min))
+        if diagonals and np.mean(diagonals) > 0:
+            return float(np.mean(diagonals))
+        return fallback
+
+    def _cell_of(self, point):
+        """ Returns the index of the cell containing the given point.
+
+        :param point: A 3d point.
+        :return: The cell index as tuple of three ints.
+        """
+        return tuple(int(math.floor(value / self._cell_size)) for value in point)
+
+    def _cells_of_box(self, aabb_min, aabb_max):
+        """ Returns the indices of all cells touched by the given box.
+
+        :param aabb_min: The minimum corner of the box.
+        :param aabb_max: The maximum corner of the box.
+        :return: A list of cell indices or None, if the box touches more than max_cells_per_object cells.
+        """
+        first_cell, last_cell = self._cell_of(aabb_min), self._cell_of(aabb_max)
+        num_of_cells = np.prod([last - first + 1 for first, last in zip(first_cell, last_cell)])
+        if num_of_cells > self._max_cells_per_object:
+            return None
+        return list(itertools.product(*[range(first, last + 1) for first, last in zip(first_cell, last_cell)]))
+
+    def __len__(self):
+        return len(self._bounds)
+
+    def __contains__(self, obj):
+        return obj in self._bounds
+
+    def insert(self, obj):
+        """ Inserts the given object with its current world space bounding box and location.
+
+        :param obj: The object to insert. Type: blender object.
+        """
+        if obj in self._bounds:
+            self.remove(obj)
+        aabb_min, aabb_max = self.get_world_aabb(obj)
+        cells = self._cells_of_box(aabb_min, aabb_max)
+        if cells is None:
+            self._large_objects.add(obj)
+        else:
+            for cell in cells:
+                self._cells[cell].add(obj)
+        self._bounds[obj] = (aabb_min, aabb_max, cells)
+
+        location = np.array(obj.location)
+        location_cell = self._cell_of(location)
+        self._location_cells[location_cell].add(obj)
+        self._locations[obj] = (location, location_cell)
+
+    def remove(self, obj):
+        """ Removes the given object from the grid, e.g. if it was deleted.
+
+        :param obj: The object to remove. Type: blender object.
+        """
+        if obj not in self._bounds:
+            return
+        _, _, cells = self._bounds.pop(obj)
+        if cells is None:
+            self._large_objects.discard(obj)
+        else:
+            for cell in cells:
+                self._cells[cell].discard(obj)
+                if not self._cells[cell]:
+                    del self._cells[cell]
+
+        _, location_cell = self._locations.pop(obj)
+        self._location_cells[location_cell].discard(obj)
+        if not self._location_cells[location_cell]:
+            del self._location_cells[location_cell]
+
+    def query_overlapping(self, obj):
+        """ Returns all inserted objects, whose bounding box overlaps with the current bounding box of the given object.
+
+        This performs the same check as check_bb_intersection(), but only for the objects in the nearby cells.
+
+        :param obj: The query object. Type: blender object.
+        :return: A list of objects.
+        """
+        aabb_min, aabb_max = self.get_world_aabb(obj)
+        cells = self._cells_of_box(aabb_min, aabb_max)
+        if cells is None:
+            candidates = set(self._bounds.keys())
+        else:
+            candidates = set(self._large_objects)
+            for cell in cells:
+                if cell in self._cells:
+                    candidates.update(self._cells[cell])
+        candidates.discard(obj)
+
+        overlapping = []
+        for candidate in candidates:
+            candidate_min, candidate_max, _ = self._bounds[candidate]
+            # Checks in each dimension, if there is an overlap if this happens it must be an overlap in 3D, too.
+            if np.all(aabb_max >= candidate_min) and np.all(candidate_max >= aabb_min):
+                overlapping.append(candidate)
+        return overlapping
+
+    def nearest_distance(self, location, max_distance):
+        """ Returns the distance from the given location to the closest location of an inserted object.
+
+        Only the cells which are closer than max_distance are searched.
+
+        :param location: The query location.
+        :param max_distance: The maximum distance to search for. Type: float.
+        :return: The distance to the closest object or None, if there is no object closer than max_distance.
+        """
+        location = np.array(location)
+        num_rings = int(math.ceil(max_distance / self._cell_size))
+        if (2 * num_rings + 1) ** 3 > len(self._locations):
+            # There are fewer objects than cells to search, so just check all of them
+            candidates = self._locations.keys()
+        else:
+            center_cell = self._cell_of(location)
+            candidates = []
+            for offset in itertools.product(range(-num_rings, num_rings + 1), repeat=3):
+                cell = tuple(center + step for center, step in zip(center_cell, offset))
+                if cell in self._location_cells:
+                    candidates.extend(self._location_cells[cell])
+
+        closest_distance = None
+        for candidate in candidates:
+            distance = np.linalg.norm(self._locations[candidate][0] - location)
+            if distance <= max_distance and (closest_distance is None or distance < closest_distance):
+                closest_distance = distance
+        return closest_distance
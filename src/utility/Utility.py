@@ -5,13 +5,43 @@
 import time
 import inspect
 import importlib
+from src.utility.BlenderUtility import duplicate_objects
 from src.utility.Config import Config
+from src.utility.MeshImporter import MeshImporter
 from mathutils import Vector
 import numpy as np
 
 class Utility:
     working_dir = ""
     used_temp_id = None
+    # maps the path of a module or provider class (e.g. "writer.Hdf5Writer") to the class, so it is only resolved once
+    _class_registry = {}
+    # the import duration of every class in the registry, which has not been reported yet
+    _import_timings = []
+
+    @staticmethod
+    def get_class(class_path):
+        """ Returns the class with the given path, the python module is only imported at the first call.
+
+        :param class_path: The path to the class, starting from inside the src directory, e.g. "writer.Hdf5Writer".
+        :return: The class.
+        """
+        if class_path not in Utility._class_registry:
+            start = time.time()
+            module = importlib.import_module("src." + class_path)
+            Utility._import_timings.append((class_path, time.time() - start))
+            Utility._class_registry[class_path] = getattr(module, class_path.split(".")[-1])
+        return Utility._class_registry[class_path]
+
+    @staticmethod
+    def print_import_timings():
+        """ Prints how long the import of each newly resolved module or provider class took, slowest first. """
+        if Utility._import_timings:
+            timings = sorted(Utility._import_timings, key=lambda timing: timing[1], reverse=True)
+            print("Importing {} classes took {:.3f} seconds: {}".format(
+                len(timings), sum(duration for _, duration in timings),
+                ", ".join("{} ({:.3f}s)".format(class_path, duration) for class_path, duration in timings)))
+            Utility._import_timings = []
 
     @staticmethod
     def initialize_modules(module_configs):
@@ -47,7 +77,7 @@ def initialize_modules(module_configs):
 
             with Utility.BlockStopWatch("Initializing module " + module_config["module"]):
                 # Import file and extract class
-                module_class = getattr(importlib.import_module("src." + module_config["module"]), module_config["module"].split(".")[-1])
+                module_class = Utility.get_class(module_config["module"])
                 # Create module
                 modules.append(module_class(Config(config)))
 
@@ -288,8 +318,8 @@ def build_provider(name, parameters):
         :param parameters: A dict containing the parameters that should be used.
         :return: The constructed provider.
         """
-        # Import class from src.utility
-        module_class = getattr(importlib.import_module("src.provider." + name), name.split(".")[-1])
+        # Import class from src.provider
+        module_class = Utility.get_class("provider." + name)
         # Build configuration
         config = Config(parameters)
         # Construct provider
@@ -384,7 +414,7 @@ def map_back_from_equally_spaced_equidistant_values(values, num_splits_per_dimen
         return np.round(values)
 
     @staticmethod
-    def import_objects(filepath, cached_objects=None, **kwargs):
+    def import_objects(filepath, cached_objects=None, backend="operator", link_duplicates=False, **kwargs):
         """ Import all objects for the given file and returns the loaded objects
 
         In .obj files a list of objects can be saved in.
@@ -392,28 +422,32 @@ def import_objects(filepath, cached_objects=None, **kwargs):
 
         :param filepath: the filepath to the location where the data is stored
         :param cached_objects: a dict of filepath to objects, which have been loaded before, to avoid reloading (the dict is updated in this function)
+        :param backend: "operator" uses the import operators of blender, "numpy" the MeshImporter, which parses the files with numpy
+        :param link_duplicates: if True, objects taken from cached_objects share their mesh data with the cached ones
         :param kwargs: all other params are handed directly to the bpy loading fct. check the corresponding documentation
         :return: a list of all newly loaded objects, in the failure case an empty list is returned
         """
         if os.path.exists(filepath):
             if cached_objects is not None and isinstance(cached_objects, dict):
                 if filepath in cached_objects.keys():
-                    created_obj = []
-                    for obj in cached_objects[filepath]:
-                        # deselect all objects and duplicate the object
-                        bpy.ops.object.select_all(action='DESELECT')
+                    created_obj = duplicate_objects(cached_objects[filepath], linked=link_duplicates)
+                    # as after an import, only the new objects are selected
+                    for obj in bpy.context.selected_objects:
+                        obj.select_set(False)
+                    for obj in created_obj:
                         obj.select_set(True)
-                        bpy.ops.object.duplicate()
-                        # save the duplicate in new list
-                        if len(bpy.context.selected_objects) != 1:
-                            raise Exception("The amount of objects after the copy was more than one!")
-                        created_obj.append(bpy.context.selected_objects[0])
                     return created_obj
                 else:
-                    loaded_objects = Utility.import_objects(filepath, cached_objects=None, **kwargs)
+                    loaded_objects = Utility.import_objects(filepath, cached_objects=None, backend=backend,
+                                                            link_duplicates=link_duplicates, **kwargs)
                     cached_objects[filepath] = loaded_objects
                     return loaded_objects
-            else:
+            elif backend == "numpy":
+                if kwargs:
+                    raise Exception("The numpy import backend does not support the parameters of the import "
+                                    "operators: {}".format(", ".join(kwargs.keys())))
+                return MeshImporter.import_file(filepath)
+            elif backend == "operator":
                 # save all selected objects
                 previously_selected_objects = set(bpy.context.selected_objects)
                 if filepath.endswith('.obj'):
@@ -424,5 +458,7 @@ def import_objects(filepath, cached_objects=None, **kwargs):
                     bpy.ops.import_mesh.ply(filepath=filepath, **kwargs)
                 # return all currently selected objects
                 return list(set(bpy.context.selected_objects) - previously_selected_objects)
+            else:
+                raise Exception("Unknown import backend: {}".format(backend))
         else:
             raise Exception("The given filepath does not exist: {}".format(filepath))
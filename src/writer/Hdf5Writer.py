@@ -1,4 +1,7 @@
+import itertools
 import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
 import bpy
 import h5py
@@ -11,6 +14,30 @@
 class Hdf5Writer(WriterInterface):
     """ For each key frame merges all registered output files into one hdf5 file
 
+    Loading and postprocessing is done in the main thread, as both access blender. The compression and the writing of
+    the hdf5 files is done in the background, while the next frames are already loaded. For gzip compression the chunks
+    of each dataset are compressed in parallel by a pool of threads and are then written directly into the file.
+
+    Example 1: Pack 100 frames into one hdf5 file, each frame is stored in a group named after its frame number.
+
+        "config": {
+          "frames_per_file": 100
+        }
+
+    Example 2: Use a fast gzip level for all outputs, but store the segmaps with lzf and the colors in chunks of 64 rows.
+
+        "config": {
+          "compression_level": 1,
+          "per_key_settings": {
+            "segmap": {
+              "compression": "lzf"
+            },
+            "colors": {
+              "chunk_shape": [64, 512, 3]
+            }
+          }
+        }
+
     **Configuration**:
 
     .. csv-table::
@@ -19,7 +46,18 @@ class Hdf5Writer(WriterInterface):
         "append_to_existing_output", "If true, the names of the output hdf5 files will be chosen in a way such that "
                                     "there are no collisions with already existing hdf5 files in the output directory. "
                                     "Type: bool. Default: False"
-        "compression", "The compression technique that should be used when storing data in a hdf5 file. Type: string."
+        "compression", "The compression technique that should be used when storing data in a hdf5 file. "
+                       "Type: string. Default: "gzip". Available: ["gzip", "lzf", "none"]."
+        "compression_level", "The gzip compression level, only used if the compression is "gzip". Type: int. "
+                             "Range: [0, 9]. Default: 4."
+        "per_key_settings", "A dict mapping an output key to a dict, which can overwrite the "compression" and "
+                            ""compression_level" for this key and can set a "chunk_shape". The chunk shape is a list "
+                            "with one entry per dimension of the data, per default around 1 MB of rows are stored in "
+                            "one chunk. Type: dict. Default: {}."
+        "frames_per_file", "The number of frames stored in one hdf5 file. If bigger than one, the data of each frame "
+                           "is stored in a group named after the frame number and the file is named after the first "
+                           "frame it contains. Type: int. Default: 1."
+        "num_worker_threads", "The number of threads used for compressing the data. Type: int. Default: 4."
         "delete_temporary_files_afterwards", "True, if all temporary files should be deleted after merging. "
                                              "Type: bool. Default value: True."
        "stereo_separate_keys", "If true, stereo images are saved as two separate images *_0 and *_1. Type: bool. "
@@ -30,77 +68,225 @@ class Hdf5Writer(WriterInterface):
     def __init__(self, config):
         WriterInterface.__init__(self, config)
         self._avoid_rendering = config.get_bool("avoid_rendering", False)
+        self._compression = self.config.get_string("compression", "gzip").lower()
+        self._compression_level = self.config.get_int("compression_level", 4)
+        self._per_key_settings = self.config.get_raw_dict("per_key_settings", {})
+        self._frames_per_file = self.config.get_int("frames_per_file", 1)
+        if self._frames_per_file < 1:
+            raise Exception("The frames_per_file have to be at least one: {}".format(self._frames_per_file))
+        self._num_worker_threads = self.config.get_int("num_worker_threads", 4)
+        # Bounds the number of loaded frames which are kept in memory, while they are still compressed and written
+        self._max_files_in_flight = 2
 
     def run(self):
         if self._avoid_rendering:
             print("Avoid rendering is on, no output produced!")
             return
 
+        if 'output' not in bpy.context.scene:
+            print("No output was designed in prior models!")
+            return
+
         if self.config.get_bool("append_to_existing_output", False):
-            frame_offset = 0
-            # Look for hdf5 file with highest index
-            for path in os.listdir(self._determine_output_dir(False)):
-                if path.endswith(".hdf5"):
-                    index = path[:-len(".hdf5")]
-                    if index.isdigit():
-                        frame_offset = max(frame_offset, int(index) + 1)
+            frame_offset = self._determine_frame_offset()
         else:
             frame_offset = 0
 
-        # Go through all frames
-        for frame in range(bpy.context.scene.frame_start, bpy.context.scene.frame_end):
+        frames = list(range(bpy.context.scene.frame_start, bpy.context.scene.frame_end))
+        with ThreadPoolExecutor(max_workers=max(1, self._num_worker_threads)) as compression_pool, \
+                ThreadPoolExecutor(max_workers=1) as file_writer:
+            files_in_flight = []
+            for first_frame_index in range(0, len(frames), self._frames_per_file):
+                frames_in_file = frames[first_frame_index:first_frame_index + self._frames_per_file]
 
-            # Create output hdf5 file
-            hdf5_path = os.path.join(self._determine_output_dir(False), str(frame + frame_offset) + ".hdf5")
-            with h5py.File(hdf5_path, "w") as f:
+                # Create output hdf5 file
+                hdf5_path = os.path.join(self._determine_output_dir(False), str(frames_in_file[0] + frame_offset) + ".hdf5")
+                datasets = []
+                for frame in frames_in_file:
+                    # If more than one frame is stored per file, each frame gets its own group
+                    group_name = str(frame + frame_offset) if self._frames_per_file > 1 else None
+                    # Go through all the output types
+                    print("Merging data for frame " + str(frame) + " into " + hdf5_path)
+                    for key, data in self._load_frame(frame):
+                        datasets.append(self._prepare_dataset(compression_pool, group_name, key, data))
 
-                if 'output' not in bpy.context.scene:
-                    print("No output was designed in prior models!")
-                    return
-                # Go through all the output types
-                print("Merging data for frame " + str(frame) + " into " + hdf5_path)
+                files_in_flight.append(file_writer.submit(self._write_hdf5_file, hdf5_path, datasets))
+                # Wait for older files, to avoid keeping too many frames in memory
+                while len(files_in_flight) > self._max_files_in_flight:
+                    files_in_flight.pop(0).result()
 
-                for output_type in bpy.context.scene["output"]:
-                    use_stereo = output_type["stereo"]
-                    # Build path (path attribute is format string)
-                    file_path = output_type["path"]
-                    if '%' in file_path:
-                        file_path = file_path % frame
+            for file_in_flight in files_in_flight:
+                file_in_flight.result()
 
-                    if use_stereo:
-                        path_l, path_r = self._get_stereo_path_pair(file_path)
+    def _determine_frame_offset(self):
+        """ Determines the first frame number which does not collide with the already existing hdf5 files.
 
-                        img_l, new_key, new_version = self._load_and_postprocess(path_l, output_type["key"],
-                                                                                   output_type["version"])
-                        img_r, new_key, new_version = self._load_and_postprocess(path_r, output_type["key"],
-                                                                                   output_type["version"])
+        Every file is named after the first frame it contains, so only the file with the highest index is opened to
+        look for the frame groups it contains. If this file cannot be read, e.g. as it is still written by another
+        process, it is assumed to contain frames_per_file frames.
 
-                        if self.config.get_bool("stereo_separate_keys", False):
-                            self._write_to_hdf_file(f, new_key + "_0", img_l)
-                            self._write_to_hdf_file(f, new_key + "_1", img_r)
-                        else:
-                            data = np.array([img_l, img_r])
-                            self._write_to_hdf_file(f, new_key, data)
+        :return: The frame offset.
+        """
+        # Look for hdf5 file with highest index
+        output_dir = self._determine_output_dir(False)
+        indices = [int(path[:-len(".hdf5")]) for path in os.listdir(output_dir)
+                   if path.endswith(".hdf5") and path[:-len(".hdf5")].isdigit()]
+        if not indices:
+            return 0
+
+        last_index = max(indices)
+        try:
+            # Files containing several frames, store each frame in a group named after its frame number
+            with h5py.File(os.path.join(output_dir, str(last_index) + ".hdf5"), "r") as f:
+                frame_numbers = [int(key) for key in f.keys() if key.isdigit()]
+        except OSError as e:
+            print("Warning: The hdf5 file {}.hdf5 could not be read: {}".format(last_index, e))
+            return last_index + self._frames_per_file
+        if frame_numbers:
+            return max(last_index, max(frame_numbers)) + 1
+        return last_index + 1
 
-                    else:
-                        data, new_key, new_version = self._load_and_postprocess(file_path, output_type["key"],
-                                                                                output_type["version"])
+    def _load_frame(self, frame):
+        """ Loads and postprocesses all registered outputs of the given frame.
 
-                        self._write_to_hdf_file(f, new_key, data)
+        :param frame: The frame number.
+        :return: A list of key and data pairs, which should be written to the hdf5 file.
+        """
+        entries = []
+        for output_type in bpy.context.scene["output"]:
+            use_stereo = output_type["stereo"]
+            # Build path (path attribute is format string)
+            file_path = output_type["path"]
+            if '%' in file_path:
+                file_path = file_path % frame
 
-                    self._write_to_hdf_file(f, new_key + "_version", np.string_([new_version]))
+            if use_stereo:
+                path_l, path_r = self._get_stereo_path_pair(file_path)
 
-    def _write_to_hdf_file(self, file, key, data):
-        """ Adds the given data as a new entry to the given hdf5 file.
+                img_l, new_key, new_version = self._load_and_postprocess(path_l, output_type["key"],
+                                                                           output_type["version"])
+                img_r, new_key, new_version = self._load_and_postprocess(path_r, output_type["key"],
+                                                                           output_type["version"])
+
+                if self.config.get_bool("stereo_separate_keys", False):
+                    entries.append((new_key + "_0", img_l))
+                    entries.append((new_key + "_1", img_r))
+                else:
+                    entries.append((new_key, np.array([img_l, img_r])))
+
+            else:
+                data, new_key, new_version = self._load_and_postprocess(file_path, output_type["key"],
+                                                                        output_type["version"])
+                entries.append((new_key, data))
+
+            entries.append((new_key + "_version", np.string_([new_version])))
+        return entries
+
+    def _get_dataset_settings(self, key, data):
+        """ Returns the compression, the compression level and the chunk shape which should be used for the given key.
 
-        :param file: The hdf5 file handle.
+        :param key: The key at which the data will be stored in the hdf5 file. Type: string.
+        :param data: The data to store.
+        :return: The compression, the compression level and the chunk shape.
+        """
+        settings = self._per_key_settings.get(key, {})
+        compression = str(settings.get("compression", self._compression)).lower()
+        compression_level = int(settings.get("compression_level", self._compression_level))
+        if "chunk_shape" in settings:
+            chunk_shape = tuple(int(ele) for ele in settings["chunk_shape"])
+            if len(chunk_shape) != data.ndim:
+                raise Exception("The chunk shape {} of the key {} does not fit the data with the shape "
+                                "{}".format(chunk_shape, key, data.shape))
+            # A chunk can not be bigger than the data itself
+            chunk_shape = tuple(min(max(1, chunk), size) for chunk, size in zip(chunk_shape, data.shape))
+        else:
+            # Use as many complete rows as fit into around one megabyte
+            row_bytes = max(1, data.itemsize * int(np.prod(data.shape[1:])))
+            chunk_shape = (min(data.shape[0], max(1, (1 << 20) // row_bytes)),) + data.shape[1:]
+        return compression, compression_level, chunk_shape
+
+    def _prepare_dataset(self, compression_pool, group_name, key, data):
+        """ Determines how the given data is stored and starts compressing its chunks, if gzip is used.
+
+        :param compression_pool: The thread pool used for compressing the chunks.
+        :param group_name: The group in which the data is stored, None for the root of the file.
         :param key: The key at which the data should be stored in the hdf5 file. Type: string.
         :param data: The data to store.
+        :return: A dict describing the dataset, which can be handed to _write_hdf5_file().
+        """
+        dataset = {"group_name": group_name, "key": key, "data": data, "compressed_chunks": None}
+        # Strings and scalars are stored uncompressed
+        if data.dtype.char == 'S' or data.ndim == 0 or data.size == 0:
+            return dataset
+
+        compression, compression_level, chunk_shape = self._get_dataset_settings(key, data)
+        dataset["compression"] = compression
+        dataset["compression_level"] = compression_level
+        dataset["chunk_shape"] = chunk_shape
+        if compression == "gzip":
+            # The deflate filter of hdf5 uses zlib streams, so the chunks can be compressed in parallel outside of
+            # hdf5 (zlib releases the GIL) and can then be written directly into the file
+            dataset["compressed_chunks"] = []
+            ranges = [range(0, size, chunk) for size, chunk in zip(data.shape, chunk_shape)]
+            for offset in itertools.product(*ranges):
+                dataset["compressed_chunks"].append((offset, compression_pool.submit(
+                    self._compress_chunk, data, offset, chunk_shape, compression_level)))
+        return dataset
+
+    @staticmethod
+    def _compress_chunk(data, offset, chunk_shape, compression_level):
+        """ Compresses one chunk of the given data with zlib.
+
+        :param data: The whole data of the dataset.
+        :param offset: The start index of the chunk in each dimension.
+        :param chunk_shape: The shape of one chunk.
+        :param compression_level: The zlib compression level.
+        :return: The compressed bytes of the chunk.
+        """
+        chunk = data[tuple(slice(start, start + size) for start, size in zip(offset, chunk_shape))]
+        if chunk.shape != tuple(chunk_shape):
+            # Hdf5 always stores full chunks, so the chunks at the border have to be padded
+            padded_chunk = np.zeros(chunk_shape, dtype=data.dtype)
+            padded_chunk[tuple(slice(0, size) for size in chunk.shape)] = chunk
+            chunk = padded_chunk
+        return zlib.compress(np.ascontiguousarray(chunk).tobytes(), compression_level)
+
+    def _write_hdf5_file(self, hdf5_path, datasets):
+        """ Writes all given datasets into a new hdf5 file, this is executed in the background.
+
+        :param hdf5_path: The path of the hdf5 file.
+        :param datasets: A list of dicts created by _prepare_dataset().
+        """
+        with h5py.File(hdf5_path, "w") as f:
+            for dataset in datasets:
+                if dataset["group_name"] is not None:
+                    group = f.require_group(dataset["group_name"])
+                else:
+                    group = f
+                self._write_to_hdf_file(group, dataset)
+
+    def _write_to_hdf_file(self, file, dataset):
+        """ Adds the given data as a new entry to the given hdf5 file.
+
+        :param file: The hdf5 file handle or group.
+        :param dataset: A dict created by _prepare_dataset().
         """
-        if data.dtype.char == 'S':
-            file.create_dataset(key, data=data, dtype=data.dtype)
+        key, data = dataset["key"], dataset["data"]
+        if "compression" not in dataset:
+            if data.dtype.char == 'S':
+                file.create_dataset(key, data=data, dtype=data.dtype)
+            else:
+                file.create_dataset(key, data=data)
+        elif dataset["compressed_chunks"] is not None:
+            hdf5_dataset = file.create_dataset(key, shape=data.shape, dtype=data.dtype,
+                                               chunks=dataset["chunk_shape"], compression="gzip",
+                                               compression_opts=dataset["compression_level"])
+            for offset, compressed_chunk in dataset["compressed_chunks"]:
+                hdf5_dataset.id.write_direct_chunk(offset, compressed_chunk.result())
+        elif dataset["compression"] == "none":
+            file.create_dataset(key, data=data, chunks=dataset["chunk_shape"])
         else:
-            file.create_dataset(key, data=data, compression=self.config.get_string("compression", 'gzip'))
+            file.create_dataset(key, data=data, chunks=dataset["chunk_shape"], compression=dataset["compression"])
 
     def _get_stereo_path_pair(self, file_path):
         """
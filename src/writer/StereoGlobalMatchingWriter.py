@@ -3,7 +3,6 @@
 from math import tan
 
 import bpy
-import cv2
 import numpy as np
 
 from src.main.GlobalStorage import GlobalStorage
@@ -67,6 +66,8 @@ def sgm(self, imgL, imgR):
         :param imgR: Right image. Type: blender image type object.
         :return: depth, disparity
          """
+        import cv2
+
         window_size = self.config.get_int("window_size", 7)
         if window_size % 2 == 0:
             raise Exception("Window size must be an odd number")
@@ -2,7 +2,6 @@
 import csv
 import json
 import bpy
-import h5py
 import numpy as np
 
 from src.main.Module import Module
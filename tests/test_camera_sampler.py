@@ -0,0 +1,48 @@
+import sys
+import unittest
+from unittest import mock
+
+# numpy can not be imported again, after it is removed from sys.modules at the end of the patch below
+import numpy as np
+
+# the proximity checks only use the bvh tree, which is replaced below, so blender is not needed
+with mock.patch.dict(sys.modules, {name: mock.MagicMock() for name in [
+        "bpy", "bmesh", "mathutils", "mathutils.bvhtree", "bpy_extras", "bpy_extras.image_utils",
+        "bpy_extras.io_utils", "bpy_extras.node_shader_utils"]}):
+    from src.camera.CameraSampler import CameraSampler
+
+
+class TestProximityChecks(unittest.TestCase):
+
+    def _sampler(self, proximity_checks, hit_distance):
+        sampler = CameraSampler.__new__(CameraSampler)
+        sampler.proximity_checks = proximity_checks
+        sampler.sqrt_number_of_rays = 2
+        sampler._is_bvh_tree_inited = True
+        sampler._validate_proximity_checks()
+
+        def ray_cast(position, direction, distance):
+            # BVHTree.ray_cast only accepts a float as distance
+            self.assertIsInstance(distance, float)
+            return None, None, None, hit_distance if hit_distance is not None and hit_distance < distance else None
+
+        sampler.bvh_tree = mock.Mock(ray_cast=ray_cast)
+        sampler._get_ray_directions = lambda cam, cam2world_matrix: np.tile([0, 0, -1], (4, 1)).tolist()
+        return sampler
+
+    def test_range_distance(self):
+        self.assertEqual(self._sampler({"min": 1.0, "max": 4.0}, None)._proximity_range_distance, 5.0)
+        self.assertEqual(self._sampler({"min": 1.0}, None)._proximity_range_distance, 1.0)
+        self.assertEqual(self._sampler({"max": 4.0, "avg": {"min": 1.0, "max": 2.0}}, None)._proximity_range_distance,
+                         sys.float_info.max)
+        self.assertEqual(self._sampler({"max": 4.0, "no_background": True}, None)._proximity_range_distance,
+                         sys.float_info.max)
+
+    def test_no_background(self):
+        for hit_distance, expected in [(None, False), (2.0, True), (0.5, False), (10.0, False)]:
+            sampler = self._sampler({"min": 1.0, "max": 4.0, "no_background": True}, hit_distance)
+            self.assertEqual(sampler._perform_obstacle_in_view_check(None, mock.MagicMock()), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.utility.LoaderPlan import SuncgLoaderPlan, Front3DLoaderPlan, CreateEmpty, ImportObject, CreateBox, \
+    CreateMesh, ImportFurniture, PlaceFurniture
+
+
+def quaternion_rotate(quaternion, vector):
+    """ Rotates the vector by the quaternion [w, x, y, z] via q * v * q^-1, independent of any matrix formula. """
+    w, x, y, z = np.array(quaternion, dtype=np.float64) / np.linalg.norm(quaternion)
+    q_vec = np.array([x, y, z])
+    vector = np.array(vector, dtype=np.float64)
+    return vector + 2 * np.cross(q_vec, np.cross(q_vec, vector) + w * vector)
+
+
+def old_rotation_to_blender(quaternion):
+    """ The rotation computed by the old mathutils code: Matrix.Rotation(radians(-90), 4, 'X') @ rotation_mat """
+    rotation = np.stack([quaternion_rotate(quaternion, axis) for axis in np.eye(3)], axis=1)
+    angle = math.radians(-90)
+    blender_rot_mat = np.array([[1, 0, 0],
+                                [0, math.cos(angle), -math.sin(angle)],
+                                [0, math.sin(angle), math.cos(angle)]])
+    return blender_rot_mat @ rotation
+
+
+class TestSuncgLoaderPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.suncg_dir = tempfile.mkdtemp()
+        for folder in ["house/h1", "room/h1", "object/m1", "texture"]:
+            os.makedirs(os.path.join(self.suncg_dir, folder))
+        for path in ["room/h1/rf.obj", "room/h1/rw.obj", "object/m1/m1.obj", "texture/t1.jpg", "texture/t2.png",
+                     "texture/t2.jpg"]:
+            open(os.path.join(self.suncg_dir, path), "w").close()
+
+        house = {"id": "h1", "levels": [
+            {"id": "0", "bbox": {"min": [0, 1, 2], "max": [3, 4, 5]}, "nodes": [
+                {"id": "0_0", "type": "Room", "modelId": "r", "bbox": {"min": [0, 0, 0], "max": [1, 1, 1]},
+                 "roomTypes": ["Bedroom"], "nodeIndices": [1, 2], "hideCeiling": 1,
+                 "materials": [{"texture": "t1"}, {"texture": "t2"}, {"texture": "t3"}, {"diffuse": "#ffffff"}]},
+                {"id": "0_1", "type": "Object", "modelId": "m1", "transform": list(range(16))},
+                {"id": "0_2", "type": "Box", "dimensions": [1, 2, 3]},
+                {"id": "0_3", "type": "Object", "modelId": "m2"},
+                {"id": "0_4", "type": "Object", "modelId": "m1", "valid": 0}]},
+            {"id": "1", "nodes": [
+                {"id": "1_0", "type": "Box", "dimensions": [1, 1, 1]}]}]}
+        self.house_path = os.path.join(self.suncg_dir, "house", "h1", "house.json")
+        with open(self.house_path, "w") as f:
+            json.dump(house, f)
+        self.mapping_path = os.path.join(self.suncg_dir, "mapping.csv")
+        with open(self.mapping_path, "w") as f:
+            f.write("model_id,nyuv2_40class,fine_grained_class,coarse_grained_class\nm1,chair,chair_f,chair_c\n")
+        self.label_id_map = {"void": 0, "floor": 1, "wall": 2, "ceiling": 3, "chair": 5}
+
+    def tearDown(self):
+        shutil.rmtree(self.suncg_dir)
+
+    def _plan(self):
+        return SuncgLoaderPlan(self.house_path, self.suncg_dir, self.mapping_path, self.label_id_map).plan()
+
+    def test_operation_order_and_parents(self):
+        operations = self._plan()
+        self.assertEqual([type(operation) for operation in operations],
+                         [CreateEmpty, CreateEmpty, ImportObject, ImportObject, ImportObject, CreateBox, CreateEmpty,
+                          CreateBox])
+        self.assertEqual([operation.parent for operation in operations],
+                         [None, "Level#0", "Room#0_0", "Room#0_0", "Room#0_0", "Room#0_0", None, "Level#1"])
+        self.assertEqual(operations[0].properties["bbox"], {"min": [0, -2, 1], "max": [3, -5, 4]})
+        self.assertEqual(operations[1].properties["roomTypes"], ["Bedroom"])
+
+    def test_room_parts_and_metadata(self):
+        operations = self._plan()
+        floor, wall, chair = operations[2:5]
+        self.assertEqual(floor.path, os.path.join(self.suncg_dir, "room", "h1", "rf.obj"))
+        self.assertEqual((floor.properties["type"], floor.properties["category_id"]), ("Floor", 1))
+        # the ceiling is hidden
+        self.assertEqual(wall.path, os.path.join(self.suncg_dir, "room", "h1", "rw.obj"))
+        self.assertEqual((wall.properties["type"], wall.properties["category_id"]), ("Wall", 2))
+        self.assertEqual(chair.properties["fine_grained_class"], "chair_f")
+        self.assertEqual(chair.properties["coarse_grained_class"], "chair_c")
+        self.assertEqual(chair.properties["category_id"], 5)
+        # the transform is given col-wise
+        self.assertEqual(chair.transform[0], [0.0, 4.0, 8.0, 12.0])
+
+    def test_missing_files_are_skipped(self):
+        paths = [operation.path for operation in self._plan() if isinstance(operation, ImportObject)]
+        self.assertNotIn(os.path.join(self.suncg_dir, "object", "m2", "m2.obj"), paths)
+        self.assertNotIn(os.path.join(self.suncg_dir, "room", "h1", "rc.obj"), paths)
+
+    def test_texture_path_resolution(self):
+        floor = self._plan()[2]
+        texture_paths = [adjustment.get("texture_path", "no texture") for adjustment in floor.material_adjustments]
+        self.assertEqual(texture_paths, [os.path.join(self.suncg_dir, "texture", "t1.jpg"),
+                                         os.path.join(self.suncg_dir, "texture", "t2.png"),
+                                         None, "no texture"])
+
+
+class TestFront3DLoaderPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.future_model_path = os.path.join(self.temp_dir, "future")
+        os.makedirs(os.path.join(self.future_model_path, "jidA"))
+        open(os.path.join(self.future_model_path, "jidA", "raw_model.obj"), "w").close()
+        data = {
+            "material": [{"uid": "m", "texture": "", "normaltexture": "", "color": [255, 0, 0, 255]}],
+            "mesh": [{"type": " Floor ", "material": "m", "xyz": [0, 0, 0, 1, 0, 0, 0, 0, 1],
+                      "normal": [0, 1, 0] * 3, "uv": [0, 0, 1, 0, 0, 1], "faces": [0, 1, 2]},
+                     {"type": "Wall", "material": "unknown", "xyz": [0, 0, 0, 1, 0, 0, 0, 0, 1, 1, 0, 1],
+                      "normal": [0, 1, 0] * 4, "uv": [0, 0, 1, 0, 0, 1, 1, 1], "faces": [0, 1, 2, 1, 3, 2]}],
+            "furniture": [{"jid": "jidA", "uid": "u1", "category": "Chair"},
+                          {"jid": "jidB", "uid": "u2", "category": "Chair"},
+                          {"jid": "jidA", "uid": "u3", "category": "Chair"}],
+            "scene": {"room": [{"children": [
+                {"instanceid": "furniture/1", "ref": "u1", "pos": [1, 2, 3], "rot": [0, 0, 0.7071068, 0.7071068],
+                 "scale": [1, 1, 1]},
+                {"instanceid": "furniture/2", "ref": "u2", "pos": [0, 0, 0], "rot": [1, 0, 0, 0], "scale": [1, 1, 1]},
+                {"instanceid": "mesh/1", "ref": "x"}]},
+                {"children": [{"instanceid": "furniture/3", "ref": "u1", "pos": [0, 0, 0], "rot": [1, 0, 0, 0],
+                               "scale": [2, 2, 2]}]}]}
+        }
+        self.json_path = os.path.join(self.temp_dir, "house.json")
+        with open(self.json_path, "w") as f:
+            json.dump(data, f)
+        self.mapping_file = os.path.join(self.temp_dir, "mapping.csv")
+        with open(self.mapping_file, "w") as f:
+            f.write("id,name\n0,void\n1,floor\n2,chair\n3,wall\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _plan(self):
+        return Front3DLoaderPlan(self.json_path, self.future_model_path, self.mapping_file).plan()
+
+    def test_operation_order(self):
+        operations = self._plan()
+        self.assertEqual([type(operation) for operation in operations],
+                         [CreateMesh, CreateMesh, ImportFurniture, ImportFurniture, PlaceFurniture, PlaceFurniture])
+        # jidB does not exist, so u2 is neither imported nor placed
+        self.assertEqual([operation.uid for operation in operations[2:]], ["u1", "u3", "u1", "u1"])
+        self.assertEqual([operation.room_id for operation in operations[4:]], [0, 1])
+        self.assertEqual(operations[2].category_id, 2)
+
+    def test_mesh_arrays(self):
+        floor, wall = self._plan()[:2]
+        self.assertEqual((floor.name, floor.category_id), ("Floor", 1))
+        self.assertEqual(floor.material["color"], [255, 0, 0, 255])
+        self.assertIsNone(wall.material)
+        # y and z are flipped
+        np.testing.assert_array_equal(floor.vertices, [0, 0, 0, 1, 0, 0, 0, 1, 0])
+        np.testing.assert_array_equal(wall.loop_start, [0, 3])
+        np.testing.assert_array_equal(wall.loop_total, [3, 3])
+        np.testing.assert_array_equal(wall.uvs, [0, 0, 1, 0, 0, 1, 1, 0, 1, 1, 0, 1])
+
+    def test_placement(self):
+        placement = self._plan()[4]
+        self.assertEqual(placement.location, [1, 3, 2])
+        np.testing.assert_allclose(placement.rotation, old_rotation_to_blender([0, 0, 0.7071068, 0.7071068]),
+                                   atol=1e-6)
+
+    def test_rotation_to_blender(self):
+        random_state = np.random.RandomState(0)
+        quaternions = [[1, 0, 0, 0], [2, 0, 0, 0], [math.cos(math.pi / 4), 0, math.sin(math.pi / 4), 0]]
+        quaternions += random_state.uniform(-1, 1, (10, 4)).tolist()
+        for quaternion in quaternions:
+            np.testing.assert_allclose(Front3DLoaderPlan._rotation_to_blender(quaternion),
+                                       old_rotation_to_blender(quaternion), atol=1e-9)
+        np.testing.assert_allclose(Front3DLoaderPlan._rotation_to_blender([1, 0, 0, 0]),
+                                   [[1, 0, 0], [0, 0, 1], [0, -1, 0]], atol=1e-12)
+
+    def test_meshes_are_prepared_in_parallel(self):
+        second_mesh_started = threading.Event()
+        plan_mesh = Front3DLoaderPlan._plan_mesh
+
+        def wait_for_second_mesh(mesh_data, used_materials, mapping):
+            if mesh_data["type"] == "Wall":
+                second_mesh_started.set()
+            else:
+                # the first mesh is only finished, if the second one is prepared at the same time
+                self.assertTrue(second_mesh_started.wait(5))
+            return plan_mesh(mesh_data, used_materials, mapping)
+
+        with mock.patch.object(Front3DLoaderPlan, "_plan_mesh", staticmethod(wait_for_second_mesh)):
+            self.assertEqual(len(self._plan()), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.utility.MeshFileParser import MeshFileParser
+
+
+class TestObjParsing(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read_obj(self, content, file_name="mesh.obj"):
+        path = os.path.join(self.temp_dir, file_name)
+        with open(path, "w") as f:
+            f.write(content)
+        return MeshFileParser.read_obj(path)
+
+    def test_face_formats(self):
+        for corners, expected in [
+            (["1", "2", "3"], ([0, 1, 2], [-1, -1, -1], [-1, -1, -1])),
+            (["1/4", "2/5", "3/6"], ([0, 1, 2], [3, 4, 5], [-1, -1, -1])),
+            (["1//7", "2//8", "3//9"], ([0, 1, 2], [-1, -1, -1], [6, 7, 8])),
+            (["1/4/7", "2/5/8", "3/6/9"], ([0, 1, 2], [3, 4, 5], [6, 7, 8]))
+        ]:
+            for result, expected_indices in zip(MeshFileParser._parse_face_corners(corners), expected):
+                np.testing.assert_array_equal(result, expected_indices)
+
+    def test_mixed_face_formats(self):
+        positions, tex_coords, normals = MeshFileParser._parse_face_corners(["1/2/3", "4//5", "6", "7/8"])
+        np.testing.assert_array_equal(positions, [0, 3, 5, 6])
+        np.testing.assert_array_equal(tex_coords, [1, -1, -1, 7])
+        np.testing.assert_array_equal(normals, [2, 4, -1, -1])
+
+        # the total number of slashes matches the one of the first corner
+        positions, tex_coords, normals = MeshFileParser._parse_face_corners(["1/2", "3", "4/5/6"])
+        np.testing.assert_array_equal(positions, [0, 2, 3])
+        np.testing.assert_array_equal(tex_coords, [1, -1, 4])
+        np.testing.assert_array_equal(normals, [-1, -1, 5])
+
+    def test_negative_indices(self):
+        obj_data = self._read_obj("v 0 0 0\nv 1 0 0\nvt 0 0\nv 0 1 0\nvt 1 0\nvt 0 1\nvn 0 0 1\n"
+                                  "f -3/-3/-1 -2/-2/-1 -1/-1/-1\n"
+                                  "v 1 1 0\n"
+                                  "f -1//-1 -2//-1 -3//-1\n")
+        np.testing.assert_array_equal(obj_data["loop_positions"], [0, 1, 2, 3, 2, 1])
+        np.testing.assert_array_equal(obj_data["loop_tex_coords"], [0, 1, 2, -1, -1, -1])
+        np.testing.assert_array_equal(obj_data["loop_normals"], [0] * 6)
+
+    def test_objects_materials_and_smooth_groups(self):
+        obj_data = self._read_obj("mtllib mesh.mtl\n"
+                                  "v 0 0 0\nv 1 0 0\nv 0 1 0\nv 1 1 0 1\n"
+                                  "f 1 2 3\n"
+                                  "o Second\nusemtl A\ns 1\nf 2 4 3\nusemtl B\ns off\nf 1 2 4 3\nusemtl A\nf 1 2 3\n")
+        self.assertEqual(obj_data["object_names"], ["mesh", "Second"])
+        self.assertEqual(obj_data["material_names"], ["A", "B"])
+        self.assertEqual(obj_data["mtl_files"], [os.path.join(self.temp_dir, "mesh.mtl")])
+        np.testing.assert_array_equal(obj_data["face_sizes"], [3, 3, 4, 3])
+        np.testing.assert_array_equal(obj_data["face_objects"], [0, 1, 1, 1])
+        np.testing.assert_array_equal(obj_data["face_materials"], [-1, 0, 1, 0])
+        np.testing.assert_array_equal(obj_data["face_smooth"], [False, True, False, False])
+        # the optional w coordinate of the last vertex is ignored
+        np.testing.assert_array_equal(obj_data["positions"], [[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]])
+
+    def test_vertices_with_different_lengths(self):
+        # the total number of values matches four values per line
+        obj_data = self._read_obj("v 0 0 0 1\nv 1 1 1\nv 2 2 2\nv 3 3 3 0.5 0.5 0.5\nvt 0 0\nvt 1 1 0\n"
+                                  "f 1/1 2/2 3/1 4/2\n")
+        np.testing.assert_array_equal(obj_data["positions"], [[0, 0, 0], [1, 1, 1], [2, 2, 2], [3, 3, 3]])
+        np.testing.assert_array_equal(obj_data["tex_coords"], [[0, 0], [1, 1]])
+
+    def test_file_without_faces(self):
+        self.assertIsNone(self._read_obj("v 0 0 0\nv 1 0 0\n"))
+
+
+class TestPlyParsing(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read_ply(self, header, body):
+        path = os.path.join(self.temp_dir, "mesh.ply")
+        with open(path, "wb") as f:
+            f.write(header.encode("ascii") + body)
+        return MeshFileParser.read_ply(path)
+
+    @staticmethod
+    def _header(file_format, num_faces):
+        return "ply\nformat {} 1.0\ncomment test\nelement vertex 4\nproperty float x\nproperty float y\n" \
+               "property float z\nproperty uchar red\nelement face {}\nproperty list uchar int vertex_indices\n" \
+               "end_header\n".format(file_format, num_faces)
+
+    def _check_vertices(self, values, types):
+        np.testing.assert_array_equal(values["vertex"]["x"], [0, 1, 0, 1])
+        np.testing.assert_array_equal(values["vertex"]["y"], [0, 0, 1, 1])
+        np.testing.assert_array_equal(values["vertex"]["red"], [0, 85, 170, 255])
+        self.assertEqual(types["vertex"]["red"], "u1")
+        self.assertEqual(types["face"]["vertex_indices"], "i4")
+
+    def test_ascii(self):
+        body = b"0 0 0 0\n1 0 0 85\n0 1 0 170\n1 1 0 255\n3 0 1 2\n3 1 3 2\n"
+        values, types = self._read_ply(self._header("ascii", 2), body)
+        self._check_vertices(values, types)
+        face_sizes, loop_vertices = values["face"]["vertex_indices"]
+        np.testing.assert_array_equal(face_sizes, [3, 3])
+        np.testing.assert_array_equal(loop_vertices, [0, 1, 2, 1, 3, 2])
+
+    def test_ascii_varying_list_lengths(self):
+        body = b"0 0 0 0\n1 0 0 85\n0 1 0 170\n1 1 0 255\n4 0 1 3 2\n3 0 1 2\n3 1 3 2\n"
+        values, types = self._read_ply(self._header("ascii", 3), body)
+        self._check_vertices(values, types)
+        face_sizes, loop_vertices = values["face"]["vertex_indices"]
+        np.testing.assert_array_equal(face_sizes, [4, 3, 3])
+        np.testing.assert_array_equal(loop_vertices, [0, 1, 3, 2, 0, 1, 2, 1, 3, 2])
+
+    def _binary_body(self, endian, faces):
+        body = b"".join(struct.pack(endian + "fffB", x, y, 0, red)
+                        for x, y, red in [(0, 0, 0), (1, 0, 85), (0, 1, 170), (1, 1, 255)])
+        for face in faces:
+            body += struct.pack(endian + "B" + "i" * len(face), len(face), *face)
+        return body
+
+    def test_binary(self):
+        for file_format, endian in [("binary_little_endian", "<"), ("binary_big_endian", ">")]:
+            faces = [[0, 1, 2], [1, 3, 2]]
+            values, types = self._read_ply(self._header(file_format, 2), self._binary_body(endian, faces))
+            self._check_vertices(values, types)
+            face_sizes, loop_vertices = values["face"]["vertex_indices"]
+            np.testing.assert_array_equal(face_sizes, [3, 3])
+            np.testing.assert_array_equal(loop_vertices, [0, 1, 2, 1, 3, 2])
+
+    def test_binary_varying_list_lengths(self):
+        for num_faces, faces in [(2, [[0, 1, 2], [0, 1, 3, 2]]), (3, [[0, 1, 3, 2], [0, 1, 2], [1, 3, 2]])]:
+            values, types = self._read_ply(self._header("binary_little_endian", num_faces),
+                                           self._binary_body("<", faces))
+            self._check_vertices(values, types)
+            face_sizes, loop_vertices = values["face"]["vertex_indices"]
+            np.testing.assert_array_equal(face_sizes, [len(face) for face in faces])
+            np.testing.assert_array_equal(loop_vertices, np.concatenate(faces))
+
+    def test_invalid_files(self):
+        with self.assertRaises(Exception):
+            self._read_ply("solid mesh\n", b"")
+        with self.assertRaises(Exception):
+            self._read_ply(self._header("binary_middle_endian", 0), b"")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from src.utility.ModuleProfiler import ModuleProfiler
+
+
+def function(name):
+    return "file.py", 1, name
+
+
+class TestModuleProfiler(unittest.TestCase):
+
+    def setUp(self):
+        # run (1s self time) calls big (10s self time) and many small functions with 0.5ms each
+        self.stats = {
+            function("run"): (1, 1, 1.0, 12.0, {("~", 0, "<outside>"): (1, 1, 1.0, 12.0)}),
+            function("big"): (1, 1, 10.0, 10.0, {function("run"): (1, 1, 10.0, 10.0)})
+        }
+        for i in range(20):
+            self.stats[function("small_{}".format(i))] = (1, 1, 0.0005, 0.0005,
+                                                          {function("run"): (1, 1, 0.0005, 0.0005)})
+        self.profiler = ModuleProfiler("unused")
+
+    def test_stacks_are_pruned_relative_to_the_total_time(self):
+        collapsed = {";".join(stack): stack_time for stack, stack_time in self.profiler._collapse_stacks(self.stats)}
+        self.assertEqual(set(collapsed.keys()), {"run (file.py:1)", "run (file.py:1);big (file.py:1)"})
+        self.assertAlmostEqual(collapsed["run (file.py:1);big (file.py:1)"], 10.0)
+
+        # with a lower fraction, the small functions are kept
+        self.profiler.min_stack_fraction = 1e-5
+        self.assertEqual(len(self.profiler._collapse_stacks(self.stats)), 22)
+
+    def test_number_of_stacks_is_capped(self):
+        self.profiler.min_stack_fraction = 0
+        self.profiler.max_num_stacks = 3
+        collapsed = self.profiler._collapse_stacks(self.stats)
+        self.assertEqual([stack_time for _, stack_time in collapsed][:2], [10.0, 1.0])
+        self.assertEqual(len(collapsed), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()